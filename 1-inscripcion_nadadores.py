@@ -17,11 +17,25 @@ except ImportError:
     REPORTLAB_AVAILABLE = False
 from io import BytesIO
 from planilla_utils import inscrito_en_prueba, normalize_prueba_name, normalize_planilla_columns
+from tiempos_utils import parse_time, es_sin_tiempo, formatear_segundos, comparar_tiempos
+from registro_store import RegistroStore, normalizar_nombre
+from base_datos_store import BaseDatosStore, normalizar_texto
+
+# Categorías por defecto sin evento configurado: edad máxima de cada una (la última no tiene tope)
+DEFAULT_CATEGORY_MAX_AGES = np.array([8, 9, 10, 11, 12, 13, 14, 15, 17])
+DEFAULT_CATEGORY_NAMES = [
+    "PRE-INFANTIL A", "PRE-INFANTIL B", "INFANTIL A", "INFANTIL B", "JUVENIL A",
+    "JUVENIL B", "JUNIOR A", "JUNIOR B", "SENIOR", "MASTER"
+]
 
 class SwimmerRegistration:
     def __init__(self):
         self.archivo_inscripcion = 'planilla_inscripcion.xlsx'
         self.archivo_base_datos = 'BASE-DE-DATOS.xlsx'
+        # Las inscripciones viven en SQLite; el .xlsx se exporta bajo demanda
+        self.store = RegistroStore(self.archivo_inscripcion)
+        # BASE-DE-DATOS.xlsx compilada a SQLite (se recompila sola si el Excel cambia)
+        self.base_datos = BaseDatosStore(self.archivo_base_datos)
         self.swimming_events = [
             "25M PATADA LIBRE",
             "25M LIBRE CON TABLA",
@@ -229,76 +243,37 @@ class SwimmerRegistration:
                     age = calculated_age
 
         age = int(age)
+        return self.resolve_categories_for_ages([age], [gender])[0]
 
-        # Si tenemos event manager configurado, usar las categorías del evento
-        if self.event_manager:
-            event_categories = self.get_event_categories()
-            if event_categories:
-                # Buscar la categoría correspondiente en las configuradas para el evento
-                for category in event_categories:
-                    category_name = category.get('name', '')
-                    age_range = category.get('age_range', '')
-
-                    if age_range:
-                        # Parsear el rango de edad
-                        min_age, max_age = self.event_manager.parse_age_range(age_range)
-                        if min_age is not None and max_age is not None:
-                            if min_age <= age <= max_age:
-                                return category_name
-
-                # Si no encuentra coincidencia en las categorías del evento, informar
-                return f"EDAD {age} NO CONFIGURADA"
-
-        # Lógica de categorías por defecto (fallback)
-        if gender.upper() == 'M':  # Masculino
-            if age <= 8:
-                return "PRE-INFANTIL A"
-            elif age <= 9:
-                return "PRE-INFANTIL B"
-            elif age <= 10:
-                return "INFANTIL A"
-            elif age <= 11:
-                return "INFANTIL B"
-            elif age <= 12:
-                return "JUVENIL A"
-            elif age <= 13:
-                return "JUVENIL B"
-            elif age <= 14:
-                return "JUNIOR A"
-            elif age <= 15:
-                return "JUNIOR B"
-            elif age <= 17:
-                return "SENIOR"
-            else:
-                return "MASTER"
-        else:  # Femenino
-            if age <= 8:
-                return "PRE-INFANTIL A"
-            elif age <= 9:
-                return "PRE-INFANTIL B"
-            elif age <= 10:
-                return "INFANTIL A"
-            elif age <= 11:
-                return "INFANTIL B"
-            elif age <= 12:
-                return "JUVENIL A"
-            elif age <= 13:
-                return "JUVENIL B"
-            elif age <= 14:
-                return "JUNIOR A"
-            elif age <= 15:
-                return "JUNIOR B"
-            elif age <= 17:
-                return "SENIOR"
-            else:
-                return "MASTER"
+    def resolve_categories_for_ages(self, ages, genders=None):
+        """
+        Categoría para una columna completa de edades usando el resolvedor compilado del
+        evento (tabla edad → categoría). Sin categorías configuradas se usan las categorías
+        por defecto (iguales para ambos sexos, por eso ``genders`` no cambia el resultado).
+        Edades sin categoría en el evento devuelven "EDAD N NO CONFIGURADA".
+        """
+        ages = pd.to_numeric(pd.Series(list(ages), dtype=object), errors='coerce')
+
+        if self.event_manager and self.event_manager.get_categories():
+            resolved = self.event_manager.resolve_categories(ages)
+            return [
+                name if name is not None else (f"EDAD {int(age)} NO CONFIGURADA" if pd.notna(age) else None)
+                for name, age in zip(resolved, ages)
+            ]
+
+        # Lógica de categorías por defecto (fallback): límite superior de edad de cada categoría
+        positions = np.searchsorted(DEFAULT_CATEGORY_MAX_AGES, ages.fillna(0).astype(int).to_numpy(), side='left')
+        return [
+            DEFAULT_CATEGORY_NAMES[position] if pd.notna(age) else None
+            for position, age in zip(positions, ages)
+        ]
     
     def _normalize_planilla_time_cell(self, time_value):
         """
         Convierte una celda de Excel (texto mm:ss,00, número, fecha/hora, Timestamp)
         a string que validate_time_format puede interpretar (coma decimal → punto).
         """
-        if time_value is None:
+        if time_value is None or isinstance(time_value, bool):
             return None
         try:
             if pd.isna(time_value):
@@ -310,71 +285,15 @@ class SwimmerRegistration:
             s = time_value.strip()
             if not s or s.lower() in ('nan', 'none', 'null'):
                 return None
-            if ''.join(s.split()).lower() == 's/t':
+            if es_sin_tiempo(s):
                 return 's/t'
             return s.replace(',', '.')
 
-        if isinstance(time_value, bool):
-            return None
-
-        if isinstance(time_value, timedelta):
-            total = float(time_value.total_seconds())
-            if total < 0:
-                total = 0.0
-            minutes = int(total // 60)
-            seconds = total % 60
-            return f"{minutes:02d}:{seconds:05.2f}"
-
-        if isinstance(time_value, time):
-            total = (
-                time_value.hour * 3600
-                + time_value.minute * 60
-                + time_value.second
-                + time_value.microsecond / 1_000_000.0
-            )
-            minutes = int(total // 60)
-            seconds = total % 60
-            return f"{minutes:02d}:{seconds:05.2f}"
-
-        if isinstance(time_value, datetime):
-            total = (
-                time_value.hour * 3600
-                + time_value.minute * 60
-                + time_value.second
-                + time_value.microsecond / 1_000_000.0
-            )
-            minutes = int(total // 60)
-            seconds = total % 60
-            return f"{minutes:02d}:{seconds:05.2f}"
-
-        if isinstance(time_value, np.datetime64):
-            ts = pd.Timestamp(time_value)
-            if pd.isna(ts):
-                return None
-            total = (
-                int(ts.hour) * 3600
-                + int(ts.minute) * 60
-                + int(ts.second)
-                + ts.microsecond / 1_000_000.0
-            )
-            minutes = int(total // 60)
-            seconds = total % 60
-            return f"{minutes:02d}:{seconds:05.2f}"
-
-        try:
-            val = float(time_value)
-        except (TypeError, ValueError):
-            s = str(time_value).strip().replace(',', '.')
-            return s if s else None
-
-        # Fracción de día (tiempo solo en Excel: 0 < x < 1)
-        if 0 < val < 1.0:
-            total = val * 86400.0
-        else:
-            total = val
-        minutes = int(total // 60)
-        seconds = total % 60
-        return f"{minutes:02d}:{seconds:05.2f}"
+        formatted = formatear_segundos(parse_time(time_value))
+        if formatted is not None:
+            return formatted
+        s = str(time_value).strip().replace(',', '.')
+        return s if s else None
 
     def validate_time_format(self, time_str):
         if not time_str or time_str.strip() == "":
@@ -443,14 +362,30 @@ class SwimmerRegistration:
         return False, f"Formato de tiempo inválido: '{time_str}'. Use MM:SS,dd o MM:SS.dd"
     
     def load_existing_data(self):
-        if os.path.exists(self.archivo_inscripcion):
-            try:
-                df = pd.read_excel(self.archivo_inscripcion)
-                return normalize_planilla_columns(df)
-            except Exception as e:
-                print(f"Error al cargar datos existentes: {e}")
-                return None
-        return None
+        try:
+            df = self.store.cargar_dataframe()
+        except Exception as e:
+            print(f"Error al cargar datos existentes: {e}")
+            return None
+        if df is None:
+            return None
+        return normalize_planilla_columns(df)
+
+    def export_registration_file(self, force=False):
+        """Exporta planilla_inscripcion.xlsx desde el almacén si hubo cambios"""
+        try:
+            self.store.exportar_excel(forzar=force)
+            return True, f"Planilla exportada: {self.archivo_inscripcion}"
+        except Exception as e:
+            return False, f"Error al exportar planilla: {e}"
+
+    def clear_registrations(self):
+        """Elimina todas las inscripciones (almacén y planilla exportada)"""
+        try:
+            self.store.limpiar()
+            return True, "✅ Inscripciones eliminadas"
+        except Exception as e:
+            return False, f"Error al limpiar: {e}"
 
     def _normalize_events_dict(self, events):
         normalized = {}
@@ -460,10 +395,11 @@ class SwimmerRegistration:
                 normalized[key] = time_val
         return normalized
 
-    def complete_category_events(self, category, age, events=None):
+    def complete_category_events(self, category, age, events=None, category_events=None):
         """Inscribe en todas las pruebas de la categoría; sin tiempo queda como s/t."""
         events = self._normalize_events_dict(events)
-        category_events = self.get_available_events_for_swimmer_category(category, age)
+        if category_events is None:
+            category_events = self.get_available_events_for_swimmer_category(category, age)
         if not category_events:
             return events
 
@@ -498,89 +434,43 @@ class SwimmerRegistration:
 
     def find_swimmer_category_by_age_and_gender(self, age, gender):
         """Buscar la categoría apropiada para un nadador basándose en edad y género"""
-        if self.event_manager:
-            event_categories = self.event_manager.get_categories()
-
-            # Si hay categorías configuradas en el evento, intentar encontrar una que coincida
-            for category in event_categories:
-                # Si la categoría tiene rango de edad específico, intentar parsearlo
-                age_range = category.get('age_range', '').strip()
-                if age_range and self._age_matches_range(age, age_range):
-                    return category['name']
-
-        return self.get_category_by_age(age, gender)
-
-    def _age_matches_range(self, age, age_range):
-        """Verificar si una edad coincide con un rango de edad textual"""
-        try:
-            # Buscar patrones como "12-13", "12 a 13", "12-13 años", etc.
-            import re
-
-            # Patrón para rango: "12-13", "12 a 13", "12 - 13"
-            range_pattern = r'(\d+)[\s]*[-aA]\s*(\d+)'
-            match = re.search(range_pattern, age_range)
-
-            if match:
-                min_age = int(match.group(1))
-                max_age = int(match.group(2))
-                return min_age <= age <= max_age
-
-            # Patrón para edad específica: "12", "12 años"
-            single_pattern = r'(\d+)'
-            match = re.search(single_pattern, age_range)
-
-            if match:
-                target_age = int(match.group(1))
-                return age == target_age
-
-        except (ValueError, AttributeError):
-            pass
-
-        return False
+        return self.resolve_categories_for_ages([age], [gender])[0]
 
     def create_empty_registration_file(self):
         available_events = self.get_available_events()
         columns = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO', 'FECHA DE NA'] + available_events
-        df = pd.DataFrame(columns=columns)
 
         try:
-            df.to_excel(self.archivo_inscripcion, index=False)
+            self.store.crear_vacia(columns)
+            self.store.exportar_excel(forzar=True)
             return True, "Archivo de inscripción creado exitosamente"
         except Exception as e:
             return False, f"Error al crear archivo: {e}"
     
     def check_duplicate_swimmer(self, swimmer_name):
         """Verificar si el nadador ya está inscrito"""
-        df = self.load_existing_data()
-        if df is None or df.empty:
+        # Búsqueda indexada por nombre normalizado (sin mayúsculas ni espacios extra)
+        encontrado = self.store.buscar_por_nombre(swimmer_name)
+        if encontrado is None:
             return False, None
-        
-        # Buscar nombres similares (exacto o muy parecido)
-        name_lower = swimmer_name.lower().strip()
-        for index, row in df.iterrows():
-            existing_name = str(row['NOMBRE Y AP']).lower().strip()
-            if existing_name == name_lower:
-                return True, {
-                    'index': index,
-                    'name': row['NOMBRE Y AP'],
-                    'team': row['EQUIPO'],
-                    'age': row['EDAD'],
-                    'category': row['CAT.'],
-                    'gender': row['SEXO'],
-                    'birth_date': row.get('FECHA DE NA', '')
-                }
-        
-        return False, None
+
+        index, row = encontrado
+        return True, {
+            'index': index,
+            'name': row.get('NOMBRE Y AP'),
+            'team': row.get('EQUIPO'),
+            'age': row.get('EDAD'),
+            'category': row.get('CAT.'),
+            'gender': row.get('SEXO'),
+            'birth_date': row.get('FECHA DE NA', '')
+        }
     
     def add_swimmer(self, swimmer_data, force_add=False):
         try:
-            df_existing = self.load_existing_data()
-            
-            if df_existing is None:
+            if not self.store.existe():
                 success, message = self.create_empty_registration_file()
                 if not success:
                     return False, message, None
-                df_existing = self.load_existing_data()
             
             # Verificar duplicados si no se fuerza la adición
             if not force_add:
@@ -607,8 +497,7 @@ class SwimmerRegistration:
                 if time and time.strip():
                     new_row[event] = time
                     
-            new_df = pd.concat([df_existing, pd.DataFrame([new_row])], ignore_index=True)
-            new_df.to_excel(self.archivo_inscripcion, index=False)
+            self.store.agregar(new_row)
             
             events_count = len(swimmer_data['events'])
             success_msg = f"✅ {swimmer_data['name']} inscrito exitosamente con {events_count} prueba(s)"
@@ -620,16 +509,14 @@ class SwimmerRegistration:
     
     def update_swimmer(self, index, swimmer_data):
         try:
-            df = self.load_existing_data()
-            if df is None or index >= len(df):
-                return False, "Nadador no encontrado"
-            
-            df.loc[index, 'NOMBRE Y AP'] = swimmer_data['name']
-            df.loc[index, 'EQUIPO'] = swimmer_data['team']
-            df.loc[index, 'EDAD'] = swimmer_data['age']
-            df.loc[index, 'CAT.'] = swimmer_data['category']
-            df.loc[index, 'SEXO'] = swimmer_data['gender']
-            df.loc[index, 'FECHA DE NA'] = swimmer_data.get('birth_date', '')
+            cambios = {
+                'NOMBRE Y AP': swimmer_data['name'],
+                'EQUIPO': swimmer_data['team'],
+                'EDAD': swimmer_data['age'],
+                'CAT.': swimmer_data['category'],
+                'SEXO': swimmer_data['gender'],
+                'FECHA DE NA': swimmer_data.get('birth_date', '')
+            }
 
             swimmer_data['events'] = self.complete_category_events(
                 swimmer_data['category'],
@@ -639,11 +526,12 @@ class SwimmerRegistration:
             
             for event, time in swimmer_data['events'].items():
                 if time and time.strip():
-                    df.loc[index, event] = time
+                    cambios[event] = time
                 else:
-                    df.loc[index, event] = None
-                    
-            df.to_excel(self.archivo_inscripcion, index=False)
+                    cambios[event] = None
+
+            if not self.store.actualizar(index, cambios):
+                return False, "Nadador no encontrado"
             return True, "Nadador actualizado exitosamente"
             
         except Exception as e:
@@ -651,12 +539,8 @@ class SwimmerRegistration:
     
     def delete_swimmer(self, index):
         try:
-            df = self.load_existing_data()
-            if df is None or index >= len(df):
+            if not self.store.eliminar(index):
                 return False, "Nadador no encontrado"
-            
-            df = df.drop(index=index).reset_index(drop=True)
-            df.to_excel(self.archivo_inscripcion, index=False)
             return True, "Nadador eliminado exitosamente"
             
         except Exception as e:
@@ -1638,129 +1522,32 @@ class SwimmerRegistration:
     # ===== MÉTODOS PARA BÚSQUEDA EN BASE DE DATOS =====
     
     def load_database(self):
-        """Cargar la base de datos desde FPROYECCION 2025T, M. PROYECCION 2025 y ATLETAS combinadas"""
-        if not os.path.exists(self.archivo_base_datos):
-            return None, f"No se encontró el archivo {self.archivo_base_datos}"
-
-        try:
-            xl_file = pd.ExcelFile(self.archivo_base_datos)
-
-            # Primero cargar la hoja ATLETAS para obtener fechas de nacimiento
-            atletas_df = None
-            if 'ATLETAS' in xl_file.sheet_names:
-                try:
-                    atletas_df = pd.read_excel(self.archivo_base_datos, sheet_name='ATLETAS', header=0)
-                    print(f"Hoja ATLETAS cargada con {len(atletas_df)} registros")
-                except Exception as e:
-                    print(f"Error al cargar hoja ATLETAS: {e}")
-
-            dfs_to_combine = []
-            sheets_loaded = []
-
-            # Hojas objetivo (femenino y masculino)
-            target_sheets = ['FPROYECCION 2025T', 'M. PROYECCION 2025']
-
-            for sheet_name in target_sheets:
-                try:
-                    if sheet_name in xl_file.sheet_names:
-                        df_sheet = pd.read_excel(self.archivo_base_datos, sheet_name=sheet_name, header=0)
-
-                        # Filtrar columnas relevantes (evitar duplicaciones)
-                        relevant_columns = ['ATLETA', 'EQUIPO', 'CATEGORIA', 'SEXO', 'EDAD', 'PRUEBA', 'TIEMPO', 'F. COMPETENCIA']
-                        available_columns = [col for col in relevant_columns if col in df_sheet.columns]
-
-                        if available_columns and len(df_sheet) > 0:
-                            df_filtered = df_sheet[available_columns].copy()
-
-                            # Si tenemos la hoja ATLETAS, hacer merge para obtener fechas de nacimiento
-                            if atletas_df is not None and 'ATLETA' in df_filtered.columns:
-                                # Buscar columnas de fecha de nacimiento en ATLETAS
-                                birth_date_columns = []
-                                for col in atletas_df.columns:
-                                    if any(keyword in col.upper() for keyword in ['NACIMIENTO', 'BIRTH', 'FECHA']):
-                                        birth_date_columns.append(col)
-
-                                if birth_date_columns and 'ATLETA' in atletas_df.columns:
-                                    # Preparar DataFrame de atletas para merge
-                                    try:
-                                        atletas_merge = atletas_df[['ATLETA'] + birth_date_columns].copy()
-                                        # Limpiar nombres para mejor matching
-                                        atletas_merge['ATLETA_CLEAN'] = atletas_merge['ATLETA'].astype(str).str.strip().str.upper()
-                                        df_filtered['ATLETA_CLEAN'] = df_filtered['ATLETA'].astype(str).str.strip().str.upper()
-
-                                        # Hacer merge
-                                        df_merged = df_filtered.merge(
-                                            atletas_merge,
-                                            left_on='ATLETA_CLEAN',
-                                            right_on='ATLETA_CLEAN',
-                                            how='left',
-                                            suffixes=('', '_ATLETAS')
-                                        )
-
-                                        # Limpiar columnas auxiliares
-                                        df_merged = df_merged.drop(['ATLETA_CLEAN', 'ATLETA_ATLETAS'], axis=1, errors='ignore')
-
-                                        # Verificar si el merge fue exitoso
-                                        merged_count = df_merged[birth_date_columns[0]].notna().sum()
-                                        total_count = len(df_merged)
-
-                                        print(f"Merge con ATLETAS - {sheet_name}: {merged_count}/{total_count} registros con fecha de nacimiento")
-
-                                        df_filtered = df_merged
-                                    except Exception as e:
-                                        print(f"Error en merge con ATLETAS para {sheet_name}: {e}")
-                                        # Continuar sin las fechas de nacimiento si falla el merge
-
-                            dfs_to_combine.append(df_filtered)
-                            sheets_loaded.append(sheet_name)
-                except Exception as e:
-                    print(f"Error al cargar hoja {sheet_name}: {e}")
-                    continue
-            
-            # Si no se pudieron cargar las hojas objetivo, buscar alternativas
-            if not dfs_to_combine:
-                for sheet in xl_file.sheet_names:
-                    if any(keyword in sheet.upper() for keyword in ['PROYECCION', '2025', 'FPROYECCION']):
-                        try:
-                            df = pd.read_excel(self.archivo_base_datos, sheet_name=sheet, header=0)
-                            if 'ATLETA' in df.columns:
-                                dfs_to_combine.append(df)
-                                sheets_loaded.append(sheet)
-                                break
-                        except:
-                            continue
-            
-            # Combinar las hojas cargadas
-            if dfs_to_combine:
-                combined_df = pd.concat(dfs_to_combine, ignore_index=True)
-                # Eliminar duplicados basados en atleta, prueba y tiempo
-                combined_df = combined_df.drop_duplicates(subset=['ATLETA', 'PRUEBA', 'TIEMPO'], keep='first')
-                
-                return combined_df, f"Base de datos cargada: {len(combined_df)} registros de {len(sheets_loaded)} hojas ({', '.join(sheets_loaded)})"
-            else:
-                return None, "No se pudieron cargar datos de las hojas de la base de datos"
-                
-        except Exception as e:
-            return None, f"Error al cargar base de datos: {e}"
+        """Cargar la base de datos (FPROYECCION 2025T, M. PROYECCION 2025 y ATLETAS combinadas) desde el almacén compilado"""
+        return self.base_datos.cargar()
     
-    def search_swimmer_in_database(self, search_term):
-        """Buscar nadador en la base de datos por nombre, filtrando por categorías del evento"""
+    def search_swimmer_in_database(self, search_term, max_results=20):
+        """Buscar nadador en la base de datos por nombre (aproximado, sin tildes), filtrando por categorías del evento"""
         try:
-            df, message = self.load_database()
-            if df is None:
-                return [], message
-
-            # Buscar en la columna ATLETA
-            if 'ATLETA' not in df.columns:
-                return [], "No se encontró columna ATLETA en la base de datos"
-
-            # Buscar coincidencias por nombre
             search_term = search_term.lower().strip()
             if not search_term:
                 return [], "Ingrese un término de búsqueda válido"
 
-            name_mask = df['ATLETA'].astype(str).str.lower().str.contains(search_term, na=False, regex=False)
-            matching_rows = df[name_mask]
+            if not self.base_datos.disponible():
+                return [], f"No se encontró el archivo {self.archivo_base_datos}"
+
+            # Índice de trigramas: atletas únicos ordenados por relevancia. Se piden más
+            # candidatos de los que se muestran porque el filtro de edad puede descartar algunos
+            ranked = self.base_datos.buscar_atletas(search_term, limite=max_results * 5)
+            if not ranked:
+                return [], f"No se encontraron atletas con el nombre '{search_term}'"
+            ranking = {r['nombre_norm']: (pos, r['puntaje']) for pos, r in enumerate(ranked)}
+
+            matching_rows = self.base_datos.registros_de_atletas([r['nombre'] for r in ranked])
+            if matching_rows is None:
+                return [], "No se pudieron cargar datos de las hojas de la base de datos"
+
+            if 'ATLETA' not in matching_rows.columns:
+                return [], "No se encontró columna ATLETA en la base de datos"
 
             if matching_rows.empty:
                 return [], f"No se encontraron atletas con el nombre '{search_term}'"
@@ -1798,29 +1585,30 @@ class SwimmerRegistration:
                         break
 
                 if birth_date_column:
-                    # Filtrar por edad calculada desde fecha de nacimiento
-                    valid_rows = []
+                    # Filtrar por edad calculada desde fecha de nacimiento (una vez por atleta)
+                    valid_athletes = []
                     debug_info = []
 
-                    for idx, row in matching_rows.iterrows():
-                        birth_date = row.get(birth_date_column)
-                        athlete_name = row.get('ATLETA', 'N/A')
+                    athletes = matching_rows.drop_duplicates(subset=['ATLETA'])
+                    athlete_ages = []
+                    for birth_date in athletes[birth_date_column]:
+                        if birth_date and not pd.isna(birth_date):
+                            athlete_ages.append(self.calculate_age_by_criteria(birth_date, event_start_date, age_criteria))
+                        else:
+                            athlete_ages.append(None)
+
+                    # Categoría de todas las edades en una sola consulta al resolvedor compilado
+                    athlete_categories = self.event_manager.resolve_categories(athlete_ages)
+                    age_ranges = {cat.get('name', ''): cat.get('age_range', '') for cat in event_categories}
 
+                    for athlete_name, birth_date, calculated_age, category_name in zip(
+                            athletes['ATLETA'], athletes[birth_date_column], athlete_ages, athlete_categories):
                         if birth_date and not pd.isna(birth_date):
-                            calculated_age = self.calculate_age_by_criteria(birth_date, event_start_date, age_criteria)
                             if calculated_age:
                                 debug_info.append(f"{athlete_name}: {birth_date} → edad {calculated_age}")
-                                # Buscar categoría correspondiente
-                                for category in event_categories:
-                                    category_name = category.get('name', '')
-                                    age_range = category.get('age_range', '')
-                                    if age_range:
-                                        min_age, max_age = self.event_manager.parse_age_range(age_range)
-                                        if min_age is not None and max_age is not None:
-                                            if min_age <= calculated_age <= max_age:
-                                                valid_rows.append(idx)
-                                                debug_info.append(f"  ✓ Válido para categoría {category_name} ({age_range})")
-                                                break
+                                if category_name is not None:
+                                    valid_athletes.append(athlete_name)
+                                    debug_info.append(f"  ✓ Válido para categoría {category_name} ({age_ranges.get(category_name, '')})")
                                 else:
                                     debug_info.append(f"  ✗ No válido para ninguna categoría del evento")
                             else:
@@ -1832,9 +1620,9 @@ class SwimmerRegistration:
                     for info in debug_info[:10]:  # Mostrar solo los primeros 10 para no saturar
                         print(f"  {info}")
 
-                    if valid_rows:
-                        matching_rows = matching_rows.loc[valid_rows]
-                        print(f"Resultado final: {len(valid_rows)} nadadores válidos de {len(debug_info)} evaluados")
+                    if valid_athletes:
+                        matching_rows = matching_rows[matching_rows['ATLETA'].isin(valid_athletes)]
+                        print(f"Resultado final: {len(valid_athletes)} nadadores válidos de {len(debug_info)} evaluados")
                     else:
                         return [], f"No se encontraron nadadores de '{search_term}' con edades válidas para las categorías del evento. Criterio: {age_criteria}"
 
@@ -1846,13 +1634,19 @@ class SwimmerRegistration:
                     if matching_rows.empty:
                         return [], f"No se encontraron nadadores de '{search_term}' en las categorías del evento: {', '.join(event_category_names)}"
 
-            # Agrupar por atleta único (pueden tener múltiples registros por diferentes pruebas)
-            unique_athletes = matching_rows['ATLETA'].unique()
+            # Agrupar por atleta único (pueden tener múltiples registros por diferentes pruebas),
+            # en el orden de relevancia de la búsqueda
+            records_by_athlete = dict(tuple(matching_rows.groupby('ATLETA', sort=False)))
+            sin_rango = (len(ranking), 0)
+            unique_athletes = sorted(
+                records_by_athlete,
+                key=lambda name: ranking.get(normalizar_texto(name), sin_rango)[0]
+            )[:max_results]
 
             matches = []
             for athlete_name in unique_athletes:
                 # Tomar el primer registro para información básica
-                athlete_records = matching_rows[matching_rows['ATLETA'] == athlete_name]
+                athlete_records = records_by_athlete[athlete_name]
                 first_record = athlete_records.iloc[0]
 
                 # Calcular edad actualizada si hay fecha de nacimiento
@@ -1879,6 +1673,7 @@ class SwimmerRegistration:
                     'name': athlete_name,
                     'full_data': first_record,  # Información básica del primer registro
                     'all_records': athlete_records,  # Todos los registros del atleta
+                    'score': ranking.get(normalizar_texto(athlete_name), sin_rango)[1],
                 }
 
                 # Agregar edad calculada si está disponible
@@ -1899,52 +1694,18 @@ class SwimmerRegistration:
             return [], f"Error procesando búsqueda: {str(e)}"
     
     def get_swimmer_latest_times(self, swimmer_data):
-        """Obtener los tiempos del nadador agrupando todos sus registros"""
-        df, message = self.load_database()
-        if df is None:
-            return {}, message
+        """Obtener el mejor tiempo del nadador por prueba desde la tabla precalculada de la base de datos"""
+        if not self.base_datos.disponible():
+            return {}, f"No se encontró el archivo {self.archivo_base_datos}"
 
-        # Buscar todos los registros del atleta
-        mask = df['ATLETA'].astype(str).str.lower().str.contains(swimmer_data['name'].lower(), na=False, regex=False)
-        swimmer_records = df[mask]
+        try:
+            best_times = self.base_datos.mejores_tiempos(swimmer_data['name'])
+        except Exception as e:
+            return {}, f"Error al cargar base de datos: {e}"
 
-        if swimmer_records.empty:
+        if not best_times:
             return {}, f"No se encontraron registros para {swimmer_data['name']}"
 
-        # Mapear pruebas de la base de datos a eventos del sistema
-        # Usamos mapeo directo ya que los nombres deben coincidir exactamente
-        prueba_mappings = {
-            '25M PATADA LIBRE': '25M PATADA LIBRE',
-            '25M LIBRE CON TABLA': '25M LIBRE CON TABLA',
-            '25M LIBRE INSTINTIVO': '25M LIBRE INSTINTIVO',
-            '25M LIBRE': '25M LIBRE',
-            '25M PECHO': '25M PECHO',
-            '25M MARIPOSA': '25M MARIPOSA',
-            '50M LIBRE CON ALETAS': '50M LIBRE CON ALETAS',
-            '50M LIBRE': '50M LIBRE',
-            '100M LIBRE': '100M LIBRE',
-            '200M LIBRE': '200M LIBRE',
-            '400M LIBRE': '400M LIBRE',
-            '50M ESPALDA': '50M ESPALDA',
-            '100M ESPALDA': '100M ESPALDA',
-            '200M ESPALDA': '200M ESPALDA',
-            '50M PECHO': '50M PECHO',
-            '100M PECHO': '100M PECHO',
-            '200M PECHO': '200M PECHO',
-            '50M MARIPOSA': '50M MARIPOSA',
-            '100M MARIPOSA': '100M MARIPOSA',
-            '200M MARIPOSA': '200M MARIPOSA',
-            '200M COMBINADO INDIVIDUAL': '200M COMBINADO INDIVIDUAL',
-            '400M COMBINADO INDIVIDUAL': '400M COMBINADO INDIVIDUAL',
-            # Mapeos adicionales para variaciones en la base de datos
-            '50M CROLL': '50M LIBRE',
-            '100M CROLL': '100M LIBRE',
-            '200M CROLL': '200M LIBRE',
-            '400M CROLL': '400M LIBRE',
-            '200M COMBINADO': '200M COMBINADO INDIVIDUAL',
-            '400M COMBINADO': '400M COMBINADO INDIVIDUAL'
-        }
-
         # Obtener pruebas disponibles del evento
         available_events = self.get_available_events()
 
@@ -1955,110 +1716,22 @@ class SwimmerRegistration:
             if category_events:
                 available_events = category_events
 
-        # Procesar cada registro y extraer tiempos
-        times_by_event = {}
-
-        for _, record in swimmer_records.iterrows():
-            prueba = record.get('PRUEBA', '')
-            tiempo = record.get('TIEMPO', '')
-            fecha = record.get('F. COMPETENCIA', '')
-
-            if pd.notna(prueba) and pd.notna(tiempo):
-                prueba_str = str(prueba).strip()
-                tiempo_str = str(tiempo).strip()
-
-                # Buscar el evento del sistema que coincide
-                system_event = None
-                prueba_upper = prueba_str.upper().strip()
-
-                # Primero buscar coincidencia exacta en el mapeo
-                if prueba_upper in prueba_mappings:
-                    system_event = prueba_mappings[prueba_upper]
-                else:
-                    # Buscar coincidencias aproximadas
-                    for db_prueba, sys_event_mapped in prueba_mappings.items():
-                        if (prueba_upper == db_prueba.upper() or
-                            prueba_upper.replace(' ', '') == db_prueba.upper().replace(' ', '')):
-                            system_event = sys_event_mapped
-                            break
-
-                # Solo incluir si el evento está disponible en el evento actual
-                if system_event and system_event in available_events and tiempo_str and tiempo_str not in ['0', '0.0', 'nan']:
-                    # Convertir tiempo a formato simple (MM:SS.dd)
-                    clean_time = self._clean_time_format(tiempo_str)
-                    if clean_time:
-                        # Si ya existe un tiempo para este evento, tomar el mejor
-                        if system_event in times_by_event:
-                            current_time = times_by_event[system_event]['tiempo']
-                            if self._compare_times(clean_time, current_time) < 0:  # Nuevo tiempo es mejor
-                                times_by_event[system_event] = {
-                                    'tiempo': clean_time,
-                                    'fecha': fecha,
-                                    'prueba_original': prueba_str
-                                }
-                        else:
-                            times_by_event[system_event] = {
-                                'tiempo': clean_time,
-                                'fecha': fecha,
-                                'prueba_original': prueba_str
-                            }
-
-        # Extraer solo los tiempos para retornar
-        latest_times = {event: data['tiempo'] for event, data in times_by_event.items()}
+        # Solo incluir pruebas disponibles en el evento actual, en formato MM:SS.dd
+        latest_times = {
+            event: formatear_segundos(data['segundos'])
+            for event, data in best_times.items()
+            if event in available_events
+        }
 
         return latest_times, f"Se encontraron {len(latest_times)} tiempos para {swimmer_data['name']}"
     
     def _clean_time_format(self, time_str):
         """Convertir tiempo a formato MM:SS.dd"""
-        try:
-            time_str = str(time_str).strip()
-            
-            # Si ya está en formato timestamp (HH:MM:SS.microseconds)
-            if ':' in time_str and len(time_str.split(':')) == 3:
-                parts = time_str.split(':')
-                minutes = int(parts[1])
-                seconds_part = parts[2]
-                if '.' in seconds_part:
-                    secs, microsecs = seconds_part.split('.')
-                    return f"{minutes}:{secs}.{microsecs[:2]}"
-                else:
-                    return f"{minutes}:{seconds_part}.00"
-            
-            # Si está en formato MM:SS.dd
-            elif ':' in time_str:
-                return time_str
-            
-            # Si es solo segundos
-            else:
-                seconds = float(time_str)
-                minutes = int(seconds // 60)
-                remaining_secs = seconds % 60
-                return f"{minutes}:{remaining_secs:06.3f}"
-                
-        except:
-            return None
+        return formatear_segundos(parse_time(time_str))
     
     def _compare_times(self, time1, time2):
         """Comparar dos tiempos en formato MM:SS.dd. Retorna -1 si time1 < time2, 1 si time1 > time2, 0 si iguales"""
-        try:
-            def time_to_seconds(time_str):
-                if ':' in time_str:
-                    parts = time_str.split(':')
-                    return int(parts[0]) * 60 + float(parts[1])
-                else:
-                    return float(time_str)
-            
-            secs1 = time_to_seconds(time1)
-            secs2 = time_to_seconds(time2)
-            
-            if secs1 < secs2:
-                return -1
-            elif secs1 > secs2:
-                return 1
-            else:
-                return 0
-        except:
-            return 0
+        return comparar_tiempos(time1, time2)
     
     def get_swimmer_info_from_database(self, swimmer_match):
         """Extraer información completa del nadador de la base de datos"""
@@ -2169,6 +1842,153 @@ class SwimmerRegistration:
         events_count = len(swimmer_data['events'])
         return swimmer_data, f"Nadador preparado con {events_count} prueba(s) de la categoría"
     
+    def prepare_club_from_database(self, team_name=None, athlete_names=None):
+        """
+        Preparar la inscripción de un club completo (o de una lista de nombres) desde la
+        base de datos, sin escribir nada. Devuelve (swimmers_data, report, message); el
+        reporte lista los nombres no encontrados en la base de datos y los atletas sin
+        sexo reconocible, que quedan fuera del lote.
+        """
+        report = {'no_encontrados': [], 'sin_sexo': []}
+        if not self.base_datos.disponible():
+            return [], report, f"No se encontró el archivo {self.archivo_base_datos}"
+
+        # Resolver todos los atletas con una sola consulta indexada
+        if team_name:
+            records = self.base_datos.registros_de_equipo(team_name)
+        else:
+            athlete_names = [n for n in (athlete_names or []) if str(n).strip()]
+            if not athlete_names:
+                return [], report, "Ingrese un equipo o una lista de nombres"
+            records = self.base_datos.registros_de_atletas(athlete_names)
+
+        if records is None:
+            return [], report, "No se pudieron cargar datos de las hojas de la base de datos"
+
+        if not records.empty:
+            records = records.assign(_NORM=records['ATLETA'].map(normalizar_texto))
+            records = records[records['_NORM'] != ''].drop_duplicates(subset=['_NORM'])
+
+        if athlete_names:
+            found = set(records['_NORM']) if not records.empty else set()
+            report['no_encontrados'] = [n for n in athlete_names if normalizar_texto(n) not in found]
+
+        if records.empty:
+            return [], report, "No se encontraron atletas en la base de datos"
+
+        # Sexo, fecha de nacimiento y edad de respaldo por columna (no por fila)
+        gender_map = {'M': 'M', 'MASCULINO': 'M', 'HOMBRE': 'M', 'MALE': 'M',
+                      'F': 'F', 'FEMENINO': 'F', 'MUJER': 'F', 'FEMALE': 'F'}
+        if 'SEXO' in records.columns:
+            genders = records['SEXO'].astype(str).str.strip().str.upper().map(gender_map)
+        else:
+            genders = pd.Series(None, index=records.index, dtype=object)
+
+        # Sin sexo no se puede asignar categoría ni serie: se informan y no se inscriben
+        sin_sexo = genders.isna()
+        if sin_sexo.any():
+            report['sin_sexo'] = records.loc[sin_sexo, 'ATLETA'].astype(str).str.strip().tolist()
+            records, genders = records[~sin_sexo], genders[~sin_sexo]
+            if records.empty:
+                return [], report, "Ninguno de los atletas tiene el sexo registrado en la base de datos"
+
+        birth_date_column = self._find_birth_date_column(records.columns)
+        birth_dates = records[birth_date_column] if birth_date_column else pd.Series(None, index=records.index, dtype=object)
+        fallback_ages = pd.to_numeric(records['EDAD'], errors='coerce') if 'EDAD' in records.columns else pd.Series(np.nan, index=records.index)
+
+        # Mejores tiempos de toda la nómina en una sola consulta
+        best_times = {}
+        best_df = self.base_datos.mejores_tiempos_de_atletas(records['ATLETA'].tolist())
+        for row in best_df.itertuples(index=False):
+            best_times.setdefault(row.nombre_norm, {})[row.prueba_sistema] = formatear_segundos(row.tiempo_seg)
+
+        reference_date, age_criteria = self.get_event_age_reference()
+        ages = []
+        clean_birth_dates = []
+        for birth_date, fallback_age in zip(birth_dates, fallback_ages):
+            if birth_date is not None and not isinstance(birth_date, str) and pd.isna(birth_date):
+                birth_date = None
+            age = self.calculate_age_by_criteria(birth_date, reference_date, age_criteria) if birth_date is not None else None
+            if age is None and pd.notna(fallback_age):
+                age = int(fallback_age)
+            ages.append(age)
+            clean_birth_dates.append(birth_date)
+
+        # Categorías de toda la nómina con el resolvedor compilado
+        categories = self.resolve_categories_for_ages(ages, genders)
+        swimmers_data = []
+
+        for position, (idx, row) in enumerate(records.iterrows()):
+            gender = genders.at[idx]
+            birth_date = clean_birth_dates[position]
+            age = ages[position]
+            category = categories[position] if age is not None else 'SIN EDAD'
+
+            team = row.get('EQUIPO')
+            swimmers_data.append({
+                'name': str(row['ATLETA']).strip(),
+                'team': str(team).strip() if pd.notna(team) and str(team).strip() else (team_name or 'Club TEN'),
+                'age': age,
+                'birth_date': birth_date,
+                'category': category,
+                'gender': gender,
+                'events': self.complete_category_events(category, age, best_times.get(row['_NORM'], {}))
+            })
+
+        return swimmers_data, report, f"{len(swimmers_data)} nadador(es) listos para inscribir"
+
+    def register_swimmers_batch(self, swimmers_data, skip_duplicates=True):
+        """
+        Inscribir varios nadadores en una sola escritura. Los ya inscritos (o repetidos en
+        el lote) se omiten si skip_duplicates. Devuelve (success, message, report).
+        """
+        report = {'inscritos': [], 'duplicados': []}
+        if not swimmers_data:
+            return False, "No hay nadadores para inscribir", report
+
+        try:
+            if not self.store.existe():
+                success, message = self.create_empty_registration_file()
+                if not success:
+                    return False, message, report
+
+            registered = self.store.nombres_normalizados() if skip_duplicates else set()
+            rows = []
+            for swimmer in swimmers_data:
+                key = normalizar_nombre(swimmer['name'])
+                if skip_duplicates and key in registered:
+                    report['duplicados'].append(swimmer['name'])
+                    continue
+                registered.add(key)
+
+                new_row = {
+                    'NOMBRE Y AP': swimmer['name'],
+                    'EQUIPO': swimmer['team'],
+                    'EDAD': swimmer['age'],
+                    'CAT.': swimmer['category'],
+                    'SEXO': swimmer['gender'],
+                    'FECHA DE NA': swimmer.get('birth_date', '')
+                }
+                for event, time in swimmer.get('events', {}).items():
+                    if time and str(time).strip():
+                        new_row[event] = time
+                rows.append(new_row)
+                report['inscritos'].append(swimmer['name'])
+
+            if rows:
+                self.store.agregar_filas(rows)
+
+            if rows:
+                message = f"✅ {len(report['inscritos'])} nadador(es) inscritos"
+            else:
+                message = "⚠️ Ningún nadador nuevo para inscribir"
+            if report['duplicados']:
+                message += f" · {len(report['duplicados'])} omitidos por estar ya inscritos"
+            return bool(rows), message, report
+
+        except Exception as e:
+            return False, f"Error al inscribir nadadores: {e}", report
+    
     def get_swimmer_for_editing(self, index):
         """Obtener datos de un nadador para edición"""
         df = self.load_existing_data()
@@ -2439,8 +2259,27 @@ class SwimmerRegistration:
             print(f"Error generando PDF: {str(e)}")
             return None
     
-    def bulk_import_from_excel(self, uploaded_file):
-        """Importa múltiples nadadores desde un archivo Excel"""
+    def _build_import_report_entry(self, row_number, swimmer_name, error_type, message, event=None, value=None):
+        return {
+            'fila': row_number,
+            'nombre': swimmer_name,
+            'tipo': error_type,
+            'prueba': event,
+            'valor': None if value is None else str(value),
+            'mensaje': message,
+        }
+
+    def bulk_import_from_excel(self, uploaded_file, chunk_size=500):
+        """
+        Importa múltiples nadadores desde un archivo Excel.
+
+        Las filas se validan por bloques de ``chunk_size`` con operaciones por columna,
+        los duplicados se comprueban contra un conjunto de nombres cargado una sola vez y
+        todo se guarda con una única escritura. Devuelve (success, message, report), donde
+        ``report`` es una lista de dicts por fila con problema (fila, nombre, tipo,
+        prueba, valor, mensaje).
+        """
+        report = []
         try:
             # Leer archivo Excel
             df = normalize_planilla_columns(pd.read_excel(uploaded_file))
@@ -2449,101 +2288,148 @@ class SwimmerRegistration:
             required_columns = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO']
             missing_columns = [col for col in required_columns if col not in df.columns]
             if missing_columns:
-                return False, f"Faltan columnas requeridas: {', '.join(missing_columns)}"
+                return False, f"Faltan columnas requeridas: {', '.join(missing_columns)}", report
 
             # Filtrar filas con datos válidos
             df = df.dropna(subset=['NOMBRE Y AP'])
 
             if len(df) == 0:
-                return False, "No se encontraron nadadores válidos en el archivo"
+                return False, "No se encontraron nadadores válidos en el archivo", report
 
             # Obtener pruebas disponibles del evento
             available_events = self.get_available_events()
+            event_columns = [event for event in available_events if event in df.columns]
+            has_birth_date = 'FECHA DE NA' in df.columns
+
+            # Nombres ya inscritos: una sola lectura del almacén
+            registered_names = self.store.nombres_normalizados()
+            reference_date, age_criteria = self.get_event_age_reference()
+
+            # Cachés por valor: fechas de nacimiento, celdas de tiempo y pruebas por categoría se repiten mucho
+            age_cache = {}
+            time_cache = {}
+            category_events_cache = {}
 
             imported_swimmers = []
             errors = []
             duplicates = []
             imported_names = []
 
-            # Procesar cada nadador
-            for index, row in df.iterrows():
-                try:
-                    swimmer_name = str(row['NOMBRE Y AP']).strip()
-                    if not swimmer_name or swimmer_name.lower() == 'nan':
-                        continue
+            def register_error(row_number, swimmer_name, error_type, message, event=None, value=None):
+                errors.append(message)
+                report.append(self._build_import_report_entry(row_number, swimmer_name, error_type, message, event, value))
+
+            for start in range(0, len(df), chunk_size):
+                chunk = df.iloc[start:start + chunk_size]
+
+                # Columnas básicas normalizadas en bloque
+                names = chunk['NOMBRE Y AP'].astype(str).str.strip()
+                teams = chunk['EQUIPO'].where(chunk['EQUIPO'].notna(), '').astype(str).str.strip()
+                genders = chunk['SEXO'].where(chunk['SEXO'].notna(), '').astype(str).str.strip().str.upper()
+                categories = chunk['CAT.'].where(chunk['CAT.'].notna(), '').astype(str).str.strip()
+                fallback_ages = pd.to_numeric(chunk['EDAD'], errors='coerce')
+                birth_dates = chunk['FECHA DE NA'] if has_birth_date else pd.Series(None, index=chunk.index, dtype=object)
+
+                # Tiempos: normalizar y validar cada valor distinto una sola vez por prueba
+                times_by_event = {}
+                for event in event_columns:
+                    column = chunk[event]
+                    enrolled = column.map(inscrito_en_prueba)
+                    validated = {}
+                    for value in dict.fromkeys(column[enrolled].tolist()):
+                        if value not in time_cache:
+                            time_str = self._normalize_planilla_time_cell(value)
+                            if time_str is None:
+                                time_cache[value] = (False, None)
+                            else:
+                                time_cache[value] = self.validate_time_format(time_str)
+                        validated[value] = time_cache[value]
+                    times_by_event[event] = (column, enrolled, validated)
 
-                    # Datos básicos del nadador
-                    team = str(row['EQUIPO']).strip() if pd.notna(row['EQUIPO']) else ""
-                    gender = str(row['SEXO']).strip().upper() if pd.notna(row['SEXO']) else ""
-                    birth_date = row.get('FECHA DE NA') if 'FECHA DE NA' in df.columns else None
-                    age = None
-                    if birth_date is not None and pd.notna(birth_date):
-                        age = self.resolve_age_from_birth_date(birth_date)
-                    if age is None and pd.notna(row['EDAD']):
-                        try:
-                            age = int(row['EDAD'])
-                        except (ValueError, TypeError):
-                            age = None
-                    category = str(row['CAT.']).strip() if pd.notna(row['CAT.']) else ""
+                for position, index in enumerate(chunk.index):
+                    row_number = index + 2
+                    try:
+                        swimmer_name = names.iat[position]
+                        if not swimmer_name or swimmer_name.lower() == 'nan':
+                            continue
 
-                    if age is None or age <= 0:
-                        errors.append(f"Fila {index + 2}: Edad inválida para {swimmer_name} (use FECHA DE NA o EDAD)")
-                        continue
+                        birth_date = birth_dates.iat[position]
+                        if birth_date is not None and not isinstance(birth_date, str) and pd.isna(birth_date):
+                            birth_date = None
+                        age = None
+                        if birth_date is not None:
+                            if birth_date not in age_cache:
+                                age_cache[birth_date] = self.calculate_age_by_criteria(birth_date, reference_date, age_criteria)
+                            age = age_cache[birth_date]
+                        if age is None and pd.notna(fallback_ages.iat[position]):
+                            age = int(fallback_ages.iat[position])
+
+                        gender = genders.iat[position]
+                        category = categories.iat[position]
+
+                        if age is None or age <= 0:
+                            register_error(row_number, swimmer_name, 'edad',
+                                           f"Fila {row_number}: Edad inválida para {swimmer_name} (use FECHA DE NA o EDAD)")
+                            continue
 
-                    if gender not in ['M', 'F']:
-                        errors.append(f"Fila {index + 2}: Sexo debe ser M o F para {swimmer_name}")
-                        continue
+                        if gender not in ['M', 'F']:
+                            register_error(row_number, swimmer_name, 'sexo',
+                                           f"Fila {row_number}: Sexo debe ser M o F para {swimmer_name}", value=gender)
+                            continue
 
-                    if not category:
-                        category = self.get_category_by_age(age, gender, birth_date)
+                        if not category:
+                            category = self.get_category_by_age(age, gender, birth_date)
 
-                    # Verificar si ya existe el nadador
-                    if os.path.exists(self.archivo_inscripcion):
-                        existing_df = pd.read_excel(self.archivo_inscripcion)
-                        if swimmer_name.lower() in existing_df['NOMBRE Y AP'].str.lower().values:
+                        # Verificar si ya existe el nadador (inscrito o repetido en el archivo)
+                        name_key = normalizar_nombre(swimmer_name)
+                        if name_key in registered_names:
                             duplicates.append(swimmer_name)
-                            errors.append(f"Fila {index + 2}: {swimmer_name} ya existe en la base de datos")
+                            register_error(row_number, swimmer_name, 'duplicado',
+                                           f"Fila {row_number}: {swimmer_name} ya existe en la base de datos")
                             continue
 
-                    # Procesar tiempos de las pruebas (solo las disponibles en el evento)
-                    events_data = {}
-                    for event in available_events:
-                        if event in df.columns and inscrito_en_prueba(row[event]):
-                            time_value = row[event]
-
-                            time_str = self._normalize_planilla_time_cell(time_value)
-                            if time_str is None:
-                                errors.append(
-                                    f"Fila {index + 2}: Valor de tiempo no reconocido '{time_value}' en {event} para {swimmer_name}"
-                                )
+                        # Procesar tiempos de las pruebas (solo las disponibles en el evento)
+                        events_data = {}
+                        for event, (column, enrolled, validated) in times_by_event.items():
+                            if not enrolled.iat[position]:
                                 continue
-
-                            # Validar formato de tiempo
-                            is_valid, validated_time = self.validate_time_format(time_str)
+                            time_value = column.iat[position]
+                            is_valid, validated_time = validated[time_value]
                             if is_valid:
                                 events_data[event] = validated_time
+                            elif validated_time is None:
+                                register_error(row_number, swimmer_name, 'tiempo',
+                                               f"Fila {row_number}: Valor de tiempo no reconocido '{time_value}' en {event} para {swimmer_name}",
+                                               event, time_value)
                             else:
-                                # Agregar información de error más específica
-                                errors.append(f"Fila {index + 2}: Formato de tiempo inválido '{time_value}' en {event} para {swimmer_name}")
-
-                    events_data = self.complete_category_events(category, age, events_data)
-
-                    new_swimmer = {
-                        'NOMBRE Y AP': swimmer_name,
-                        'EQUIPO': team,
-                        'EDAD': age,
-                        'CAT.': category,
-                        'SEXO': gender,
-                        'FECHA DE NA': birth_date if birth_date is not None and pd.notna(birth_date) else "",
-                        **{event: events_data.get(event, 's/t') for event in events_data}
-                    }
-
-                    imported_swimmers.append(new_swimmer)
-                    imported_names.append(swimmer_name)
+                                register_error(row_number, swimmer_name, 'tiempo',
+                                               f"Fila {row_number}: Formato de tiempo inválido '{time_value}' en {event} para {swimmer_name}",
+                                               event, time_value)
+
+                        if (category, age) not in category_events_cache:
+                            category_events_cache[(category, age)] = self.get_available_events_for_swimmer_category(category, age)
+                        events_data = self.complete_category_events(
+                            category, age, events_data, category_events=category_events_cache[(category, age)]
+                        )
 
-                except Exception as e:
-                    errors.append(f"Fila {index + 2}: Error procesando datos - {str(e)}")
-                    continue
+                        new_swimmer = {
+                            'NOMBRE Y AP': swimmer_name,
+                            'EQUIPO': teams.iat[position],
+                            'EDAD': age,
+                            'CAT.': category,
+                            'SEXO': gender,
+                            'FECHA DE NA': birth_date if birth_date is not None else "",
+                            **{event: events_data.get(event, 's/t') for event in events_data}
+                        }
+
+                        imported_swimmers.append(new_swimmer)
+                        imported_names.append(swimmer_name)
+                        registered_names.add(name_key)
+
+                    except Exception as e:
+                        register_error(row_number, names.iat[position], 'error',
+                                       f"Fila {row_number}: Error procesando datos - {str(e)}")
+                        continue
 
             # Determinar el resultado final
             total_processed = len(imported_swimmers) + len(duplicates) + (len(errors) - len(duplicates))
@@ -2581,9 +2467,9 @@ class SwimmerRegistration:
                             else:
                                 result_msg += f"\n• " + "\n• ".join(other_errors[:3]) + f"\n• ... y {len(other_errors) - 3} más"
 
-                    return True, result_msg
+                    return True, result_msg, report
                 else:
-                    return False, "Error guardando los datos importados"
+                    return False, "Error guardando los datos importados", report
 
             elif duplicates and len(errors) == len(duplicates):
                 # Solo hay duplicados, ningún nadador nuevo
@@ -2594,38 +2480,23 @@ class SwimmerRegistration:
                 else:
                     result_msg += f"\n• " + "\n• ".join(duplicates[:10])
                     result_msg += f"\n• ... y {len(duplicates) - 10} más"
-                return False, result_msg
+                return False, result_msg, report
 
             else:
                 # Solo errores, sin duplicados o con otros errores
-                return False, f"❌ No se pudo importar ningún nadador. Errores encontrados:\n• " + "\n• ".join(errors[:10])
+                return False, f"❌ No se pudo importar ningún nadador. Errores encontrados:\n• " + "\n• ".join(errors[:10]), report
 
         except Exception as e:
-            return False, f"Error leyendo el archivo: {str(e)}"
+            return False, f"Error leyendo el archivo: {str(e)}", report
     
     def save_swimmers_to_excel(self, swimmers_data):
-        """Guarda múltiples nadadores al archivo Excel"""
+        """Guarda múltiples nadadores en la planilla (una sola transacción)"""
         try:
-            # Cargar datos existentes o crear nuevo DataFrame
-            if os.path.exists(self.archivo_inscripcion):
-                existing_df = pd.read_excel(self.archivo_inscripcion)
-                new_df = pd.DataFrame(swimmers_data)
-                combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-            else:
-                combined_df = pd.DataFrame(swimmers_data)
-
-            # Asegurar que todas las columnas estén presentes
+            # Asegurar que todas las columnas del evento estén presentes
             available_events = self.get_available_events()
             all_columns = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO', 'FECHA DE NA'] + available_events
-            for col in all_columns:
-                if col not in combined_df.columns:
-                    combined_df[col] = ""
-
-            # Reordenar columnas
-            combined_df = combined_df[all_columns]
 
-            # Guardar archivo
-            combined_df.to_excel(self.archivo_inscripcion, index=False)
+            self.store.agregar_filas(swimmers_data, columnas=all_columns)
             return True
 
         except Exception as e:
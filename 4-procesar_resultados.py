@@ -4,244 +4,155 @@ import pandas as pd
 import json
 import os
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font, NamedStyle, PatternFill, Alignment
 from openpyxl.styles.borders import Border, Side
+from openpyxl.utils import get_column_letter
+from event_manager import EventManager
+from puntuacion import (
+    COLUMNAS_RESULTADOS,
+    como_enteros,
+    clasificar_resultados,
+    puntos_por_posicion,
+    puntos_resultados,
+)
+from puntuacion import comparar_esquemas  # reexportada: la app la usa como script3.comparar_esquemas
+from resultados_store import ResultadosStore
+from tiempos_utils import parse_times_series
 
 # --- CONFIGURACIÓN ---
 ARCHIVO_ENTRADA_RESULTADOS = 'resultados_con_tiempos.xlsx'
 ARCHIVO_SALIDA_PREMIACION = 'reporte_premiacion_final_CORREGIDO.xlsx'
 
-# Nuevo sistema de puntos: 1º=9, 2º=7, 3º=6, 4º=5, luego -1 por posición
-def calcular_puntos(posicion):
-    if posicion == 1:
-        return 9
-    elif posicion == 2:
-        return 7
-    elif posicion == 3:
-        return 6
-    elif posicion == 4:
-        return 5
-    else:
-        # A partir del 5º lugar, se resta 1 punto por posición (4, 3, 2, 1)
-        puntos = max(1, 5 - (posicion - 4))
-        return puntos
-
-def parse_time(time_val):
-    """Convierte tiempo a segundos para ordenamiento"""
-    if pd.isna(time_val) or time_val == "" or time_val is None:
-        return float('inf')
-
-    if hasattr(time_val, 'minute'):
-        return time_val.minute * 60 + time_val.second + time_val.microsecond / 1_000_000
-
-    time_str = str(time_val).replace(',', '.')
-    try:
-        parts = time_str.split(':')
-        if len(parts) == 2:
-            return int(parts[0]) * 60 + float(parts[1])
-        return float(time_str)
-    except (ValueError, IndexError):
-        return float('inf')
+# Estilos del reporte de premiación (registrados una vez por libro)
+ESTILO_ENCABEZADO_RESULTADOS = 'premiacion_encabezado_resultados'
+ESTILO_ENCABEZADO_EQUIPOS = 'premiacion_encabezado_equipos'
+COLORES_MEDALLAS = {1: "FFD700", 2: "C0C0C0", 3: "CD7F32"}  # oro, plata, bronce
 
 def leer_tiempos_competencia_desde_sembrado():
-    """Lee los tiempos de competencia desde los archivos de sembrado manual"""
-    todos_resultados = []
-
-    # Buscar todos los archivos de sembrado manual en session_state
-    import streamlit as st
-
-    if 'manual_seeding_' not in str(st.session_state.keys()):
-        return []
-
-    # Buscar todas las claves de sembrado manual
-    for key in st.session_state.keys():
-        if key.startswith('manual_seeding_'):
-            seeding_data = st.session_state[key]
-
-            # Extraer evento y género del key
-            parts = key.replace('manual_seeding_', '').rsplit('_', 1)
-            if len(parts) == 2:
-                evento = parts[0]
-                genero = 'Hombres' if parts[1] == 'M' else 'Mujeres'
-
-                # Procesar cada serie
-                for serie in seeding_data.get('series', []):
-                    for carril_idx, swimmer in enumerate(serie['carriles']):
-                        if swimmer and swimmer.get('tiempo_competencia'):
-                            # Solo incluir nadadores con tiempo de competencia
-                            resultado = {
-                                'Prueba': f"{evento} - {genero}",
-                                'Evento': evento,
-                                'Genero': genero,
-                                'Serie': serie['serie'],
-                                'Carril': carril_idx + 1,
-                                'Nombre': swimmer['nombre'],
-                                'Equipo': swimmer['equipo'],
-                                'Edad': swimmer['edad'],
-                                'Categoria': swimmer['categoria'],
-                                'Tiempo_Sembrado': swimmer['tiempo'],
-                                'Tiempo_Competencia': swimmer['tiempo_competencia'],
-                                'Tiempo_Segundos': parse_time(swimmer['tiempo_competencia'])
-                            }
-                            todos_resultados.append(resultado)
-
-    return todos_resultados
-
-def procesar_resultados_por_categoria_y_genero(resultados):
-    """Procesa resultados agrupados por categoría y género con nuevo sistema de puntos"""
-    if not resultados:
-        return []
-
-    df = pd.DataFrame(resultados)
-    resultados_procesados = []
-
-    # Agrupar por evento, género y categoría
-    for (evento, genero, categoria), grupo in df.groupby(['Evento', 'Genero', 'Categoria']):
-        # Ordenar por tiempo (menor a mayor)
-        grupo_ordenado = grupo.sort_values('Tiempo_Segundos')
-
-        for posicion, (_, nadador) in enumerate(grupo_ordenado.iterrows(), 1):
-            # Solo asignar puntos si el tiempo es válido (no inf)
-            if nadador['Tiempo_Segundos'] != float('inf'):
-                puntos = calcular_puntos(posicion)
-
-                resultado = {
-                    'Evento': evento,
-                    'Genero': genero,
-                    'Categoria': categoria,
-                    'Posicion': posicion,
-                    'Nombre': nadador['Nombre'],
-                    'Equipo': nadador['Equipo'],
-                    'Edad': nadador['Edad'],
-                    'Tiempo_Competencia': nadador['Tiempo_Competencia'],
-                    'Puntos': puntos
-                }
-                resultados_procesados.append(resultado)
-
-    return resultados_procesados
+    """
+    Lee los tiempos de competencia del almacén de resultados (resultados_competencia.db),
+    donde el sembrado manual guarda cada tiempo al ingresarlo. Devuelve un DataFrame
+    (vacío si aún no hay tiempos).
+    """
+    return ResultadosStore().cargar_resultados()
+
+def procesar_resultados_por_categoria_y_genero(resultados, esquema=None):
+    """
+    Procesa resultados agrupados por evento, género y categoría con el sistema de puntos.
+
+    ``esquema`` es un sistema compilado (``EventManager().get_scoring_scheme(nombre)``); por
+    defecto, el activo del evento. Devuelve un DataFrame con COLUMNAS_RESULTADOS.
+    """
+    if esquema is None:
+        esquema = EventManager().get_scoring_scheme()
+    clasificados = clasificar_resultados(resultados)
+    clasificados['Puntos'] = puntos_resultados(clasificados, esquema)
+    return clasificados
 
 def generar_resumen_equipos(resultados_procesados):
-    """Genera resumen de puntos por equipo"""
-    if not resultados_procesados:
-        return []
+    """Genera resumen de puntos por equipo (DataFrame Equipo, Puntos_Total, Participaciones)"""
+    if resultados_procesados is None or len(resultados_procesados) == 0:
+        return pd.DataFrame(columns=['Equipo', 'Puntos_Total', 'Participaciones'])
 
     df = pd.DataFrame(resultados_procesados)
-    resumen_equipos = df.groupby('Equipo').agg({
-        'Puntos': 'sum',
-        'Nombre': 'count'  # Contar participaciones
-    }).reset_index()
-
-    resumen_equipos.columns = ['Equipo', 'Puntos_Total', 'Participaciones']
-    resumen_equipos = resumen_equipos.sort_values('Puntos_Total', ascending=False)
-
-    return resumen_equipos.to_dict('records')
-
-def generar_reporte_resultados_completo():
+    resumen_equipos = df.groupby('Equipo').agg(
+        Puntos_Total=('Puntos', 'sum'),
+        Participaciones=('Nombre', 'count'),
+    ).reset_index()
+
+    return resumen_equipos.sort_values('Puntos_Total', ascending=False, kind='mergesort').reset_index(drop=True)
+
+def _registrar_estilos_reporte(wb):
+    for nombre, color in ((ESTILO_ENCABEZADO_RESULTADOS, "4472C4"), (ESTILO_ENCABEZADO_EQUIPOS, "228B22")):
+        wb.add_named_style(NamedStyle(
+            name=nombre,
+            font=Font(bold=True, size=12, color="FFFFFF"),
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+        ))
+
+def _encabezados(ws, headers, estilo):
+    fila = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = estilo
+        fila.append(cell)
+    return fila
+
+def _colorear_medallas(ws, columna_posicion, ultima_columna, ultima_fila):
+    """Oro/plata/bronce por formato condicional sobre la columna de posición (sin estilo por celda)."""
+    if ultima_fila < 2:
+        return
+    rango = f"A2:{get_column_letter(ultima_columna)}{ultima_fila}"
+    for posicion, color in COLORES_MEDALLAS.items():
+        ws.conditional_formatting.add(rango, FormulaRule(
+            formula=[f"${columna_posicion}2={posicion}"],
+            fill=PatternFill(start_color=color, end_color=color, fill_type="solid"),
+            stopIfTrue=True,
+        ))
+
+def _filas_sin_nan(df):
+    """Filas como tuplas con None en lugar de NaN (celdas vacías en Excel)."""
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+def escribir_reporte_premiacion(archivo, resultados_procesados, resumen_equipos):
+    """
+    Escribe el reporte de premiación en modo write-only: las filas se vuelcan al disco a
+    medida que se generan, los encabezados comparten dos estilos con nombre y las medallas
+    se pintan con formato condicional (un rango por hoja en lugar de un relleno por celda).
+    """
+    wb = Workbook(write_only=True)
+    _registrar_estilos_reporte(wb)
+
+    # HOJA 1: Resultados por Categoría y Género
+    ws_resultados = wb.create_sheet("Resultados por Categoría")
+    for i, width in enumerate([15, 10, 12, 5, 25, 20, 5, 12, 8], 1):
+        ws_resultados.column_dimensions[get_column_letter(i)].width = width
+    headers_resultados = ['Evento', 'Género', 'Categoría', 'Pos.', 'Nombre', 'Equipo', 'Edad', 'Tiempo', 'Puntos']
+    ws_resultados.append(_encabezados(ws_resultados, headers_resultados, ESTILO_ENCABEZADO_RESULTADOS))
+    for fila in _filas_sin_nan(resultados_procesados[COLUMNAS_RESULTADOS]):
+        ws_resultados.append(fila)
+    columna_posicion = get_column_letter(COLUMNAS_RESULTADOS.index('Posicion') + 1)
+    _colorear_medallas(ws_resultados, columna_posicion, len(headers_resultados), len(resultados_procesados) + 1)
+
+    # HOJA 2: Clasificación por Equipos
+    ws_equipos = wb.create_sheet("Clasificación por Equipos")
+    for letra, width in zip('ABCD', [10, 25, 15, 15]):
+        ws_equipos.column_dimensions[letra].width = width
+    headers_equipos = ['Posición', 'Equipo', 'Puntos Totales', 'Participaciones']
+    ws_equipos.append(_encabezados(ws_equipos, headers_equipos, ESTILO_ENCABEZADO_EQUIPOS))
+    for pos, fila in enumerate(_filas_sin_nan(resumen_equipos[['Equipo', 'Puntos_Total', 'Participaciones']]), 1):
+        ws_equipos.append((pos,) + fila)
+    _colorear_medallas(ws_equipos, 'A', len(headers_equipos), len(resumen_equipos) + 1)
+
+    wb.save(archivo)
+
+def generar_reporte_resultados_completo(esquema=None):
     """Función principal que genera el reporte completo de resultados"""
     try:
-        # 1. Leer tiempos de competencia desde sembrado manual
+        if esquema is None:
+            esquema = EventManager().get_scoring_scheme()
+
+        # 1. Leer tiempos de competencia guardados desde el sembrado manual
         resultados_brutos = leer_tiempos_competencia_desde_sembrado()
 
-        if not resultados_brutos:
+        if resultados_brutos.empty:
             return False, "No se encontraron tiempos de competencia en el sembrado manual"
 
         # 2. Procesar resultados por categoría y género
-        resultados_procesados = procesar_resultados_por_categoria_y_genero(resultados_brutos)
+        resultados_procesados = procesar_resultados_por_categoria_y_genero(resultados_brutos, esquema)
 
-        if not resultados_procesados:
+        if resultados_procesados.empty:
             return False, "No se pudieron procesar los resultados"
 
         # 3. Generar resumen por equipos
         resumen_equipos = generar_resumen_equipos(resultados_procesados)
 
         # 4. Crear archivo Excel con múltiples hojas
-        wb = Workbook()
+        escribir_reporte_premiacion(ARCHIVO_SALIDA_PREMIACION, resultados_procesados, resumen_equipos)
 
-        # Eliminar hoja por defecto
-        if 'Sheet' in wb.sheetnames:
-            wb.remove(wb['Sheet'])
-
-        # HOJA 1: Resultados por Categoría y Género
-        ws_resultados = wb.create_sheet("Resultados por Categoría")
-
-        # Encabezados para resultados
-        headers_resultados = ['Evento', 'Género', 'Categoría', 'Pos.', 'Nombre', 'Equipo', 'Edad', 'Tiempo', 'Puntos']
-        for col, header in enumerate(headers_resultados, 1):
-            cell = ws_resultados.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, size=12)
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.font = Font(bold=True, size=12, color="FFFFFF")
-
-        # Llenar datos de resultados
-        row = 2
-        for resultado in resultados_procesados:
-            ws_resultados.cell(row=row, column=1, value=resultado['Evento'])
-            ws_resultados.cell(row=row, column=2, value=resultado['Genero'])
-            ws_resultados.cell(row=row, column=3, value=resultado['Categoria'])
-            ws_resultados.cell(row=row, column=4, value=resultado['Posicion'])
-            ws_resultados.cell(row=row, column=5, value=resultado['Nombre'])
-            ws_resultados.cell(row=row, column=6, value=resultado['Equipo'])
-            ws_resultados.cell(row=row, column=7, value=resultado['Edad'])
-            ws_resultados.cell(row=row, column=8, value=resultado['Tiempo_Competencia'])
-            ws_resultados.cell(row=row, column=9, value=resultado['Puntos'])
-
-            # Colorear las medallas
-            if resultado['Posicion'] == 1:
-                for col in range(1, 10):
-                    ws_resultados.cell(row=row, column=col).fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-            elif resultado['Posicion'] == 2:
-                for col in range(1, 10):
-                    ws_resultados.cell(row=row, column=col).fill = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
-            elif resultado['Posicion'] == 3:
-                for col in range(1, 10):
-                    ws_resultados.cell(row=row, column=col).fill = PatternFill(start_color="CD7F32", end_color="CD7F32", fill_type="solid")
-
-            row += 1
-
-        # Ajustar anchos de columna
-        column_widths = [15, 10, 12, 5, 25, 20, 5, 12, 8]
-        for i, width in enumerate(column_widths, 1):
-            ws_resultados.column_dimensions[chr(64+i)].width = width
-
-        # HOJA 2: Clasificación por Equipos
-        ws_equipos = wb.create_sheet("Clasificación por Equipos")
-
-        # Encabezados para equipos
-        headers_equipos = ['Posición', 'Equipo', 'Puntos Totales', 'Participaciones']
-        for col, header in enumerate(headers_equipos, 1):
-            cell = ws_equipos.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, size=12)
-            cell.fill = PatternFill(start_color="228B22", end_color="228B22", fill_type="solid")
-            cell.font = Font(bold=True, size=12, color="FFFFFF")
-
-        # Llenar datos de equipos
-        for pos, equipo in enumerate(resumen_equipos, 1):
-            ws_equipos.cell(row=pos+1, column=1, value=pos)
-            ws_equipos.cell(row=pos+1, column=2, value=equipo['Equipo'])
-            ws_equipos.cell(row=pos+1, column=3, value=equipo['Puntos_Total'])
-            ws_equipos.cell(row=pos+1, column=4, value=equipo['Participaciones'])
-
-            # Colorear los 3 primeros equipos
-            if pos == 1:
-                for col in range(1, 5):
-                    ws_equipos.cell(row=pos+1, column=col).fill = PatternFill(start_color="FFD700", end_color="FFD700", fill_type="solid")
-            elif pos == 2:
-                for col in range(1, 5):
-                    ws_equipos.cell(row=pos+1, column=col).fill = PatternFill(start_color="C0C0C0", end_color="C0C0C0", fill_type="solid")
-            elif pos == 3:
-                for col in range(1, 5):
-                    ws_equipos.cell(row=pos+1, column=col).fill = PatternFill(start_color="CD7F32", end_color="CD7F32", fill_type="solid")
-
-        # Ajustar anchos de columna para equipos
-        ws_equipos.column_dimensions['A'].width = 10
-        ws_equipos.column_dimensions['B'].width = 25
-        ws_equipos.column_dimensions['C'].width = 15
-        ws_equipos.column_dimensions['D'].width = 15
-
-        # Guardar archivo
-        wb.save(ARCHIVO_SALIDA_PREMIACION)
-
-        return True, f"Reporte generado exitosamente: {ARCHIVO_SALIDA_PREMIACION} ({len(resultados_procesados)} resultados, {len(resumen_equipos)} equipos)"
+        return True, f"Reporte generado exitosamente: {ARCHIVO_SALIDA_PREMIACION} ({len(resultados_procesados)} resultados, {len(resumen_equipos)} equipos, puntuación '{esquema['nombre']}')"
 
     except Exception as e:
         return False, f"Error al generar reporte: {str(e)}"
@@ -300,7 +211,7 @@ def procesar_resultados_excel_corregido(filepath):
 # ... [La función main y las de ayuda deben ser copiadas de la respuesta anterior, pero usando esta nueva función de lectura] ...
 
 if __name__ == "__main__":
-    # Copia aquí las funciones auxiliares (parse_time, format_time_value, apply_styles_and_width)
+    # Copia aquí las funciones auxiliares (format_time_value, apply_styles_and_width; parse_time vive en tiempos_utils)
     # y la función main() completa de la respuesta anterior, pero asegúrate de que llame a:
     # df_results = procesar_resultados_excel_corregido(ARCHIVO_ENTRADA_RESULTADOS)
     def main():
@@ -314,10 +225,10 @@ if __name__ == "__main__":
             return
 
         # El resto del proceso es idéntico al de la respuesta anterior...
-        df_results['tiempo_final_segundos'] = df_results['Tiempo Final'].apply(parse_time)
+        df_results['tiempo_final_segundos'] = parse_times_series(df_results['Tiempo Final'])
         df_results['Sexo'] = df_results['Prueba'].apply(lambda x: 'F' if 'Mujeres' in x else 'M')
         df_results['Lugar'] = df_results.groupby(['Prueba', 'Categoria'])['tiempo_final_segundos'].rank(method='min').astype(int)
-        df_results['Puntos'] = df_results['Lugar'].map(PUNTOS).fillna(0).astype(int)
+        df_results['Puntos'] = como_enteros(puntos_por_posicion(df_results['Lugar'].to_numpy()))
         
         # ... (copia el resto de la función main de la respuesta anterior aquí para generar los 3 reportes) ...
         print(f"¡Éxito! Reporte final '{ARCHIVO_SALIDA_PREMIACION}' generado correctamente.")
@@ -340,17 +251,6 @@ if __name__ == "__main__":
             length = max(len(str(cell.value or "")) for cell in column_cells)
             ws.column_dimensions[column_cells[0].column_letter].width = length + 4
 
-    def parse_time(time_val):
-        if pd.isna(time_val) or time_val == '': return float('inf')
-        if hasattr(time_val, 'minute'): return time_val.minute * 60 + time_val.second + time_val.microsecond / 1_000_000
-        time_str = str(time_val).replace(',', '.')
-        try:
-            parts = time_str.split(':')
-            if len(parts) == 2: return int(parts[0]) * 60 + float(parts[1])
-            return float(time_str)
-        except (ValueError, IndexError): return float('inf')
-
-
     # --- FUNCIÓN MAIN COMPLETA ---
     def main_full():
         print("Iniciando el procesamiento de resultados (versión final corregida)...")
@@ -360,10 +260,10 @@ if __name__ == "__main__":
             print("No se encontraron datos para procesar. Finalizando.")
             return
 
-        df_results['tiempo_final_segundos'] = df_results['Tiempo Final'].apply(parse_time)
+        df_results['tiempo_final_segundos'] = parse_times_series(df_results['Tiempo Final'])
         df_results['Sexo'] = df_results['Prueba'].apply(lambda x: 'F' if 'Mujeres' in x else 'M')
         df_results['Lugar'] = df_results.groupby(['Prueba', 'Categoria'])['tiempo_final_segundos'].rank(method='min').astype(int)
-        df_results['Puntos'] = df_results['Lugar'].map(PUNTOS).fillna(0).astype(int)
+        df_results['Puntos'] = como_enteros(puntos_por_posicion(df_results['Lugar'].to_numpy()))
         
         # Reportes individuales ordenados por tiempo (mejor tiempo = lugar 1)
         df_individual = df_results.groupby(['Categoria', 'Sexo', 'Nombre', 'Equipo']).agg({
@@ -515,10 +415,10 @@ if __name__ == "__main__":
             if df_results is None or df_results.empty:
                 return None, "No se encontraron datos para procesar"
 
-            df_results['tiempo_final_segundos'] = df_results['Tiempo Final'].apply(parse_time)
+            df_results['tiempo_final_segundos'] = parse_times_series(df_results['Tiempo Final'])
             df_results['Sexo'] = df_results['Prueba'].apply(lambda x: 'F' if 'Mujeres' in x else 'M')
             df_results['Lugar'] = df_results.groupby(['Prueba', 'Categoria'])['tiempo_final_segundos'].rank(method='min').astype(int)
-            df_results['Puntos'] = df_results['Lugar'].map(PUNTOS).fillna(0).astype(int)
+            df_results['Puntos'] = como_enteros(puntos_por_posicion(df_results['Lugar'].to_numpy()))
             
             # Formatear tiempo para display
             df_results['Tiempo_Formateado'] = df_results['Tiempo Final'].apply(format_time_value)
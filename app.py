@@ -3,7 +3,7 @@ import pandas as pd
 import io
 import os
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, time
 #import subprocess  # No longer needed
 import sys
 
@@ -12,7 +12,31 @@ import sys
 
 # Importar los scripts directly  
 import importlib.util
-from planilla_utils import inscrito_en_prueba
+from motor_sembrado import (
+    FINAL_POR_TIEMPO,
+    POR_CATEGORIA,
+    POR_TIEMPO,
+    SERIES_CIRCULARES,
+    SERIES_DIRECTAS,
+    actualizar_series,
+    cargar_inscripciones,
+    cargar_papeletas,
+    distribucion_sembrado,
+    orden_carriles_evento,
+    parametros_distribucion,
+    sembrar_nadadores,
+    texto_serie,
+    titulo_serie,
+)
+from cronograma import (
+    PAUSA_ENTRE_PRUEBAS_SEG,
+    PAUSA_ENTRE_SESIONES_MIN,
+    RECAMBIO_SERIE_SEG,
+    cronograma_evento,
+)
+from registro_store import exportar_planilla_si_cambio
+from resultados_store import ResultadosStore
+from base_datos_store import BaseDatosStore
 
 # Importar el módulo de inscripción con el nuevo nombre
 spec = importlib.util.spec_from_file_location("inscripcion_nadadores", "1-inscripcion_nadadores.py")
@@ -208,6 +232,10 @@ def main():
         ],
         index=default_index
     )
+
+    # Las demás secciones leen planilla_inscripcion.xlsx: exportar cambios pendientes del almacén
+    if opcion != "✍️ Inscripción de Nadadores":
+        exportar_planilla_si_cambio()
     
     if opcion == "🏠 Inicio":
         mostrar_inicio()
@@ -537,6 +565,18 @@ def mostrar_paso_datos_basicos(event_manager, event_info):
         help="Defina si la edad se calcula al día del evento o al 31 de diciembre del año en curso"
     )
 
+    # Piscina
+    st.markdown("**🏊 Piscina:**")
+    lanes = st.number_input(
+        "Número de Carriles",
+        min_value=4,
+        max_value=10,
+        value=event_info.get('lanes', 8) if event_info else 8,
+        step=1,
+        key="evento_lanes",
+        help="Carriles disponibles; el sembrado asigna los mejores tiempos desde el carril central hacia afuera"
+    )
+
     # Valores de inscripción
     st.markdown("**💰 Valores de Inscripción:**")
     col1, col2 = st.columns(2)
@@ -998,6 +1038,7 @@ def mostrar_paso_finalizar(event_manager, event_info):
         age_criteria = st.session_state.get('evento_age_criteria', 'event_date')
         age_criteria_text = "Edad al 31 de diciembre" if age_criteria == 'december_31' else "Edad el día del evento"
         st.write(f"**Criterio de edad:** {age_criteria_text}")
+        st.write(f"**Carriles:** {st.session_state.get('evento_lanes', 8)}")
 
         # Mostrar valores de inscripción
         swimmer_fee = st.session_state.get('evento_swimmer_fee', 0)
@@ -1050,6 +1091,7 @@ def mostrar_paso_finalizar(event_manager, event_info):
             start_date = st.session_state.get('evento_start_date')
             end_date = st.session_state.get('evento_end_date')
             age_criteria = st.session_state.get('evento_age_criteria', 'event_date')
+            lanes = st.session_state.get('evento_lanes', 8)
 
             # Procesar logo si se subió uno nuevo
             event_logo = None
@@ -1078,7 +1120,8 @@ def mostrar_paso_finalizar(event_manager, event_info):
                 event_logo,
                 start_date,
                 end_date,
-                age_criteria
+                age_criteria,
+                lanes
             )
 
             if success:
@@ -1425,6 +1468,31 @@ def generate_seeding_excel_from_manual(seeding_data, event_name, gender):
     
     return buffer.getvalue()
 
+def seeding_distribution_controls(key_prefix):
+    """Selector de distribución en series: (distribucion, series_circulares, sesiones)."""
+    distribution_options = {
+        SERIES_DIRECTAS: "Directo (mejores tiempos en la última serie)",
+        SERIES_CIRCULARES: "Circular (últimas 2-3 series en círculo)",
+        FINAL_POR_TIEMPO: "Final por tiempo en varias sesiones",
+    }
+    col_mode, col_param = st.columns([2, 1])
+    with col_mode:
+        distribucion = st.selectbox(
+            "Distribución en series",
+            options=list(distribution_options.keys()),
+            format_func=lambda x: distribution_options[x],
+            key=f"{key_prefix}_distribucion",
+            help="Circular: los mejores tiempos se reparten entre las últimas series (campeonatos con finales). "
+                 "Final por tiempo: series directas repartidas en sesiones, la más rápida en la última."
+        )
+    series_circulares, sesiones = 3, 2
+    with col_param:
+        if distribucion == SERIES_CIRCULARES:
+            series_circulares = st.selectbox("Series en círculo", [3, 2], key=f"{key_prefix}_circulares")
+        elif distribucion == FINAL_POR_TIEMPO:
+            sesiones = st.number_input("Sesiones", min_value=2, max_value=6, value=2, step=1, key=f"{key_prefix}_sesiones")
+    return distribucion, series_circulares, sesiones
+
 def sembrado_competencia_interface():
     st.markdown("## 📊 Sembrado de Competencia")
     
@@ -1463,7 +1531,7 @@ def sembrado_competencia_interface():
         """, unsafe_allow_html=True)
     
     # Pestañas para diferentes métodos de sembrado
-    tab1, tab2, tab3 = st.tabs(["📊 Por Categorías", "⏱️ Por Tiempo", "✍️ Manual"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Por Categorías", "⏱️ Por Tiempo", "✍️ Manual", "🕒 Cronograma"])
     
     with tab1:
         st.markdown("### 📊 Sembrado por Categorías")
@@ -1479,13 +1547,21 @@ def sembrado_competencia_interface():
         - Coloca los mejores tiempos en las series finales
         """)
         
+        distribution_cat = seeding_distribution_controls("seeding_cat")
+        incremental_cat = st.checkbox(
+            "Solo reescribir las pruebas con cambios",
+            value=True,
+            key="seeding_cat_incremental",
+            help="Compara con el último sembrado generado y conserva las hojas sin cambios (incluidos los tiempos ya anotados)"
+        )
+        
         col1, col2, col3 = st.columns([1, 1, 2])
         
         with col1:
             if st.button("🚀 Generar Sembrado por Categorías", type="primary"):
                 with st.spinner("Generando sembrado por categorías..."):
                     try:
-                        script1.main_full()
+                        script1.main_full(*distribution_cat, incremental_cat)
                         st.markdown("""
                             <div class="success-message">
                                 ✅ <strong>Sembrado generado exitosamente!</strong><br>
@@ -1502,7 +1578,7 @@ def sembrado_competencia_interface():
                 if st.button("👁️ Visualizar Sembrado", help="Ver preview del sembrado antes de descargar"):
                     with st.spinner("Cargando visualización..."):
                         try:
-                            seeding_data, message = script1.get_seeding_data()
+                            seeding_data, message = script1.get_seeding_data(*distribution_cat)
                             if seeding_data:
                                 st.session_state['seeding_preview_cat'] = seeding_data
                                 st.success("✅ Visualización cargada")
@@ -1518,7 +1594,7 @@ def sembrado_competencia_interface():
                         del st.session_state['seeding_preview_cat']
                     with st.spinner("Actualizando sembrado..."):
                         try:
-                            seeding_data, message = script1.get_seeding_data()
+                            seeding_data, message = script1.get_seeding_data(*distribution_cat)
                             if seeding_data:
                                 st.session_state['seeding_preview_cat'] = seeding_data
                                 st.success("✅ Sembrado actualizado")
@@ -1664,13 +1740,21 @@ def sembrado_competencia_interface():
         - Series más rápidas al final del evento
         """)
         
+        distribution_time = seeding_distribution_controls("seeding_time")
+        incremental_time = st.checkbox(
+            "Solo reescribir las pruebas con cambios",
+            value=True,
+            key="seeding_time_incremental",
+            help="Compara con el último sembrado generado y conserva las hojas sin cambios (incluidos los tiempos ya anotados)"
+        )
+        
         col1, col2, col3 = st.columns([1, 1, 2])
         
         with col1:
             if st.button("🚀 Generar Sembrado por Tiempo", type="primary", key="gen_tiempo"):
                 with st.spinner("Generando sembrado por tiempo..."):
                     try:
-                        script2.main()
+                        script2.main(*distribution_time, incremental_time)
                         st.markdown("""
                             <div class="success-message">
                                 ✅ <strong>Sembrado generado exitosamente!</strong><br>
@@ -1687,7 +1771,7 @@ def sembrado_competencia_interface():
                 if st.button("👁️ Visualizar Sembrado", help="Ver preview del sembrado antes de descargar", key="view_tiempo"):
                     with st.spinner("Cargando visualización..."):
                         try:
-                            seeding_data, message = script2.get_seeding_data()
+                            seeding_data, message = script2.get_seeding_data(*distribution_time)
                             if seeding_data:
                                 st.session_state['seeding_preview_time'] = seeding_data
                                 st.success("✅ Visualización cargada")
@@ -1703,7 +1787,7 @@ def sembrado_competencia_interface():
                         del st.session_state['seeding_preview_time']
                     with st.spinner("Actualizando sembrado..."):
                         try:
-                            seeding_data, message = script2.get_seeding_data()
+                            seeding_data, message = script2.get_seeding_data(*distribution_time)
                             if seeding_data:
                                 st.session_state['seeding_preview_time'] = seeding_data
                                 st.success("✅ Sembrado actualizado")
@@ -1837,6 +1921,74 @@ def sembrado_competencia_interface():
                             st.info(f"⏱️ Tiempos: {tiempos_completados}/{total_nadadores}")
         
     
+    with tab4:
+        st.markdown("### 🕒 Cronograma de la Competencia")
+        st.markdown("""
+        Estima la duración de cada serie con el tiempo del nadador más lento más el recambio,
+        sigue el orden de pruebas del evento y reparte la competencia en sesiones.
+        """)
+        
+        col_mode, col_start = st.columns([2, 1])
+        with col_mode:
+            schedule_mode = st.selectbox(
+                "Sembrado base",
+                options=[POR_CATEGORIA, POR_TIEMPO],
+                format_func=lambda x: "Por Categorías" if x == POR_CATEGORIA else "Por Tiempo",
+                key="schedule_mode"
+            )
+        with col_start:
+            schedule_start = st.time_input("Hora de inicio", value=time(8, 0), key="schedule_start")
+        schedule_distribution = seeding_distribution_controls("schedule")
+        
+        col_turn, col_pause, col_limit, col_break = st.columns(4)
+        with col_turn:
+            schedule_turnaround = st.number_input("Recambio por serie (s)", min_value=0, max_value=300,
+                                                  value=RECAMBIO_SERIE_SEG, step=5, key="schedule_turnaround")
+        with col_pause:
+            schedule_event_pause = st.number_input("Pausa entre pruebas (s)", min_value=0, max_value=900,
+                                                   value=PAUSA_ENTRE_PRUEBAS_SEG, step=15, key="schedule_event_pause")
+        with col_limit:
+            schedule_limit = st.number_input("Máximo por sesión (min, 0 = sin límite)", min_value=0, max_value=720,
+                                             value=0, step=15, key="schedule_limit")
+        with col_break:
+            schedule_break = st.number_input("Pausa entre sesiones (min)", min_value=0, max_value=240,
+                                             value=PAUSA_ENTRE_SESIONES_MIN, step=5, key="schedule_break")
+        
+        try:
+            circulares, sesiones = parametros_distribucion(*schedule_distribution)
+            schedule_heats, schedule_sessions = cronograma_evento(
+                "planilla_inscripcion.xlsx", schedule_mode, circulares, sesiones,
+                hora_inicio=schedule_start,
+                recambio_seg=schedule_turnaround,
+                pausa_pruebas_seg=schedule_event_pause,
+                limite_sesion_min=schedule_limit or None,
+                pausa_sesiones_min=schedule_break,
+            )
+        except Exception as e:
+            st.error(f"❌ Error al generar cronograma: {e}")
+        else:
+            if schedule_heats.empty:
+                st.info("ℹ️ No hay nadadores inscritos para generar el cronograma")
+            else:
+                st.markdown("#### 📅 Sesiones")
+                sessions_view = schedule_sessions.copy()
+                sessions_view['inicio'] = sessions_view['inicio'].dt.strftime('%d/%m %H:%M')
+                sessions_view['fin'] = sessions_view['fin'].dt.strftime('%d/%m %H:%M')
+                st.dataframe(sessions_view, use_container_width=True, hide_index=True)
+                
+                st.markdown("#### 🏊 Series")
+                heats_view = schedule_heats.copy()
+                heats_view['inicio'] = heats_view['inicio'].dt.strftime('%H:%M:%S')
+                heats_view['fin'] = heats_view['fin'].dt.strftime('%H:%M:%S')
+                st.dataframe(heats_view, use_container_width=True, hide_index=True)
+                st.download_button(
+                    label="⬇️ Descargar Cronograma (CSV)",
+                    data=heats_view.to_csv(index=False).encode('utf-8-sig'),
+                    file_name="cronograma_competencia.csv",
+                    mime="text/csv",
+                    key="schedule_download"
+                )
+    
     with tab3:
         st.markdown("### ✍️ Sembrado Manual")
         st.markdown("""
@@ -1854,10 +2006,8 @@ def sembrado_competencia_interface():
             return
         
         try:
-            # Cargar datos de inscripción
-            df = pd.read_excel("planilla_inscripcion.xlsx")
-            info_cols = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO']
-            event_cols = [col for col in df.columns if col not in info_cols and 'Nø' not in col and 'FECHA DE NA' not in col]
+            # Cargar datos de inscripción (tabla larga compartida con los generadores de sembrado)
+            inscripciones, event_cols = cargar_inscripciones("planilla_inscripcion.xlsx")
             
             if len(event_cols) == 0:
                 st.error("❌ No se encontraron eventos en la planilla de inscripción")
@@ -1888,20 +2038,20 @@ def sembrado_competencia_interface():
         if selected_event:
             # Filtrar nadadores para el evento seleccionado
             swimmers_for_event = []
-            for index, row in df.iterrows():
-                if inscrito_en_prueba(row[selected_event]) and pd.notna(row['NOMBRE Y AP']):
-                    swimmer_gender = "Masculino" if row['SEXO'].upper() == 'M' else "Femenino"
-                    if gender_filter == "Todos" or gender_filter == swimmer_gender:
-                        swimmers_for_event.append({
-                            'id': index,
-                            'nombre': row['NOMBRE Y AP'],
-                            'equipo': row['EQUIPO'],
-                            'edad': row['EDAD'],
-                            'categoria': row['CAT.'],
-                            'sexo': swimmer_gender,
-                            'tiempo': str(row[selected_event]),
-                            'tiempo_en_segundos': script1.parse_time(row[selected_event]),
-                        })
+            inscritos_evento = inscripciones[inscripciones['prueba'] == selected_event]
+            for row in inscritos_evento.itertuples(index=False):
+                swimmer_gender = "Masculino" if row.sexo == 'M' else "Femenino"
+                if gender_filter == "Todos" or gender_filter == swimmer_gender:
+                    swimmers_for_event.append({
+                        'id': row.fila,
+                        'nombre': row.nombre,
+                        'equipo': row.equipo,
+                        'edad': row.edad,
+                        'categoria': row.categoria,
+                        'sexo': swimmer_gender,
+                        'tiempo': str(row.tiempo_inscripcion),
+                        'tiempo_en_segundos': row.segundos,
+                    })
             
             if len(swimmers_for_event) == 0:
                 st.warning(f"⚠️ No hay nadadores inscritos en {selected_event} con el filtro seleccionado")
@@ -1909,49 +2059,45 @@ def sembrado_competencia_interface():
             
             st.success(f"✅ {len(swimmers_for_event)} nadadores encontrados en **{selected_event}**")
             
-            # Botón para actualizar sembrado con nuevas inscripciones
+            # Inicializar sembrado en session state
+            seeding_key = f"manual_seeding_{selected_event}_{gender_filter}"
+            lane_order = orden_carriles_evento()
+            
+            # Botón para aplicar altas y retiros sin rehacer el sembrado manual
             col_refresh, col_info = st.columns([1, 3])
             with col_refresh:
-                if st.button("🔄 Actualizar Sembrado", help="Cargar nuevas inscripciones"):
-                    seeding_key = f"manual_seeding_{selected_event}_{gender_filter}"
-                    if seeding_key in st.session_state:
+                if st.button("🔄 Actualizar Sembrado", help="Aplicar nuevas inscripciones y retiros conservando los cambios manuales"):
+                    current = st.session_state.get(seeding_key)
+                    if current and current.get('carriles') == len(lane_order):
+                        series, added, removed = actualizar_series(current['series'], swimmers_for_event, lane_order)
+                        current['series'] = series
+                        # Los retirados dejan de puntuar
+                        ResultadosStore().retirar_nadadores(selected_event, gender_filter, removed)
+                        current['total_nadadores'] = len(swimmers_for_event)
+                        st.session_state['manual_seeding_update_msg'] = f"✅ {len(added)} alta(s) y {len(removed)} retiro(s) aplicados"
+                    elif seeding_key in st.session_state:
                         del st.session_state[seeding_key]
                     st.rerun()
             
             with col_info:
-                st.info("💡 Usa 'Actualizar Sembrado' si agregaste nuevas inscripciones")
-
-            # Inicializar sembrado en session state
-            seeding_key = f"manual_seeding_{selected_event}_{gender_filter}"
+                update_msg = st.session_state.pop('manual_seeding_update_msg', None)
+                if update_msg:
+                    st.success(update_msg)
+                else:
+                    st.info("💡 Usa 'Actualizar Sembrado' si agregaste o retiraste inscripciones")
             
             def create_initial_seeding(swimmers_list):
                 """Crear sembrado inicial automático"""
-                sorted_swimmers = sorted(
-                    swimmers_list,
-                    key=lambda x: x.get('tiempo_en_segundos', script1.parse_time(x['tiempo'])),
-                )
-                
-                # Distribución en series de 8 carriles
-                series = []
-                swimmers_per_series = 8
-                num_series = (len(sorted_swimmers) + swimmers_per_series - 1) // swimmers_per_series
-                
-                for serie_num in range(num_series):
-                    serie_swimmers = sorted_swimmers[serie_num * swimmers_per_series:(serie_num + 1) * swimmers_per_series]
-                    lane_assignment = [4, 5, 3, 6, 2, 7, 1, 8]  # Orden standard de carriles
-                    
-                    serie = {"serie": serie_num + 1, "carriles": [None] * 8}
-                    for i, swimmer in enumerate(serie_swimmers):
-                        if i < len(lane_assignment):
-                            lane_idx = lane_assignment[i] - 1
-                            serie["carriles"][lane_idx] = swimmer
-                    
-                    series.append(serie)
+                # Mismo criterio de series, carriles y distribución que el sembrado generado
+                series = sembrar_nadadores(swimmers_list, lane_order, *distribucion_sembrado())
+                # Recuperar los tiempos de competencia ya guardados (p. ej. tras perder la sesión)
+                ResultadosStore().restaurar_tiempos(selected_event, gender_filter, series)
                 
                 return {
                     'evento': selected_event,
                     'genero': gender_filter, 
                     'series': series,
+                    'carriles': len(lane_order),
                     'nadadores_disponibles': [],
                     'total_nadadores': len(swimmers_list)  # Para detectar cambios
                 }
@@ -1960,12 +2106,15 @@ def sembrado_competencia_interface():
             if seeding_key not in st.session_state:
                 st.session_state[seeding_key] = create_initial_seeding(swimmers_for_event)
             else:
-                # Verificar si el número de nadadores cambió
-                current_total = st.session_state[seeding_key].get('total_nadadores', 0)
-                if current_total != len(swimmers_for_event):
-                    st.warning(f"⚠️ Se detectaron {len(swimmers_for_event) - current_total} nuevas inscripciones. Usa 'Actualizar Sembrado' para cargarlas.")
+                # Verificar altas y retiros respecto del sembrado en edición
+                current = st.session_state[seeding_key]
+                if current.get('carriles') == len(lane_order):
+                    _, added, removed = actualizar_series(current['series'], swimmers_for_event, lane_order)
+                    if added or removed:
+                        st.warning(f"⚠️ Se detectaron {len(added)} nuevas inscripciones y {len(removed)} retiros. Usa 'Actualizar Sembrado' para aplicarlos.")
             
             seeding_data = st.session_state[seeding_key]
+            num_lanes = seeding_data.get('carriles') or len(orden_carriles_evento())
             
             # Interfaz de edición manual
             st.markdown("#### 🎯 Editor de Sembrado Manual")
@@ -2008,12 +2157,12 @@ def sembrado_competencia_interface():
             st.markdown("##### 🏊 Series y Carriles")
             
             for serie_idx, serie in enumerate(seeding_data['series']):
-                st.markdown(f"**Serie {serie['serie']}**")
+                st.markdown(f"**{titulo_serie(serie, mostrar_sesion=True)}**")
                 
-                # Crear columnas para los 8 carriles
-                lane_cols = st.columns(8)
+                # Crear una columna por carril de la piscina
+                lane_cols = st.columns(num_lanes)
                 
-                for lane_idx in range(8):
+                for lane_idx in range(num_lanes):
                     with lane_cols[lane_idx]:
                         st.markdown(f"**Carril {lane_idx + 1}**")
                         
@@ -2059,14 +2208,20 @@ def sembrado_competencia_interface():
                                 help="Ingresa el tiempo de competencia en formato MM:SS.dd (ej: 02:15.45)"
                             )
 
-                            # Actualizar tiempo de competencia si cambió
+                            # Actualizar tiempo de competencia si cambió (y guardarlo en el almacén de resultados)
                             if new_comp_time != current_comp_time:
                                 seeding_data['series'][serie_idx]['carriles'][lane_idx]['tiempo_competencia'] = new_comp_time
                                 st.session_state[seeding_key] = seeding_data
+                                ResultadosStore().registrar_tiempo(
+                                    selected_event, gender_filter, serie['serie'], lane_idx + 1,
+                                    current_swimmer, new_comp_time
+                                )
 
                             # Botón para remover nadador
                             if st.button("❌", key=f"remove_{serie_idx}_{lane_idx}", help="Remover nadador"):
-                                # Mover a disponibles
+                                # Mover a disponibles, sin el tiempo anotado (deja de puntuar)
+                                ResultadosStore().retirar_nadadores(selected_event, gender_filter, [current_swimmer])
+                                current_swimmer.pop('tiempo_competencia', None)
                                 seeding_data['nadadores_disponibles'].append(current_swimmer)
                                 seeding_data['series'][serie_idx]['carriles'][lane_idx] = None
                                 st.rerun()
@@ -2109,6 +2264,10 @@ def sembrado_competencia_interface():
                                             
                                             seeding_data['series'][serie_idx]['carriles'][lane_idx] = clean_swimmer
                                             seeding_data['series'][from_serie]['carriles'][from_lane] = None
+                                            # El tiempo ya anotado acompaña al nadador a su nuevo carril
+                                            ResultadosStore().mover_nadador(
+                                                selected_event, gender_filter, clean_swimmer, serie['serie'], lane_idx + 1
+                                            )
                                         else:
                                             # Mover de disponibles
                                             seeding_data['series'][serie_idx]['carriles'][lane_idx] = selected_swimmer
@@ -2127,7 +2286,7 @@ def sembrado_competencia_interface():
                 with col_add:
                     if st.button("➕ Nueva Serie"):
                         new_serie_num = len(seeding_data['series']) + 1
-                        new_serie = {"serie": new_serie_num, "carriles": [None] * 8}
+                        new_serie = {"serie": new_serie_num, "carriles": [None] * num_lanes}
                         seeding_data['series'].append(new_serie)
                         st.rerun()
                 
@@ -2177,7 +2336,7 @@ def sembrado_competencia_interface():
                     current_row = 3
                     for serie in seeding_data['series']:
                         # Título de serie
-                        ws.cell(row=current_row, column=1, value=f"Serie {serie['serie']}").font = Font(bold=True, size=14)
+                        ws.cell(row=current_row, column=1, value=titulo_serie(serie, mostrar_sesion=True)).font = Font(bold=True, size=14)
                         current_row += 1
                         
                         # Headers
@@ -2279,20 +2438,10 @@ def procesar_resultados():
     </div>
     """, unsafe_allow_html=True)
 
-    # Verificar si hay datos de sembrado manual con tiempos de competencia
-    tiempos_competencia_disponibles = False
-    total_tiempos = 0
+    # Tiempos de competencia guardados desde el sembrado manual (persisten entre sesiones)
+    total_tiempos = ResultadosStore().contar()
 
-    for key in st.session_state.keys():
-        if key.startswith('manual_seeding_'):
-            seeding_data = st.session_state[key]
-            for serie in seeding_data.get('series', []):
-                for swimmer in serie['carriles']:
-                    if swimmer and swimmer.get('tiempo_competencia'):
-                        tiempos_competencia_disponibles = True
-                        total_tiempos += 1
-
-    if not tiempos_competencia_disponibles:
+    if not total_tiempos:
         st.markdown("""
         <div class="warning-message">
             ⚠️ No se encontraron tiempos de competencia en el sembrado manual.
@@ -2303,28 +2452,60 @@ def procesar_resultados():
 
     st.success(f"✅ Se encontraron {total_tiempos} tiempos de competencia listos para procesar")
 
-    # Mostrar nuevo sistema de puntos
-    st.markdown("### 🎯 Nuevo Sistema de Puntos")
-
-    col_puntos1, col_puntos2 = st.columns(2)
-
-    with col_puntos1:
-        st.markdown("**Primeros lugares:**")
-        puntos_principales = pd.DataFrame({
-            'Posición': [1, 2, 3, 4],
-            'Puntos': [9, 7, 6, 5]
-        })
-        st.dataframe(puntos_principales, use_container_width=True, hide_index=True)
-
-    with col_puntos2:
-        st.markdown("**Lugares restantes:**")
-        puntos_restantes = pd.DataFrame({
-            'Posición': [5, 6, 7, 8, '9+'],
-            'Puntos': [4, 3, 2, 1, '1*']
-        })
-        st.dataframe(puntos_restantes, use_container_width=True, hide_index=True)
+    # Clasificación en vivo: se actualiza con cada tiempo ingresado en el sembrado manual
+    st.markdown("### 📣 Clasificación en Vivo")
+    results_store = ResultadosStore()
+    col_live_teams, col_live_swimmers = st.columns(2)
+    with col_live_teams:
+        st.markdown("**Equipos**")
+        live_teams = results_store.clasificacion_equipos()
+        live_teams.index = range(1, len(live_teams) + 1)
+        st.dataframe(live_teams, use_container_width=True)
+    with col_live_swimmers:
+        st.markdown("**Nadadores (top 10)**")
+        live_swimmers = results_store.clasificacion_nadadores(limite=10)
+        live_swimmers.index = range(1, len(live_swimmers) + 1)
+        st.dataframe(live_swimmers, use_container_width=True)
+    col_live_info, col_live_refresh = st.columns([3, 1])
+    with col_live_info:
+        st.caption(f"Actualización #{results_store.version_clasificacion()} · solo se recalcula la prueba/categoría de cada tiempo nuevo")
+    with col_live_refresh:
+        if st.button("🔄 Actualizar clasificación", key="refresh_live_standings"):
+            st.rerun()
 
-    st.markdown("_*A partir del 5º lugar se resta 1 punto por posición (mínimo 1 punto)_")
+    # Sistema de puntos del evento (definidos en event_config.json, 'scoring_schemes')
+    st.markdown("### 🎯 Sistema de Puntos")
+
+    scoring_manager = event_manager_module.EventManager()
+    scoring_schemes = scoring_manager.get_scoring_schemes()
+    scheme_names = list(scoring_schemes)
+    active_scheme = scoring_manager.get_scoring_scheme_name()
+    selected_scheme = st.selectbox(
+        "Sistema de puntuación",
+        scheme_names,
+        index=scheme_names.index(active_scheme),
+        key="scoring_scheme_select",
+        help="Los sistemas personalizados se definen en event_config.json ('scoring_schemes')"
+    )
+    if selected_scheme != active_scheme and scoring_manager.is_event_configured():
+        scoring_manager.update_event_config(scoring_scheme=selected_scheme)
+    scheme = scoring_schemes[selected_scheme]
+
+    points_table = scheme['tabla']
+    last_place = len(points_table) - 1
+    puntos_sistema = pd.DataFrame({
+        'Posición': [str(pos) for pos in range(1, last_place)] + [f"{last_place}+"],
+        'Puntos': [f"{p:g}" for p in points_table[1:]]
+    })
+    st.dataframe(puntos_sistema.set_index('Posición').T, use_container_width=True)
+
+    scheme_notes = []
+    if scheme['factor_relevos'] != 1:
+        scheme_notes.append(f"relevos ×{scheme['factor_relevos']:g}")
+    if scheme['max_puntuadores_equipo']:
+        scheme_notes.append(f"máximo {scheme['max_puntuadores_equipo']} nadadores por equipo suman puntos en cada prueba y categoría")
+    if scheme_notes:
+        st.markdown(f"_{'; '.join(scheme_notes).capitalize()}_")
 
     col1, col2 = st.columns([1, 2])
 
@@ -2332,7 +2513,7 @@ def procesar_resultados():
         if st.button("🚀 Procesar Resultados", type="primary"):
             with st.spinner("Procesando resultados con tiempos de competencia..."):
                 try:
-                    success, message = script3.generar_reporte_resultados_completo()
+                    success, message = script3.generar_reporte_resultados_completo(scheme)
                     if success:
                         st.markdown(f"""
                             <div class="success-message">
@@ -2351,8 +2532,8 @@ def procesar_resultados():
             with st.spinner("Cargando vista previa..."):
                 try:
                     resultados_brutos = script3.leer_tiempos_competencia_desde_sembrado()
-                    if resultados_brutos:
-                        resultados_procesados = script3.procesar_resultados_por_categoria_y_genero(resultados_brutos)
+                    if not resultados_brutos.empty:
+                        resultados_procesados = script3.procesar_resultados_por_categoria_y_genero(resultados_brutos, scheme)
                         st.session_state['resultados_preview'] = resultados_procesados
                         st.success(f"✅ Vista previa cargada: {len(resultados_procesados)} resultados")
                     else:
@@ -2376,12 +2557,11 @@ def procesar_resultados():
         st.markdown("---")
         st.markdown("### 📊 Vista Previa de Resultados")
 
-        resultados_data = st.session_state['resultados_preview']
+        df_resultados = st.session_state['resultados_preview']
 
-        if resultados_data:
-            df_resultados = pd.DataFrame(resultados_data)
+        if df_resultados is not None and not df_resultados.empty:
 
-            tab1, tab2 = st.tabs(["🏅 Resultados por Categoría y Género", "🏢 Resumen por Equipos"])
+            tab1, tab2, tab3 = st.tabs(["🏅 Resultados por Categoría y Género", "🏢 Resumen por Equipos", "🔀 Comparar Sistemas"])
 
             with tab1:
                 st.markdown("#### 🏅 Ranking por Categoría y Género (Ordenado por Tiempo)")
@@ -2413,13 +2593,8 @@ def procesar_resultados():
                 st.markdown("#### 🏢 Resumen de Puntos por Equipo")
 
                 # Calcular puntos por equipo
-                puntos_equipos = df_resultados.groupby('Equipo').agg({
-                    'Puntos': 'sum',
-                    'Nombre': 'count'
-                }).reset_index()
+                puntos_equipos = script3.generar_resumen_equipos(df_resultados)
                 puntos_equipos.columns = ['Equipo', 'Puntos Totales', 'Participaciones']
-                puntos_equipos = puntos_equipos.sort_values('Puntos Totales', ascending=False)
-                puntos_equipos.reset_index(drop=True, inplace=True)
                 puntos_equipos.index += 1  # Empezar desde 1
 
                 # Función para destacar primeros equipos
@@ -2437,6 +2612,22 @@ def procesar_resultados():
                     puntos_equipos.style.apply(highlight_teams, axis=1),
                     use_container_width=True
                 )
+
+            with tab3:
+                st.markdown("#### 🔀 Clasificación por Equipos con Otros Sistemas de Puntos")
+                st.caption("Recalcula los puntos de los mismos resultados con cada sistema, sin volver a leer los tiempos")
+
+                compare_names = st.multiselect(
+                    "Sistemas a comparar",
+                    scheme_names,
+                    default=scheme_names,
+                    key="scoring_compare_select"
+                )
+                if compare_names:
+                    comparison = script3.comparar_esquemas(
+                        df_resultados, [scoring_schemes[name] for name in compare_names]
+                    )
+                    st.dataframe(comparison, use_container_width=True, hide_index=True)
     
     # Sección de limpieza de resultados
     st.markdown("---")
@@ -2463,6 +2654,10 @@ def procesar_resultados():
                     except Exception as e:
                         st.error(f"❌ Error eliminando {file}: {e}")
             
+            stored_times = ResultadosStore().limpiar()
+            if stored_times:
+                deleted.append(f"{stored_times} tiempos de competencia guardados")
+            
             if deleted:
                 st.success(f"✅ Eliminados: {', '.join(deleted)}")
                 st.rerun()
@@ -2481,6 +2676,12 @@ def procesar_resultados():
             else:
                 st.info("ℹ️ No hay reporte que eliminar")
 
+def _seleccionar_papeleta(papeleta):
+    """Callback de Anterior/Siguiente: fija prueba, serie y carril antes del próximo rerun"""
+    st.session_state.papeleta_prueba = papeleta['prueba']
+    st.session_state.papeleta_serie = (papeleta['categoria'], papeleta['serie'])
+    st.session_state.papeleta_carril = papeleta['carril']
+
 def generar_papeletas_interface():
     """Interfaz independiente para generar papeletas PDF y Excel con vista previa"""
     st.markdown("## 📋 Generar Papeletas para Jueces")
@@ -2502,9 +2703,10 @@ def generar_papeletas_interface():
         """, unsafe_allow_html=True)
         return
     
-    # Leer y mostrar vista previa de papeletas
+    # Leer y mostrar vista previa de papeletas (sembrado e índice en caché por versión de la planilla)
     try:
-        papeletas_data = papeletas_excel_module.leer_datos_sembrado()
+        # Misma distribución en series (directa, circular o por sesiones) que sembrado_competencia.xlsx
+        papeletas_data, indice_papeletas = cargar_papeletas("planilla_inscripcion.xlsx", POR_CATEGORIA, *distribucion_sembrado())
         if not papeletas_data:
             st.error("No se encontraron datos del sembrado")
             return
@@ -2514,29 +2716,42 @@ def generar_papeletas_interface():
         # Vista previa de papeletas
         st.markdown("### 👁️ Vista Previa de Papeletas")
         
-        # Navegador de papeletas
-        col_nav1, col_nav2, col_nav3 = st.columns([1, 2, 1])
+        # Navegador por prueba → serie → carril: cada selector sólo lista las opciones del nivel elegido
+        pruebas = list(indice_papeletas)
+        if st.session_state.get("papeleta_prueba") not in indice_papeletas:
+            st.session_state.papeleta_prueba = pruebas[0]
+        col_prueba, col_serie, col_carril = st.columns([3, 2, 1])
+        with col_prueba:
+            prueba_sel = st.selectbox("Prueba:", pruebas, key="papeleta_prueba")
         
-        with col_nav2:
-            # Selector de papeleta
-            papeleta_index = st.selectbox(
-                f"Selecciona papeleta (1-{len(papeletas_data)}):",
-                range(len(papeletas_data)),
-                format_func=lambda x: f"Papeleta {x+1}: {papeletas_data[x]['nombre']} - {papeletas_data[x]['prueba'].split(' - ')[0]}",
-                key="papeleta_selector"
+        series_prueba = indice_papeletas[prueba_sel]
+        if st.session_state.get("papeleta_serie") not in series_prueba:
+            st.session_state.papeleta_serie = next(iter(series_prueba))
+        with col_serie:
+            serie_sel = st.selectbox(
+                "Serie:",
+                list(series_prueba),
+                format_func=lambda grupo: f"Serie {grupo[1]} - {grupo[0]}",
+                key="papeleta_serie"
             )
         
-        with col_nav1:
-            if st.button("⬅️ Anterior", disabled=(papeleta_index == 0)):
-                if papeleta_index > 0:
-                    st.session_state.papeleta_selector = papeleta_index - 1
-                    st.rerun()
+        posiciones_carril = dict(series_prueba[serie_sel])
+        if st.session_state.get("papeleta_carril") not in posiciones_carril:
+            st.session_state.papeleta_carril = next(iter(posiciones_carril))
+        with col_carril:
+            carril_sel = st.selectbox("Carril:", list(posiciones_carril), key="papeleta_carril")
+        papeleta_index = posiciones_carril[carril_sel]
         
+        col_nav1, col_nav2, col_nav3 = st.columns([1, 2, 1])
+        with col_nav1:
+            st.button("⬅️ Anterior", disabled=(papeleta_index == 0), key="papeleta_anterior",
+                      on_click=_seleccionar_papeleta, args=(papeletas_data[max(papeleta_index - 1, 0)],))
+        with col_nav2:
+            st.caption(f"Papeleta {papeleta_index + 1} de {len(papeletas_data)}")
         with col_nav3:
-            if st.button("Siguiente ➡️", disabled=(papeleta_index == len(papeletas_data)-1)):
-                if papeleta_index < len(papeletas_data)-1:
-                    st.session_state.papeleta_selector = papeleta_index + 1
-                    st.rerun()
+            st.button("Siguiente ➡️", disabled=(papeleta_index == len(papeletas_data) - 1), key="papeleta_siguiente",
+                      on_click=_seleccionar_papeleta,
+                      args=(papeletas_data[min(papeleta_index + 1, len(papeletas_data) - 1)],))
         
         # Mostrar papeleta seleccionada
         nadador_actual = papeletas_data[papeleta_index]
@@ -2556,7 +2771,7 @@ def generar_papeletas_interface():
             # Serie y Carril en columnas
             col_serie, col_carril = st.columns(2)
             with col_serie:
-                st.metric("🏁 SERIE", nadador_actual['serie'])
+                st.metric("🏁 SERIE", texto_serie(nadador_actual))
             with col_carril:
                 st.metric("🛤️ CARRIL", nadador_actual['carril'])
             
@@ -2599,7 +2814,7 @@ def generar_papeletas_interface():
         with col_info1:
             st.metric("Papeleta", f"{papeleta_index + 1} de {len(papeletas_data)}")
         with col_info2:
-            st.metric("Serie Asignada", f"{nadador_actual['serie']}")
+            st.metric("Serie Asignada", texto_serie(nadador_actual))
         with col_info3:
             st.metric("Carril Asignado", f"{nadador_actual['carril']}")
         with col_info4:
@@ -2636,7 +2851,7 @@ def generar_papeletas_interface():
                 col_s, col_c = st.columns(2)
                 with col_s:
                     st.markdown("#### 🏁 SERIE:")
-                    st.markdown(f"# {nadador_actual['serie']}")
+                    st.markdown(f"# {texto_serie(nadador_actual)}")
                 with col_c:
                     st.markdown("#### 🛤️ CARRIL:")
                     st.markdown(f"# {nadador_actual['carril']}")
@@ -2675,11 +2890,15 @@ def generar_papeletas_interface():
             
             st.markdown("*Esta vista simula el tamaño real de impresión*")
         
-        # Lista compacta de todas las papeletas
-        with st.expander(f"📊 Ver lista completa ({len(papeletas_data)} papeletas)"):
-            df_preview = pd.DataFrame(papeletas_data)
+        # Lista compacta de las papeletas de la prueba seleccionada
+        posiciones_prueba = [posicion for carriles in series_prueba.values() for _, posicion in carriles]
+        with st.expander(f"📊 Ver papeletas de la prueba ({len(posiciones_prueba)} papeletas)"):
+            df_preview = pd.DataFrame([papeletas_data[posicion] for posicion in posiciones_prueba])
+            columnas_preview = ['categoria', 'serie', 'carril', 'nombre', 'equipo', 'tiempo_inscripcion']
+            if df_preview['sesion'].notna().any():
+                columnas_preview.insert(1, 'sesion')
             st.dataframe(
-                df_preview[['nombre', 'prueba', 'equipo', 'categoria', 'tiempo_inscripcion']], 
+                df_preview[columnas_preview], 
                 use_container_width=True,
                 hide_index=True
             )
@@ -2749,10 +2968,22 @@ def generar_papeletas_interface():
         st.markdown("### 📊 Papeletas 3x3 Excel")
         st.info("Formato: Exacto como Excel, 3 papeletas por fila para imprimir y recortar")
 
+        renderizador = st.radio(
+            "Renderizador:",
+            ["Estándar (3x3)", "Rápido (3x6 por hoja)"],
+            key="papeletas_3x3_renderizador",
+            help="El modo rápido dibuja cada papeleta directo en el PDF: 18 por hoja y mucho más veloz en competencias grandes"
+        )
+        modo_rapido = renderizador.startswith("Rápido")
+        archivo_3x3 = "papeletas_jueces_rapido.pdf" if modo_rapido else "papeletas_jueces_excel_3_per_row.pdf"
+
         if st.button("🚀 Generar 3x3 Excel", type="primary", key="gen_excel_3x3"):
             with st.spinner("Generando papeletas 3x3 Excel..."):
                 try:
-                    success, message = papeletas_pdf_module.generar_papeletas_pdf_excel_3_per_row()
+                    if modo_rapido:
+                        success, message = papeletas_pdf_module.generar_papeletas_pdf_rapido()
+                    else:
+                        success, message = papeletas_pdf_module.generar_papeletas_pdf_excel_3_per_row()
                     if success:
                         st.success(message)
                     else:
@@ -2761,16 +2992,71 @@ def generar_papeletas_interface():
                     st.error(f"Error al generar papeletas 3x3 Excel: {e}")
 
         # Descarga 3x3 Excel PDF
-        if os.path.exists("papeletas_jueces_excel_3_per_row.pdf"):
-            with open("papeletas_jueces_excel_3_per_row.pdf", "rb") as file:
+        if os.path.exists(archivo_3x3):
+            with open(archivo_3x3, "rb") as file:
                 st.download_button(
                     label="⬇️ Descargar 3x3 Excel PDF",
                     data=file.read(),
-                    file_name="papeletas_jueces_excel_3_per_row.pdf",
+                    file_name=archivo_3x3,
                     mime="application/pdf",
                     key="download_excel_3x3"
                 )
 
+    # Generación en paralelo: un PDF por prueba y el documento completo concatenado
+    st.markdown("---")
+    st.markdown("### ⚡ Papeletas PDF por Prueba (en paralelo)")
+    st.info("Cada prueba se genera en un proceso aparte y luego se unen en el PDF completo. "
+            "Los PDFs por prueba quedan disponibles para reimprimir una sola prueba.")
+
+    formatos_pdf = papeletas_pdf_module.FORMATOS
+    formato_paralelo = st.selectbox(
+        "Formato:",
+        list(formatos_pdf.keys()),
+        format_func=lambda f: formatos_pdf[f]['descripcion'],
+        key="papeletas_formato_paralelo"
+    )
+
+    if st.button("🚀 Generar en Paralelo", type="primary", key="gen_pdf_paralelo"):
+        with st.spinner("Generando papeletas por prueba..."):
+            try:
+                success, message = papeletas_pdf_module.generar_papeletas_pdf_paralelo(formato_paralelo)
+                if success:
+                    st.success(message)
+                else:
+                    st.error(message)
+            except Exception as e:
+                st.error(f"Error al generar papeletas en paralelo: {e}")
+
+    archivos_evento = papeletas_pdf_module.archivos_papeletas_por_evento(formato_paralelo)
+    if archivos_evento:
+        col_completo, col_evento = st.columns(2)
+        archivo_completo = papeletas_pdf_module.ruta_papeletas(papeletas_pdf_module.ARCHIVO_PAPELETAS, formato_paralelo)
+        with col_completo:
+            if os.path.exists(archivo_completo):
+                with open(archivo_completo, "rb") as file:
+                    st.download_button(
+                        label="⬇️ Descargar PDF Completo",
+                        data=file.read(),
+                        file_name=os.path.basename(archivo_completo),
+                        mime="application/pdf",
+                        key="download_pdf_paralelo"
+                    )
+        with col_evento:
+            archivo_evento = st.selectbox(
+                "Reimprimir prueba:",
+                archivos_evento,
+                format_func=lambda ruta: os.path.splitext(os.path.basename(ruta))[0].replace('_', ' '),
+                key="papeletas_evento_reimprimir"
+            )
+            with open(archivo_evento, "rb") as file:
+                st.download_button(
+                    label="⬇️ Descargar PDF de la Prueba",
+                    data=file.read(),
+                    file_name=os.path.basename(archivo_evento),
+                    mime="application/pdf",
+                    key="download_pdf_evento"
+                )
+
 def gestion_archivos():
     st.markdown("## 📁 Gestión de Archivos")
     
@@ -2816,22 +3102,11 @@ def gestion_archivos():
         st.markdown("#### 📊 Base de Datos Local")
         if os.path.exists("BASE-DE-DATOS.xlsx"):
             st.success("✅ Base de datos local disponible")
-            # Mostrar información de la base de datos local
+            # Mostrar información de la base de datos local (desde el almacén compilado)
             try:
-                xl_file = pd.ExcelFile("BASE-DE-DATOS.xlsx")
-                target_sheets = ['FPROYECCION 2025T', 'M. PROYECCION 2025']
-                available_sheets = [s for s in target_sheets if s in xl_file.sheet_names]
-                st.info(f"🔍 Hojas disponibles: {', '.join(available_sheets)}")
-                
-                # Contar registros totales
-                total_records = 0
-                for sheet in available_sheets:
-                    try:
-                        df = pd.read_excel("BASE-DE-DATOS.xlsx", sheet_name=sheet)
-                        total_records += len(df)
-                    except:
-                        pass
-                st.info(f"📈 Total de registros: {total_records:,}")
+                resumen = BaseDatosStore("BASE-DE-DATOS.xlsx").resumen()
+                st.info(f"🔍 Hojas disponibles: {', '.join(resumen['hojas'])}")
+                st.info(f"📈 Total de registros: {resumen['total_filas']:,}")
                 
             except Exception as e:
                 pass  # No mostrar error innecesario
@@ -2867,15 +3142,9 @@ def gestion_archivos():
                     st.success("✅ Base de datos externa cargada correctamente")
                     st.info(f"🔍 Hojas encontradas: {', '.join(available_sheets)}")
                     
-                    # Contar registros
-                    total_records = 0
-                    for sheet in available_sheets:
-                        try:
-                            df = pd.read_excel("BASE-DE-DATOS.xlsx", sheet_name=sheet)
-                            total_records += len(df)
-                        except:
-                            pass
-                    st.info(f"📈 Total de registros cargados: {total_records:,}")
+                    # Compilar la nueva base una sola vez y contar registros
+                    resumen = BaseDatosStore("BASE-DE-DATOS.xlsx").resumen()
+                    st.info(f"📈 Total de registros cargados: {resumen['total_filas']:,}")
                     st.rerun()
                 else:
                     os.remove("BASE-DE-DATOS-TEMP.xlsx")
@@ -2964,7 +3233,7 @@ def inscripcion_nadadores_interface():
         # Método de inscripción
         inscripcion_method = st.radio(
             "Método de inscripción:",
-            ["✍️ Manual", "🔍 Buscar en Base de Datos", "📤 Importar desde Excel"],
+            ["✍️ Manual", "🔍 Buscar en Base de Datos", "🏢 Inscribir Club", "📤 Importar desde Excel"],
             horizontal=True
         )
         
@@ -3088,20 +3357,11 @@ def inscripcion_nadadores_interface():
                 with col_db1:
                     if os.path.exists("BASE-DE-DATOS.xlsx"):
                         try:
-                            xl_file = pd.ExcelFile("BASE-DE-DATOS.xlsx")
-                            target_sheets = ['FPROYECCION 2025T', 'M. PROYECCION 2025']
-                            available_sheets = [s for s in target_sheets if s in xl_file.sheet_names]
+                            resumen = registration_system.base_datos.resumen()
+                            available_sheets = resumen['hojas']
                             
                             if available_sheets:
-                                # Contar registros
-                                total_records = 0
-                                for sheet in available_sheets:
-                                    try:
-                                        df = pd.read_excel("BASE-DE-DATOS.xlsx", sheet_name=sheet)
-                                        total_records += len(df)
-                                    except:
-                                        pass
-                                
+                                total_records = resumen['total_filas']
                                 st.success(f"✅ Base de datos activa: {total_records:,} atletas ({len(available_sheets)} hojas)")
                             else:
                                 st.warning("⚠️ Base de datos sin hojas válidas")
@@ -3152,7 +3412,7 @@ def inscripcion_nadadores_interface():
             search_term = st.text_input(
                 "Buscar nadador por nombre:",
                 placeholder="Escribe el nombre del nadador...",
-                help="Se buscará en la base de datos activa"
+                help="Búsqueda aproximada en la base de datos activa (ignora tildes, mayúsculas y el orden de los nombres)"
             )
             
             if search_term and len(search_term.strip()) >= 3:
@@ -3223,6 +3483,83 @@ def inscripcion_nadadores_interface():
             else:
                 st.warning(f"⚠️ No se encontró la base de datos: `{registration_system.archivo_base_datos}`")
         
+        elif inscripcion_method == "🏢 Inscribir Club":
+            # INSCRIPCIÓN DE UN CLUB COMPLETO DESDE LA BASE DE DATOS
+            st.markdown("### Inscribir Club desde Base de Datos")
+            
+            if not os.path.exists(registration_system.archivo_base_datos):
+                st.warning(f"⚠️ No se encontró la base de datos: `{registration_system.archivo_base_datos}`")
+            else:
+                club_mode = st.radio(
+                    "Seleccionar nadadores por:",
+                    ["🏊 Equipo", "📝 Lista de nombres"],
+                    horizontal=True,
+                    key="club_batch_mode"
+                )
+                
+                team_name = None
+                athlete_names = None
+                if club_mode == "🏊 Equipo":
+                    equipos = registration_system.base_datos.equipos()
+                    if equipos:
+                        team_name = st.selectbox(
+                            "Equipo:",
+                            [equipo for equipo, _ in equipos],
+                            format_func=lambda equipo: f"{equipo} ({dict(equipos)[equipo]} atletas)",
+                            key="club_batch_team"
+                        )
+                    else:
+                        st.info("La base de datos no tiene equipos registrados")
+                else:
+                    names_text = st.text_area(
+                        "Nombres de los atletas (uno por línea):",
+                        height=200,
+                        key="club_batch_names"
+                    )
+                    athlete_names = [line.strip() for line in names_text.splitlines() if line.strip()]
+                
+                if st.button("🔎 Preparar inscripción", key="club_batch_prepare"):
+                    with st.spinner("Resolviendo atletas en la base de datos..."):
+                        swimmers_batch, batch_report, batch_message = registration_system.prepare_club_from_database(
+                            team_name=team_name, athlete_names=athlete_names
+                        )
+                    st.session_state.club_batch = (swimmers_batch, batch_report, batch_message)
+                
+                if 'club_batch' in st.session_state:
+                    swimmers_batch, batch_report, batch_message = st.session_state.club_batch
+                    
+                    if batch_report['no_encontrados']:
+                        st.warning("⚠️ No encontrados en la base de datos: " + ", ".join(batch_report['no_encontrados']))
+                    if batch_report.get('sin_sexo'):
+                        st.warning("⚠️ Sin sexo registrado en la base de datos (no se inscriben): " + ", ".join(batch_report['sin_sexo']))
+                    
+                    if swimmers_batch:
+                        st.success(batch_message)
+                        preview_df = pd.DataFrame([{
+                            'Nombre': s['name'],
+                            'Equipo': s['team'],
+                            'Edad': s['age'],
+                            'Categoría': s['category'],
+                            'Sexo': s['gender'],
+                            'Pruebas': len(s['events']),
+                            'Con tiempo': sum(1 for t in s['events'].values() if t != 's/t'),
+                        } for s in swimmers_batch])
+                        st.dataframe(preview_df, use_container_width=True, hide_index=True)
+                        
+                        if st.button(f"✅ Inscribir {len(swimmers_batch)} nadadores", type="primary", key="club_batch_commit"):
+                            with st.spinner("Inscribiendo nadadores..."):
+                                success, batch_commit_message, commit_report = registration_system.register_swimmers_batch(swimmers_batch)
+                            del st.session_state.club_batch
+                            if success:
+                                st.success(batch_commit_message)
+                                st.balloons()
+                            else:
+                                st.warning(batch_commit_message)
+                            if commit_report['duplicados']:
+                                st.info("Ya inscritos (omitidos): " + ", ".join(commit_report['duplicados']))
+                    else:
+                        st.warning(batch_message)
+        
         elif inscripcion_method == "📤 Importar desde Excel":
             # IMPORTACIÓN MASIVA DESDE EXCEL
             st.markdown("### Importar Nadadores desde Excel")
@@ -3246,6 +3583,7 @@ def inscripcion_nadadores_interface():
                 st.markdown("#### 📥 Subir Archivo de Inscripciones")
             
             with col2:
+                registration_system.export_registration_file()
                 if os.path.exists("planilla_inscripcion.xlsx"):
                     with open("planilla_inscripcion.xlsx", "rb") as file:
                         st.download_button(
@@ -3303,10 +3641,11 @@ def inscripcion_nadadores_interface():
                 with col2:
                     if st.button("🚀 Importar Nadadores", type="primary", use_container_width=True):
                         with st.spinner("Importando nadadores..."):
-                            success, message = registration_system.bulk_import_from_excel(uploaded_file)
+                            success, message, import_report = registration_system.bulk_import_from_excel(uploaded_file)
                             
                             # Guardar resultado en session_state
                             st.session_state.bulk_import_result = (success, message)
+                            st.session_state.bulk_import_report = import_report
                             st.session_state.bulk_import_completed = True
                             
                             if success:
@@ -3353,6 +3692,20 @@ def inscripcion_nadadores_interface():
                                 if key.startswith('bulk_import_'):
                                     del st.session_state[key]
                             st.rerun()
+                    
+                    # Reporte detallado por fila (omitidos y advertencias)
+                    import_report = st.session_state.get('bulk_import_report') or []
+                    if import_report:
+                        with st.expander(f"📋 Reporte por fila ({len(import_report)} observaciones)"):
+                            report_df = pd.DataFrame(import_report)
+                            st.dataframe(report_df, use_container_width=True, hide_index=True)
+                            st.download_button(
+                                label="📥 Descargar reporte (CSV)",
+                                data=report_df.to_csv(index=False).encode('utf-8-sig'),
+                                file_name="reporte_importacion.csv",
+                                mime="text/csv",
+                                key="bulk_import_report_download"
+                            )
             
             else:
                 st.info("📤 Selecciona un archivo Excel para importar nadadores masivamente")
@@ -3550,6 +3903,7 @@ def inscripcion_nadadores_interface():
                     st.error(message)
 
         with col_actions2:
+            registration_system.export_registration_file()
             if os.path.exists(registration_system.archivo_inscripcion):
                 with open(registration_system.archivo_inscripcion, "rb") as file:
                     st.download_button(
@@ -3621,13 +3975,13 @@ def inscripcion_nadadores_interface():
 
         with col_clean2:
             if st.button("👥 Limpiar Inscripciones", type="secondary", help="Eliminar planilla de inscripción"):
-                if os.path.exists("planilla_inscripcion.xlsx"):
-                    try:
-                        os.remove("planilla_inscripcion.xlsx")
-                        st.success("✅ Inscripciones eliminadas")
+                if registration_system.store.existe():
+                    success, message = registration_system.clear_registrations()
+                    if success:
+                        st.success(message)
                         st.rerun()
-                    except Exception as e:
-                        st.error(f"Error al limpiar: {e}")
+                    else:
+                        st.error(message)
                 else:
                     st.info("No hay archivo de inscripciones para limpiar")
 
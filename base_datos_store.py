@@ -0,0 +1,596 @@
+"""
+Base de datos de atletas (BASE-DE-DATOS.xlsx) compilada a SQLite con índices.
+
+El libro Excel se lee una sola vez: las hojas ``FPROYECCION 2025T`` y
+``M. PROYECCION 2025`` se combinan con las fechas de nacimiento de ``ATLETAS`` y el
+resultado queda en ``BASE-DE-DATOS.db`` con índices por nombre normalizado, prueba y
+equipo. Si el .xlsx cambia (fecha de modificación y contenido), el almacén se
+recompila automáticamente en la siguiente consulta.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import unicodedata
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from registro_store import fila_a_json, decodificar_valor
+from tiempos_utils import parse_times_series
+
+# Cambiar al modificar el esquema o la forma de compilar (fuerza recompilación)
+VERSION_ESQUEMA = 3
+
+HOJAS_OBJETIVO = ['FPROYECCION 2025T', 'M. PROYECCION 2025']
+# Índices de búsqueda en memoria por almacén (ver BaseDatosStore._indice_busqueda)
+_INDICES = {}
+
+COLUMNAS_RELEVANTES = ['ATLETA', 'EQUIPO', 'CATEGORIA', 'SEXO', 'EDAD', 'PRUEBA', 'TIEMPO', 'F. COMPETENCIA']
+
+# Pruebas de la base de datos → pruebas del sistema (nombres en mayúsculas)
+MAPEO_PRUEBAS = {
+    '25M PATADA LIBRE': '25M PATADA LIBRE',
+    '25M LIBRE CON TABLA': '25M LIBRE CON TABLA',
+    '25M LIBRE INSTINTIVO': '25M LIBRE INSTINTIVO',
+    '25M LIBRE': '25M LIBRE',
+    '25M PECHO': '25M PECHO',
+    '25M MARIPOSA': '25M MARIPOSA',
+    '50M LIBRE CON ALETAS': '50M LIBRE CON ALETAS',
+    '50M LIBRE': '50M LIBRE',
+    '100M LIBRE': '100M LIBRE',
+    '200M LIBRE': '200M LIBRE',
+    '400M LIBRE': '400M LIBRE',
+    '50M ESPALDA': '50M ESPALDA',
+    '100M ESPALDA': '100M ESPALDA',
+    '200M ESPALDA': '200M ESPALDA',
+    '50M PECHO': '50M PECHO',
+    '100M PECHO': '100M PECHO',
+    '200M PECHO': '200M PECHO',
+    '50M MARIPOSA': '50M MARIPOSA',
+    '100M MARIPOSA': '100M MARIPOSA',
+    '200M MARIPOSA': '200M MARIPOSA',
+    '200M COMBINADO INDIVIDUAL': '200M COMBINADO INDIVIDUAL',
+    '400M COMBINADO INDIVIDUAL': '400M COMBINADO INDIVIDUAL',
+    # Variaciones de nombre en la base de datos
+    '50M CROLL': '50M LIBRE',
+    '100M CROLL': '100M LIBRE',
+    '200M CROLL': '200M LIBRE',
+    '400M CROLL': '400M LIBRE',
+    '200M COMBINADO': '200M COMBINADO INDIVIDUAL',
+    '400M COMBINADO': '400M COMBINADO INDIVIDUAL',
+}
+# Misma tabla con la clave sin espacios ("50 M LIBRE" y "50MLIBRE" también coinciden)
+_MAPEO_SIN_ESPACIOS = {k.replace(' ', ''): v for k, v in MAPEO_PRUEBAS.items()}
+
+
+def ruta_store(archivo_base_datos):
+    """BASE-DE-DATOS.xlsx → BASE-DE-DATOS.db"""
+    return os.path.splitext(archivo_base_datos)[0] + '.db'
+
+
+def normalizar_texto(valor):
+    """Mayúsculas, sin tildes y con espacios simples (clave de búsqueda e índice)."""
+    if valor is None:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(valor))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.upper().split())
+
+
+def trigramas(texto_norm, prefijo=False):
+    """
+    Trigramas por palabra con relleno (``"  JOSE "``), como pg_trgm. Con ``prefijo`` la
+    última palabra no se cierra, para que "jose pe" encuentre "JOSE PEREZ" mientras se escribe.
+    """
+    palabras = texto_norm.split()
+    resultado = set()
+    for i, palabra in enumerate(palabras):
+        final = '' if prefijo and i == len(palabras) - 1 else ' '
+        rellena = f"  {palabra}{final}"
+        resultado.update(rellena[j:j + 3] for j in range(len(rellena) - 2))
+    return resultado
+
+
+def _fecha_texto(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (pd.Timestamp, datetime, date)):
+        return pd.Timestamp(valor).date().isoformat()
+    return str(valor)
+
+
+def calcular_mejores_tiempos(atletas_norm, pruebas_norm, tiempos_seg, fechas, pruebas_originales):
+    """
+    Mejor marca por (atleta, prueba del sistema) en una sola pasada agrupada.
+
+    Recibe columnas alineadas y devuelve un DataFrame con ``atleta_norm``,
+    ``prueba_sistema``, ``tiempo_seg``, ``fecha`` y ``prueba_original``. Se descartan
+    pruebas sin equivalencia en el sistema y tiempos vacíos o en cero.
+    """
+    df = pd.DataFrame({
+        'atleta_norm': atletas_norm,
+        'prueba_sistema': pd.Series(pruebas_norm, dtype=object).str.replace(' ', '', regex=False).map(_MAPEO_SIN_ESPACIOS),
+        'tiempo_seg': pd.Series(tiempos_seg, dtype='float64'),
+        'fecha': fechas,
+        'prueba_original': pruebas_originales,
+    })
+    df = df[(df['atleta_norm'] != '') & df['prueba_sistema'].notna() & np.isfinite(df['tiempo_seg'])]
+    if df.empty:
+        return df
+    # idxmin conserva el primer registro en caso de empate (como la comparación anterior)
+    mejores = df.loc[df.groupby(['atleta_norm', 'prueba_sistema'], sort=False)['tiempo_seg'].idxmin()]
+    mejores = mejores.copy()
+    mejores['fecha'] = mejores['fecha'].map(_fecha_texto)
+    mejores['prueba_original'] = mejores['prueba_original'].map(lambda v: None if pd.isna(v) else str(v).strip())
+    return mejores.reset_index(drop=True)
+
+
+def _patron_contiene(texto):
+    """Patrón LIKE "contiene" con los comodines del texto escapados (ESCAPE '\\')."""
+    return '%' + texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _hash_archivo(ruta):
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def leer_base_datos_excel(archivo_base_datos):
+    """
+    Lee y combina las hojas del libro Excel (operación costosa: solo al compilar).
+
+    Devuelve ``(df, mensaje, filas_por_hoja)``; ``df`` es None si no hay hojas válidas.
+    """
+    xl_file = pd.ExcelFile(archivo_base_datos)
+
+    # Primero cargar la hoja ATLETAS para obtener fechas de nacimiento
+    atletas_df = None
+    if 'ATLETAS' in xl_file.sheet_names:
+        try:
+            atletas_df = xl_file.parse('ATLETAS', header=0)
+            print(f"Hoja ATLETAS cargada con {len(atletas_df)} registros")
+        except Exception as e:
+            print(f"Error al cargar hoja ATLETAS: {e}")
+
+    dfs_to_combine = []
+    sheets_loaded = []
+    filas_por_hoja = {}
+
+    for sheet_name in HOJAS_OBJETIVO:
+        try:
+            if sheet_name in xl_file.sheet_names:
+                df_sheet = xl_file.parse(sheet_name, header=0)
+                filas_por_hoja[sheet_name] = len(df_sheet)
+
+                # Filtrar columnas relevantes (evitar duplicaciones)
+                available_columns = [col for col in COLUMNAS_RELEVANTES if col in df_sheet.columns]
+
+                if available_columns and len(df_sheet) > 0:
+                    df_filtered = df_sheet[available_columns].copy()
+
+                    # Si tenemos la hoja ATLETAS, hacer merge para obtener fechas de nacimiento
+                    if atletas_df is not None and 'ATLETA' in df_filtered.columns:
+                        birth_date_columns = [
+                            col for col in atletas_df.columns
+                            if any(keyword in str(col).upper() for keyword in ['NACIMIENTO', 'BIRTH', 'FECHA'])
+                        ]
+
+                        if birth_date_columns and 'ATLETA' in atletas_df.columns:
+                            try:
+                                atletas_merge = atletas_df[['ATLETA'] + birth_date_columns].copy()
+                                # Limpiar nombres para mejor matching
+                                atletas_merge['ATLETA_CLEAN'] = atletas_merge['ATLETA'].astype(str).str.strip().str.upper()
+                                df_filtered['ATLETA_CLEAN'] = df_filtered['ATLETA'].astype(str).str.strip().str.upper()
+
+                                df_merged = df_filtered.merge(
+                                    atletas_merge,
+                                    left_on='ATLETA_CLEAN',
+                                    right_on='ATLETA_CLEAN',
+                                    how='left',
+                                    suffixes=('', '_ATLETAS')
+                                )
+                                df_merged = df_merged.drop(['ATLETA_CLEAN', 'ATLETA_ATLETAS'], axis=1, errors='ignore')
+
+                                merged_count = df_merged[birth_date_columns[0]].notna().sum()
+                                print(f"Merge con ATLETAS - {sheet_name}: {merged_count}/{len(df_merged)} registros con fecha de nacimiento")
+
+                                df_filtered = df_merged
+                            except Exception as e:
+                                print(f"Error en merge con ATLETAS para {sheet_name}: {e}")
+                                # Continuar sin las fechas de nacimiento si falla el merge
+
+                    dfs_to_combine.append(df_filtered)
+                    sheets_loaded.append(sheet_name)
+        except Exception as e:
+            print(f"Error al cargar hoja {sheet_name}: {e}")
+            continue
+
+    # Si no se pudieron cargar las hojas objetivo, buscar alternativas
+    if not dfs_to_combine:
+        for sheet in xl_file.sheet_names:
+            if any(keyword in sheet.upper() for keyword in ['PROYECCION', '2025', 'FPROYECCION']):
+                try:
+                    df = xl_file.parse(sheet, header=0)
+                    if 'ATLETA' in df.columns:
+                        dfs_to_combine.append(df)
+                        sheets_loaded.append(sheet)
+                        filas_por_hoja[sheet] = len(df)
+                        break
+                except Exception:
+                    continue
+
+    if not dfs_to_combine:
+        return None, "No se pudieron cargar datos de las hojas de la base de datos", filas_por_hoja
+
+    combined_df = pd.concat(dfs_to_combine, ignore_index=True)
+    # Eliminar duplicados basados en atleta, prueba y tiempo
+    subset = [c for c in ['ATLETA', 'PRUEBA', 'TIEMPO'] if c in combined_df.columns]
+    combined_df = combined_df.drop_duplicates(subset=subset, keep='first').reset_index(drop=True)
+
+    mensaje = f"Base de datos cargada: {len(combined_df)} registros de {len(sheets_loaded)} hojas ({', '.join(sheets_loaded)})"
+    return combined_df, mensaje, filas_por_hoja
+
+
+class BaseDatosStore:
+    """Consultas indexadas sobre la base de datos de atletas (milisegundos por búsqueda)."""
+
+    def __init__(self, archivo_base_datos='BASE-DE-DATOS.xlsx'):
+        self.archivo_base_datos = archivo_base_datos
+        self.ruta = ruta_store(archivo_base_datos)
+
+    # ===== Infraestructura =====
+
+    @contextmanager
+    def _conectar(self):
+        """Conexión con transacción: commit al salir del bloque, rollback si hay error."""
+        conn = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                self._crear_esquema(conn)
+                yield conn
+        finally:
+            conn.close()
+
+    def _crear_esquema(self, conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS registros (
+                id INTEGER PRIMARY KEY,
+                atleta_norm TEXT NOT NULL DEFAULT '',
+                prueba_norm TEXT NOT NULL DEFAULT '',
+                equipo_norm TEXT NOT NULL DEFAULT '',
+                tiempo_seg REAL,
+                datos TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_registros_atleta ON registros(atleta_norm);
+            CREATE INDEX IF NOT EXISTS idx_registros_prueba ON registros(prueba_norm);
+            CREATE INDEX IF NOT EXISTS idx_registros_equipo ON registros(equipo_norm);
+            CREATE TABLE IF NOT EXISTS atletas (
+                id INTEGER PRIMARY KEY,
+                nombre TEXT NOT NULL,
+                nombre_norm TEXT NOT NULL UNIQUE,
+                n_trigramas INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS trigramas (
+                trigrama TEXT NOT NULL,
+                atleta_id INTEGER NOT NULL,
+                PRIMARY KEY (trigrama, atleta_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS mejores_tiempos (
+                atleta_id INTEGER NOT NULL,
+                prueba_sistema TEXT NOT NULL,
+                tiempo_seg REAL NOT NULL,
+                fecha TEXT,
+                prueba_original TEXT,
+                PRIMARY KEY (atleta_id, prueba_sistema)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+        """)
+
+    def _meta(self, conn, clave, default=None):
+        row = conn.execute('SELECT valor FROM meta WHERE clave = ?', (clave,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, clave, valor):
+        conn.execute(
+            'INSERT INTO meta (clave, valor) VALUES (?, ?) '
+            'ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor',
+            (clave, json.dumps(valor, ensure_ascii=False)),
+        )
+
+    def _sincronizar(self, conn):
+        """
+        Recompila el almacén si el libro Excel cambió. Se compara primero fecha de
+        modificación y tamaño (sin leer el archivo); si difieren, el hash del contenido
+        decide si hace falta volver a parsear el Excel.
+        """
+        st = os.stat(self.archivo_base_datos)
+        firma = [st.st_mtime_ns, st.st_size]
+        if self._meta(conn, 'version') == VERSION_ESQUEMA and self._meta(conn, 'firma') == firma:
+            return
+
+        sha1 = _hash_archivo(self.archivo_base_datos)
+        if self._meta(conn, 'version') == VERSION_ESQUEMA and self._meta(conn, 'sha1') == sha1:
+            self._set_meta(conn, 'firma', firma)
+            return
+
+        print(f"Compilando {self.archivo_base_datos} → {self.ruta}")
+        df, mensaje, filas_por_hoja = leer_base_datos_excel(self.archivo_base_datos)
+        self._reemplazar(conn, df)
+        self._set_meta(conn, 'mensaje', mensaje)
+        self._set_meta(conn, 'filas_por_hoja', filas_por_hoja)
+        self._set_meta(conn, 'firma', firma)
+        self._set_meta(conn, 'sha1', sha1)
+        self._set_meta(conn, 'version', VERSION_ESQUEMA)
+
+    def _reemplazar(self, conn, df):
+        conn.execute('DELETE FROM registros')
+        conn.execute('DELETE FROM atletas')
+        conn.execute('DELETE FROM trigramas')
+        conn.execute('DELETE FROM mejores_tiempos')
+        if df is None:
+            self._set_meta(conn, 'columnas', None)
+            return
+
+        def columna_norm(col):
+            if col not in df.columns:
+                return [''] * len(df)
+            return [normalizar_texto(v) if pd.notna(v) else '' for v in df[col]]
+
+        atletas_norm = columna_norm('ATLETA')
+        self._indexar_atletas(conn, df['ATLETA'] if 'ATLETA' in df.columns else [], atletas_norm)
+
+        if 'TIEMPO' in df.columns:
+            segundos = parse_times_series(df['TIEMPO']).to_numpy()
+        else:
+            segundos = np.full(len(df), np.inf)
+        tiempos = [float(t) if np.isfinite(t) else None for t in segundos]
+        pruebas_norm = columna_norm('PRUEBA')
+
+        conn.executemany(
+            'INSERT INTO registros (id, atleta_norm, prueba_norm, equipo_norm, tiempo_seg, datos) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            zip(
+                range(len(df)),
+                atletas_norm,
+                pruebas_norm,
+                columna_norm('EQUIPO'),
+                tiempos,
+                (fila_a_json(f) for f in df.to_dict('records')),
+            ),
+        )
+        self._set_meta(conn, 'columnas', [str(c) for c in df.columns])
+
+        def columna(col):
+            return df[col].tolist() if col in df.columns else [None] * len(df)
+
+        mejores = calcular_mejores_tiempos(
+            atletas_norm, pruebas_norm, segundos, columna('F. COMPETENCIA'), columna('PRUEBA')
+        )
+        conn.executemany(
+            'INSERT INTO mejores_tiempos (atleta_id, prueba_sistema, tiempo_seg, fecha, prueba_original) '
+            'SELECT id, ?, ?, ?, ? FROM atletas WHERE nombre_norm = ?',
+            zip(mejores['prueba_sistema'], mejores['tiempo_seg'].astype(float), mejores['fecha'],
+                mejores['prueba_original'], mejores['atleta_norm']),
+        )
+
+    def _indexar_atletas(self, conn, nombres, nombres_norm):
+        """Un registro por atleta único (nombre normalizado) con sus trigramas."""
+        unicos = {}
+        for nombre, norm in zip(nombres, nombres_norm):
+            if norm and norm not in unicos:
+                unicos[norm] = str(nombre).strip()
+        atletas = []
+        filas_trigramas = []
+        for atleta_id, (norm, nombre) in enumerate(unicos.items()):
+            tri = trigramas(norm)
+            atletas.append((atleta_id, nombre, norm, len(tri)))
+            filas_trigramas.extend((t, atleta_id) for t in tri)
+        conn.executemany('INSERT INTO atletas (id, nombre, nombre_norm, n_trigramas) VALUES (?, ?, ?, ?)', atletas)
+        conn.executemany('INSERT INTO trigramas (trigrama, atleta_id) VALUES (?, ?)', filas_trigramas)
+
+    def _consultar(self, where='', params=()):
+        """Filas que cumplen la condición, como DataFrame con las columnas originales."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            columnas = self._meta(conn, 'columnas')
+            if columnas is None:
+                return None
+            filas = [
+                {k: decodificar_valor(v) for k, v in json.loads(datos).items()}
+                for (datos,) in conn.execute(f'SELECT datos FROM registros {where} ORDER BY id', params)
+            ]
+        df = pd.DataFrame(filas)
+        for col in columnas:
+            if col not in df.columns:
+                df[col] = np.nan
+        # Fechas decodificadas como Timestamp → columnas datetime64, igual que read_excel
+        return df[columnas].infer_objects()
+
+    # ===== Consultas =====
+
+    def disponible(self):
+        return os.path.exists(self.archivo_base_datos)
+
+    def cargar(self):
+        """Base de datos completa: ``(df, mensaje)`` con el mismo formato que leer el Excel."""
+        if not self.disponible():
+            return None, f"No se encontró el archivo {self.archivo_base_datos}"
+        try:
+            df = self._consultar()
+            with self._conectar() as conn:
+                mensaje = self._meta(conn, 'mensaje', '')
+            return df, mensaje
+        except Exception as e:
+            return None, f"Error al cargar base de datos: {e}"
+
+    def buscar_por_nombre(self, termino):
+        """Registros cuyo nombre contiene ``termino`` (sin distinguir mayúsculas ni tildes)."""
+        patron = _patron_contiene(normalizar_texto(termino))
+        return self._consultar("WHERE atleta_norm LIKE ? ESCAPE '\\'", (patron,))
+
+    def _indice_busqueda(self):
+        """
+        Índice de trigramas en memoria (listas de atletas por trigrama como arrays de
+        NumPy), cargado desde SQLite una vez por versión compilada de la base.
+        """
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            sha1 = self._meta(conn, 'sha1')
+            cache = _INDICES.get(self.ruta)
+            if cache is not None and cache['sha1'] == sha1:
+                return cache
+            atletas = conn.execute('SELECT nombre, nombre_norm, n_trigramas FROM atletas ORDER BY id').fetchall()
+            pares = conn.execute('SELECT trigrama, atleta_id FROM trigramas ORDER BY trigrama').fetchall()
+
+        postings = {}
+        if pares:
+            claves = np.array([t for t, _ in pares], dtype=object)
+            ids = np.array([i for _, i in pares], dtype=np.int32)
+            cortes = np.flatnonzero(claves[1:] != claves[:-1]) + 1
+            for clave, bloque in zip(claves[np.r_[0, cortes]], np.split(ids, cortes)):
+                postings[clave] = bloque
+        cache = {
+            'sha1': sha1,
+            'nombres': [a[0] for a in atletas],
+            'normas': [a[1] for a in atletas],
+            'n_trigramas': np.array([a[2] for a in atletas], dtype=np.float64),
+            'postings': postings,
+        }
+        _INDICES[self.ruta] = cache
+        return cache
+
+    def buscar_atletas(self, termino, limite=20, umbral=0.5):
+        """
+        Búsqueda aproximada de atletas únicos sobre el índice de trigramas.
+
+        Devuelve hasta ``limite`` dicts ``{'nombre', 'nombre_norm', 'puntaje'}`` ordenados
+        por relevancia; ``puntaje`` es la fracción de trigramas del término presentes en
+        el nombre (1.0 = todas las palabras coinciden, sin importar tildes ni el orden).
+        """
+        tri_consulta = trigramas(normalizar_texto(termino), prefijo=True)
+        if not tri_consulta:
+            return []
+        indice = self._indice_busqueda()
+        listas = [indice['postings'][t] for t in tri_consulta if t in indice['postings']]
+        if not listas:
+            return []
+
+        total = len(tri_consulta)
+        comunes = np.bincount(np.concatenate(listas), minlength=len(indice['nombres']))
+        candidatos = np.flatnonzero(comunes >= umbral * total)
+        if candidatos.size == 0:
+            return []
+        comunes = comunes[candidatos]
+        cobertura = comunes / total
+        # A igual cobertura, primero el nombre más parecido en longitud
+        similitud = comunes / (total + indice['n_trigramas'][candidatos] - comunes)
+        orden = np.lexsort((-similitud, -cobertura))[:limite]
+        return [
+            {
+                'nombre': indice['nombres'][candidatos[i]],
+                'nombre_norm': indice['normas'][candidatos[i]],
+                'puntaje': round(float(cobertura[i]), 3),
+            }
+            for i in orden
+        ]
+
+    def registros_de_atletas(self, nombres):
+        """Registros de varios atletas por nombre exacto (una consulta sobre el índice)."""
+        normalizados = list(dict.fromkeys(normalizar_texto(n) for n in nombres))
+        if not normalizados:
+            return self._consultar('WHERE 0')
+        marcadores = ', '.join('?' * len(normalizados))
+        return self._consultar(f'WHERE atleta_norm IN ({marcadores})', normalizados)
+
+    def registros_de_atleta(self, nombre):
+        """Registros de un atleta por nombre exacto (usa el índice)."""
+        return self._consultar('WHERE atleta_norm = ?', (normalizar_texto(nombre),))
+
+    def mejores_tiempos(self, nombre):
+        """
+        Mejores marcas de un atleta: ``{prueba_sistema: {'segundos', 'fecha',
+        'prueba_original'}}``. Como la búsqueda original, combina todos los atletas cuyo
+        nombre contiene el texto (variantes del mismo nombre con apellidos extra).
+        """
+        norm = normalizar_texto(nombre)
+        if not norm:
+            return {}
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            # Con MIN(), SQLite toma fecha y prueba original de la fila con el mejor tiempo
+            filas = conn.execute(
+                "SELECT m.prueba_sistema, MIN(m.tiempo_seg), m.fecha, m.prueba_original "
+                "FROM mejores_tiempos m JOIN atletas a ON a.id = m.atleta_id "
+                "WHERE a.nombre_norm LIKE ? ESCAPE '\\' GROUP BY m.prueba_sistema",
+                (_patron_contiene(norm),),
+            ).fetchall()
+        return {
+            prueba: {'segundos': segundos, 'fecha': fecha, 'prueba_original': original}
+            for prueba, segundos, fecha, original in filas
+        }
+
+    def mejores_tiempos_de_atletas(self, nombres):
+        """
+        Mejores marcas de varios atletas en una sola consulta (p. ej. la nómina de un
+        club): DataFrame con ``nombre_norm``, ``prueba_sistema``, ``tiempo_seg``,
+        ``fecha`` y ``prueba_original``.
+        """
+        normalizados = list(dict.fromkeys(normalizar_texto(n) for n in nombres))
+        columnas = ['nombre_norm', 'prueba_sistema', 'tiempo_seg', 'fecha', 'prueba_original']
+        if not normalizados:
+            return pd.DataFrame(columns=columnas)
+        marcadores = ', '.join('?' * len(normalizados))
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            filas = conn.execute(
+                f'SELECT a.nombre_norm, m.prueba_sistema, m.tiempo_seg, m.fecha, m.prueba_original '
+                f'FROM mejores_tiempos m JOIN atletas a ON a.id = m.atleta_id '
+                f'WHERE a.nombre_norm IN ({marcadores})',
+                normalizados,
+            ).fetchall()
+        return pd.DataFrame(filas, columns=columnas)
+
+    def registros_de_prueba(self, prueba):
+        return self._consultar('WHERE prueba_norm = ?', (normalizar_texto(prueba),))
+
+    def registros_de_equipo(self, equipo):
+        return self._consultar('WHERE equipo_norm = ?', (normalizar_texto(equipo),))
+
+    def equipos(self):
+        """Equipos de la base de datos con su cantidad de atletas: ``[(equipo, n_atletas), ...]``."""
+        if not self.disponible():
+            return []
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            return conn.execute(
+                "SELECT MIN(json_extract(datos, '$.EQUIPO')), COUNT(DISTINCT atleta_norm) "
+                "FROM registros WHERE equipo_norm != '' GROUP BY equipo_norm ORDER BY equipo_norm"
+            ).fetchall()
+
+    def resumen(self):
+        """Hojas leídas y cantidad de filas, sin volver a abrir el Excel (None si no hay base)."""
+        if not self.disponible():
+            return None
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            filas_por_hoja = self._meta(conn, 'filas_por_hoja', {})
+            total = conn.execute('SELECT COUNT(*) FROM registros').fetchone()[0]
+            atletas = conn.execute('SELECT COUNT(DISTINCT atleta_norm) FROM registros').fetchone()[0]
+        return {
+            'hojas': list(filas_por_hoja),
+            'filas_por_hoja': filas_por_hoja,
+            'total_filas': sum(filas_por_hoja.values()),
+            'registros': total,
+            'atletas': atletas,
+        }
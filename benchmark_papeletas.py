@@ -0,0 +1,128 @@
+# benchmark_papeletas.py
+"""
+Micro-benchmark del costo por papeleta en los PDFs de jueces.
+
+Compara, sobre una competencia sintética, la construcción de flowables con plantillas
+compartidas (papeletas_pdf) contra la construcción anterior, que creaba un TableStyle,
+sus ParagraphStyle y los anchos de columna en cada papeleta. También mide el armado
+completo de cada formato (layout + escritura) en memoria.
+
+Uso: python benchmark_papeletas.py [cantidad_papeletas]
+"""
+import io
+import sys
+import time
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+import papeletas_pdf
+
+CANTIDAD_POR_DEFECTO = 5000
+CATEGORIAS = ['INFANTIL A', 'INFANTIL B', 'JUVENIL A', 'JUVENIL B', 'MAYORES', 'MASTER']
+PRUEBAS = ['50M LIBRE', '100M LIBRE', '50M ESPALDA', '50M PECHO', '50M MARIPOSA', '200M COMBINADO']
+
+def papeletas_sinteticas(cantidad):
+    """Papeletas con la misma forma que papeletas_de_sembrado (8 carriles, ~250 por prueba)"""
+    papeletas = []
+    for i in range(cantidad):
+        numero_prueba = i // 250 + 1
+        genero = 'Mujeres' if numero_prueba % 2 else 'Hombres'
+        papeletas.append({
+            "nombre": f"NADADOR {i:05d} APELLIDO",
+            "equipo": f"CLUB {i % 40:02d}",
+            "categoria": CATEGORIAS[i % len(CATEGORIAS)],
+            "sexo": genero[0],
+            "prueba": f"PRUEBA {numero_prueba} {PRUEBAS[numero_prueba % len(PRUEBAS)]} - {genero}",
+            "serie": (i % 250) // 8 + 1,
+            "carril": i % 8 + 1,
+            "tiempo_inscripcion": f"00:{30 + i % 29:02d}.{i % 100:02d}",
+        })
+    return papeletas
+
+# --- Construcción anterior (un estilo nuevo por papeleta), como referencia ---
+
+def _papeleta_excel_por_papeleta(papeleta, width_per_papeleta):
+    papeleta_data = [
+        ['Evento:', papeleta['prueba']],
+        ['SERIE:', str(papeleta['serie'])],
+        ['CARRIL:', str(papeleta['carril'])],
+        ['NADADOR:', papeleta['nombre']],
+        ['EQUIPO:', papeleta['equipo']],
+        ['CATEGORÍA:', papeleta['categoria']],
+        ['T. INSCRIPCIÓN:', str(papeleta.get('tiempo_inscripcion', ''))],
+        ['T. FINAL:', '']
+    ]
+    tabla = Table(papeleta_data, colWidths=[width_per_papeleta * 0.4, width_per_papeleta * 0.6])
+    tabla.setStyle(TableStyle(list(papeletas_pdf.ESTILO_PAPELETA_EXCEL.getCommands())))
+    return tabla
+
+def _papeleta_compacta_por_papeleta(papeleta, styles):
+    def estilo(nombre, padre, **kwargs):
+        return ParagraphStyle(nombre, parent=styles[padre], alignment=TA_CENTER, **kwargs)
+
+    nadador_info = f"{papeleta['nombre']}<br/>{papeleta['equipo']} - {papeleta['categoria']}"
+    serie_carril = Table([['SERIE:', 'CARRIL:'], [str(papeleta['serie']), str(papeleta['carril'])]],
+                         colWidths=[0.8*inch, 0.8*inch])
+    serie_carril.setStyle(TableStyle(list(papeletas_pdf.ESTILO_TABLA_SERIE_CARRIL.getCommands())))
+    caja_tiempo = Table([['_____ : _____ . _____']], colWidths=[2*inch])
+    caja_tiempo.setStyle(TableStyle(list(papeletas_pdf.ESTILO_TABLA_CAJA_TIEMPO.getCommands())))
+    return [
+        Paragraph(papeleta['prueba'], estilo('PruebaTitle', 'Heading2', fontSize=10, spaceAfter=8, fontName='Helvetica-Bold')),
+        Paragraph(nadador_info, estilo('NadadorInfo', 'Normal', fontSize=9, spaceAfter=8, fontName='Helvetica-Bold')),
+        serie_carril,
+        Spacer(1, 8),
+        Paragraph("TIEMPO DE COMPETENCIA:", estilo('TiempoTitle', 'Heading1', fontSize=10, spaceAfter=6,
+                                                   textColor=colors.HexColor('#FF0000'), fontName='Helvetica-Bold')),
+        caja_tiempo,
+        Spacer(1, 6),
+        Paragraph("Juez: _________________", estilo('Info', 'Normal', fontSize=7, spaceAfter=2,
+                                                    textColor=colors.HexColor('#666666'))),
+    ]
+
+def _medir(funcion, papeletas, repeticiones=3):
+    """Mejor tiempo (s) de construir los flowables de todas las papeletas"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for papeleta in papeletas:
+            funcion(papeleta)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else CANTIDAD_POR_DEFECTO
+    papeletas = papeletas_sinteticas(cantidad)
+    ancho = papeletas_pdf.ANCHO_PAPELETA_3_POR_FILA
+    # Antes, la hoja de estilos se creaba una vez por documento, no por papeleta
+    estilos = getSampleStyleSheet()
+    print(f"Competencia sintética: {cantidad} papeletas")
+    via = "rápida (estilos resueltos compartidos)" if papeletas_pdf.PlantillaTabla.RAPIDA else "pública (Table con style)"
+    print(f"Plantillas de tabla: vía {via}")
+
+    print("\nConstrucción por papeleta (µs/papeleta): antes -> plantilla compartida")
+    casos = [
+        ("Papeleta Excel (3x3)",
+         lambda p: _papeleta_excel_por_papeleta(p, ancho),
+         lambda p: papeletas_pdf.crear_papeleta_individual_excel(p, ancho)),
+        ("Papeleta compacta",
+         lambda p: _papeleta_compacta_por_papeleta(p, estilos),
+         papeletas_pdf.crear_papeleta_compacta),
+    ]
+    for nombre, antes, despues in casos:
+        t_antes = _medir(antes, papeletas) / cantidad * 1e6
+        t_despues = _medir(despues, papeletas) / cantidad * 1e6
+        print(f"  {nombre:<22} {t_antes:8.1f} -> {t_despues:8.1f}  (x{t_antes / t_despues:.1f})")
+
+    print("\nDocumento completo en memoria (ms/papeleta)")
+    for formato, config in papeletas_pdf.FORMATOS.items():
+        inicio = time.perf_counter()
+        paginas = papeletas_pdf.construir_pdf(io.BytesIO(), formato, papeletas)
+        transcurrido = time.perf_counter() - inicio
+        print(f"  {config['descripcion']:<36} {transcurrido / cantidad * 1e3:6.2f}  ({paginas} páginas, {transcurrido:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Cronograma de la competencia a partir del sembrado.
+
+Cada serie dura lo que tarda su nadador más lento (tiempo de inscripción) más un tiempo
+de recambio configurable; los nadadores sin tiempo se estiman por la distancia de la
+prueba. Las pruebas siguen ``event_order`` de event_config.json y el cronograma se puede
+partir en sesiones que no superen un tiempo máximo. Todo se calcula sobre la tabla del
+motor de sembrado con ``groupby`` y sumas acumuladas, de modo que un campeonato completo
+(cientos de series) se recalcula al instante.
+"""
+import re
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+from event_manager import EventManager
+from motor_sembrado import ARCHIVO_INSCRIPCION, POR_CATEGORIA, cargar_sembrado
+from planilla_utils import normalize_prueba_name, ordered_prueba_hoja_keys, titulo_prueba_numerada
+
+# Valores por defecto (segundos / minutos)
+RECAMBIO_SERIE_SEG = 30          # salida, llegada y cambio de nadadores entre series
+PAUSA_ENTRE_PRUEBAS_SEG = 60     # anuncio de la prueba y ajuste de jueces
+SEGUNDOS_POR_25M_SIN_TIEMPO = 30  # estimación para nadadores inscritos sin tiempo (s/t)
+PAUSA_ENTRE_SESIONES_MIN = 30
+
+_PATRON_DISTANCIA = re.compile(r'(\d+)\s*M', re.IGNORECASE)
+
+
+def distancia_prueba(nombre_prueba):
+    """Metros de la prueba a partir del nombre ("50M LIBRE" → 50); None si no se reconoce."""
+    match = _PATRON_DISTANCIA.search(str(nombre_prueba))
+    return int(match.group(1)) if match else None
+
+
+def _orden_pruebas(claves, event_cols, event_order):
+    """Claves "{prueba} - {género}" en orden de event_order (el resto, en orden de planilla)."""
+    claves_planilla = ordered_prueba_hoja_keys(dict.fromkeys(claves), event_cols)
+    if not event_order:
+        return claves_planilla
+    posicion_evento = {normalize_prueba_name(e).upper(): i for i, e in enumerate(event_order)}
+    posicion_planilla = {clave: i for i, clave in enumerate(claves_planilla)}
+
+    def clave_orden(clave):
+        prueba = normalize_prueba_name(clave.rsplit(' - ', 1)[0]).upper()
+        return (posicion_evento.get(prueba, len(posicion_evento)), posicion_planilla[clave])
+
+    return sorted(claves_planilla, key=clave_orden)
+
+
+def duracion_series(sembrado, recambio_seg=RECAMBIO_SERIE_SEG, segundos_por_25m=SEGUNDOS_POR_25M_SIN_TIEMPO):
+    """
+    Una fila por serie (clave, prueba, categoria, serie) con nadadores, tiempo más lento
+    y ``duracion_seg`` = nadador más lento (o estimación sin tiempo) + recambio.
+    """
+    segundos = sembrado['segundos'].to_numpy(dtype='float64')
+    distancia = sembrado['prueba'].map(distancia_prueba).astype('float64').fillna(50).to_numpy()
+    estimado = distancia / 25.0 * segundos_por_25m
+    con_tiempo = np.isfinite(segundos)
+    # Sin tiempo: se usa la estimación por distancia (con tiempo, el tiempo de inscripción tal cual)
+    tiempo_serie = np.where(con_tiempo, segundos, estimado)
+
+    series = (
+        sembrado.assign(_tiempo=tiempo_serie, _con_tiempo=con_tiempo)
+        .groupby(['clave', 'prueba', 'categoria', 'serie'], sort=False)
+        .agg(nadadores=('fila', 'size'), mas_lento_seg=('_tiempo', 'max'), con_tiempo=('_con_tiempo', 'sum'))
+        .reset_index()
+    )
+    # Segundos enteros: los horarios del cronograma no necesitan centésimas
+    series['duracion_seg'] = np.ceil(series['mas_lento_seg'] + recambio_seg)
+    return series
+
+
+def _particionar_sesiones(duracion_prueba, limite_seg):
+    """Índice de sesión por prueba (0, 1, ...) sin partir pruebas: corta cuando se supera el límite."""
+    sesiones = np.zeros(len(duracion_prueba), dtype=np.int64)
+    if not limite_seg:
+        return sesiones
+    sesion, acumulado = 0, 0.0
+    for i, duracion in enumerate(duracion_prueba):
+        if acumulado > 0 and acumulado + duracion > limite_seg:
+            sesion += 1
+            acumulado = 0.0
+        sesiones[i] = sesion
+        acumulado += duracion
+    return sesiones
+
+
+def generar_cronograma(sembrado, event_cols, event_order=None, hora_inicio=time(8, 0),
+                       recambio_seg=RECAMBIO_SERIE_SEG, pausa_pruebas_seg=PAUSA_ENTRE_PRUEBAS_SEG,
+                       limite_sesion_min=None, pausa_sesiones_min=PAUSA_ENTRE_SESIONES_MIN,
+                       segundos_por_25m=SEGUNDOS_POR_25M_SIN_TIEMPO, fecha=None):
+    """
+    Cronograma por serie del sembrado del motor (``motor_sembrado.cargar_sembrado``).
+
+    Devuelve ``(series, sesiones)``:
+
+    - ``series``: una fila por serie con sesion, numero_prueba, prueba (título numerado),
+      categoria, serie, nadadores, duracion_seg, inicio y fin (datetime).
+    - ``sesiones``: resumen por sesión con inicio, fin, duración en minutos, pruebas y series.
+
+    Con ``limite_sesion_min`` las pruebas se reparten en sesiones consecutivas que no
+    superan ese tiempo (una prueba más larga que el límite queda sola en su sesión).
+    """
+    columnas = ['sesion', 'numero_prueba', 'prueba', 'categoria', 'serie', 'nadadores',
+                'duracion_seg', 'inicio', 'fin']
+    if sembrado.empty:
+        return pd.DataFrame(columns=columnas), pd.DataFrame(
+            columns=['sesion', 'inicio', 'fin', 'duracion_min', 'pruebas', 'series'])
+
+    series = duracion_series(sembrado, recambio_seg, segundos_por_25m)
+
+    # Orden de pruebas (event_order) y, dentro de cada prueba, categorías y series
+    claves = _orden_pruebas(series['clave'].unique(), event_cols, event_order)
+    numero_prueba = {clave: i for i, clave in enumerate(claves, start=1)}
+    series['numero_prueba'] = series['clave'].map(numero_prueba)
+    series = series.sort_values(['numero_prueba', 'categoria', 'serie'], kind='mergesort').reset_index(drop=True)
+    series['prueba'] = [titulo_prueba_numerada(n, c) for n, c in zip(series['numero_prueba'], series['clave'])]
+
+    # La pausa de cada prueba se suma a su primera serie
+    primera_de_prueba = ~series['numero_prueba'].duplicated().to_numpy()
+    duracion = series['duracion_seg'].to_numpy() + np.where(primera_de_prueba, pausa_pruebas_seg, 0)
+
+    duracion_prueba = pd.Series(duracion).groupby(series['numero_prueba'].to_numpy(), sort=False).sum()
+    limite_seg = limite_sesion_min * 60 if limite_sesion_min else None
+    sesion_prueba = dict(zip(duracion_prueba.index, _particionar_sesiones(duracion_prueba.to_numpy(), limite_seg)))
+    sesion = series['numero_prueba'].map(sesion_prueba).to_numpy()
+
+    # Inicio de cada serie: acumulado dentro de su sesión + desplazamiento de la sesión
+    fin_relativo = pd.Series(duracion).groupby(sesion).cumsum().to_numpy()
+    inicio_relativo = fin_relativo - duracion
+    duracion_sesion = pd.Series(duracion).groupby(sesion).sum().to_numpy()
+    desplazamiento = np.concatenate([[0.0], np.cumsum(duracion_sesion + pausa_sesiones_min * 60)[:-1]])
+
+    base = datetime.combine(fecha or datetime.now().date(), hora_inicio)
+    inicio_seg = desplazamiento[sesion] + inicio_relativo
+    series['sesion'] = sesion + 1
+    series['duracion_seg'] = duracion
+    series['inicio'] = base + pd.to_timedelta(inicio_seg, unit='s')
+    series['fin'] = series['inicio'] + pd.to_timedelta(duracion, unit='s')
+
+    resumen = series.groupby('sesion').agg(
+        inicio=('inicio', 'min'), fin=('fin', 'max'),
+        pruebas=('numero_prueba', 'nunique'), series=('serie', 'size'),
+    ).reset_index()
+    resumen['duracion_min'] = ((resumen['fin'] - resumen['inicio']).dt.total_seconds() / 60).round(1)
+    resumen = resumen[['sesion', 'inicio', 'fin', 'duracion_min', 'pruebas', 'series']]
+    return series[columnas], resumen
+
+
+def cronograma_evento(archivo=ARCHIVO_INSCRIPCION, modo=POR_CATEGORIA, series_circulares=0, sesiones=1, **opciones):
+    """
+    Cronograma del sembrado actual con el orden de pruebas del evento configurado.
+
+    ``opciones`` se pasan a ``generar_cronograma`` (hora_inicio, recambio_seg,
+    limite_sesion_min, ...). Si el evento tiene fecha de inicio se usa como fecha base.
+    """
+    event_manager = EventManager()
+    sembrado, event_cols = cargar_sembrado(archivo, modo, None, series_circulares, sesiones)
+    info = event_manager.get_event_info() or {}
+    if 'fecha' not in opciones and info.get('start_date'):
+        try:
+            opciones['fecha'] = datetime.fromisoformat(info['start_date']).date()
+        except (TypeError, ValueError):
+            pass
+    return generar_cronograma(sembrado, event_cols, event_manager.get_selected_events(), **opciones)
+
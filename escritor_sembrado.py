@@ -0,0 +1,81 @@
+"""
+Escritura rápida de las hojas de sembrado.
+
+Las hojas se llenan fila por fila con ``ws.append`` y celdas ``WriteOnlyCell`` que usan
+estilos con nombre registrados una sola vez por libro (en lugar de un ``Font`` nuevo por
+celda). Así el libro completo se puede generar con ``Workbook(write_only=True)`` y las
+mismas funciones sirven para reemplazar una hoja en un libro abierto con
+``load_workbook`` (re-sembrado incremental). Cada valor queda en la misma fila y columna
+que leía ``5-procesar_sembrado_tiempos._parse_seeding_sheet_df``.
+"""
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle
+
+from motor_sembrado import titulo_serie
+
+ESTILO_TITULO = 'sembrado_titulo'
+ESTILO_CATEGORIA = 'sembrado_categoria'
+ESTILO_SERIE = 'sembrado_serie'
+ESTILO_ENCABEZADO = 'sembrado_encabezado'
+ESTILO_ENCABEZADO_TIEMPO = 'sembrado_encabezado_tiempo'
+ESTILO_TIEMPO_COMPETENCIA = 'sembrado_tiempo_competencia'
+
+_FUENTES = {
+    ESTILO_TITULO: Font(bold=True, size=16),
+    ESTILO_CATEGORIA: Font(bold=True, size=14),
+    ESTILO_SERIE: Font(bold=True),
+    ESTILO_ENCABEZADO: Font(bold=True),
+    ESTILO_ENCABEZADO_TIEMPO: Font(bold=True, color="FF0000"),
+    ESTILO_TIEMPO_COMPETENCIA: Font(color="0000FF"),
+}
+
+ENCABEZADOS_SERIE = ["Carril", "Nombre", "Equipo", "Edad", "Categoría", "Tiempo Inscripción", "Tiempo Competencia"]
+
+
+def registrar_estilos(wb):
+    """Agrega al libro los estilos con nombre del sembrado que aún no tenga."""
+    existentes = set(wb.named_styles)
+    for nombre, fuente in _FUENTES.items():
+        if nombre not in existentes:
+            wb.add_named_style(NamedStyle(name=nombre, font=fuente))
+
+
+def celda(ws, valor, estilo):
+    """Celda con uno de los estilos registrados (válida en hojas normales y write-only)."""
+    cell = WriteOnlyCell(ws, value=valor)
+    cell.style = estilo
+    return cell
+
+
+def _tiempo_texto(tiempo_val):
+    return tiempo_val.strftime('%M:%S.%f')[:-4] if hasattr(tiempo_val, 'strftime') else str(tiempo_val)
+
+
+def filas_serie(ws, serie, mostrar_sesion=False):
+    """Filas de una serie: título, encabezados, un renglón por carril y una fila en blanco."""
+    yield [celda(ws, titulo_serie(serie, mostrar_sesion), ESTILO_SERIE)]
+    yield [
+        celda(ws, header, ESTILO_ENCABEZADO_TIEMPO if header == "Tiempo Competencia" else ESTILO_ENCABEZADO)
+        for header in ENCABEZADOS_SERIE
+    ]
+    for carril_num, nadador in enumerate(serie['carriles'], 1):
+        if nadador:
+            yield [
+                carril_num,
+                nadador['nombre'],
+                nadador['equipo'],
+                nadador['edad'],
+                nadador['categoria'],
+                _tiempo_texto(nadador['tiempo_inscripcion']),
+                celda(ws, "", ESTILO_TIEMPO_COMPETENCIA),
+            ]
+        else:
+            yield [carril_num]
+    yield []
+
+
+def escribir_filas(ws, filas):
+    """Escribe las filas en orden (el ancho de columna va antes, como exige write-only)."""
+    ws.column_dimensions['B'].width = 40
+    for fila in filas:
+        ws.append(fila)
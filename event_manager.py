@@ -1,5 +1,8 @@
+import copy
 import json
 import os
+import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
@@ -11,6 +14,90 @@ try:
 except ImportError:
     REPORTLAB_AVAILABLE = False
 
+# Patrones de rango de edad: "12-13", "12 a 13", "12 - 13" / edad única "12", "12 años"
+_PATRON_RANGO_EDAD = re.compile(r'(\d+)[\s]*[-aA]\s*(\d+)')
+_PATRON_EDAD_UNICA = re.compile(r'(\d+)')
+
+# Edades cubiertas por la tabla precalculada de pruebas por categoría (ver validate_category_age_range)
+EDAD_MINIMA_TABLA = 5
+EDAD_MAXIMA_TABLA = 80
+
+# Carriles de la piscina (se guardan en event_config.json junto con su orden de siembra)
+CARRILES_POR_DEFECTO = 8
+CARRILES_MINIMO = 4
+CARRILES_MAXIMO = 10
+
+# Sistemas de puntuación: ``puntos`` del 1º lugar en adelante, ``puntos_resto`` para los
+# lugares siguientes, ``factor_relevos`` para pruebas de relevo y ``max_puntuadores_equipo``
+# (máximo de nadadores de un mismo equipo que suman puntos en cada prueba/categoría).
+# Los definidos en event_config.json ('scoring_schemes') se agregan o reemplazan a estos.
+ESQUEMA_PUNTUACION_POR_DEFECTO = 'estandar'
+ESQUEMAS_PUNTUACION_PREDEFINIDOS = {
+    'estandar': {'puntos': [9, 7, 6, 5, 4, 3, 2, 1], 'puntos_resto': 1},
+    'top_8': {'puntos': [9, 7, 6, 5, 4, 3, 2, 1], 'puntos_resto': 0},
+    'liga_16': {
+        'puntos': [20, 17, 16, 15, 14, 13, 12, 11, 9, 7, 6, 5, 4, 3, 2, 1],
+        'puntos_resto': 0,
+        'factor_relevos': 2,
+        'max_puntuadores_equipo': 3,
+    },
+}
+
+# Configuración en memoria por archivo: se invalida si cambia mtime/tamaño o al guardar desde aquí
+_CACHE_CONFIG = {}
+
+
+def generar_orden_carriles(carriles):
+    """
+    Orden de siembra de carriles desde el centro hacia afuera (mejor tiempo primero).
+
+    El carril central (o el de la izquierda del par central) recibe el mejor tiempo, el
+    siguiente va a su lado y luego se alterna hacia afuera: 8 → [4, 5, 3, 6, 2, 7, 1, 8],
+    10 → [5, 6, 4, 7, 3, 8, 2, 9, 1, 10], 6 → [3, 4, 2, 5, 1, 6].
+    """
+    carriles = int(carriles)
+    if carriles < 1:
+        raise ValueError("La piscina debe tener al menos un carril")
+    centro = (carriles + 1) // 2
+    orden = [centro]
+    for paso in range(1, carriles):
+        desplazamiento = (paso + 1) // 2
+        orden.append(centro + desplazamiento if paso % 2 else centro - desplazamiento)
+    return orden
+
+
+def compilar_esquema_puntuacion(nombre, esquema):
+    """
+    Valida un sistema de puntuación y lo compila a una tabla de consulta.
+
+    ``tabla[posición]`` son los puntos de ese lugar (``tabla[0]`` no se usa) y el último
+    elemento se aplica a todas las posiciones posteriores (``puntos_resto``).
+    """
+    puntos = [float(p) for p in esquema.get('puntos', [])]
+    if not puntos or any(p < 0 for p in puntos):
+        raise ValueError(f"Sistema de puntuación '{nombre}': 'puntos' debe ser una lista de valores no negativos")
+    puntos_resto = float(esquema.get('puntos_resto', 0) or 0)
+    factor_relevos = float(esquema.get('factor_relevos', 1) or 1)
+    max_puntuadores = esquema.get('max_puntuadores_equipo')
+    if max_puntuadores is not None:
+        max_puntuadores = int(max_puntuadores)
+        if max_puntuadores < 1:
+            raise ValueError(f"Sistema de puntuación '{nombre}': 'max_puntuadores_equipo' debe ser al menos 1")
+    return {
+        'nombre': nombre,
+        'tabla': np.array([0.0] + puntos + [puntos_resto]),
+        'factor_relevos': factor_relevos,
+        'max_puntuadores_equipo': max_puntuadores,
+    }
+
+
+def _validar_carriles(lanes):
+    lanes = int(lanes)
+    if not CARRILES_MINIMO <= lanes <= CARRILES_MAXIMO:
+        raise ValueError(f"Número de carriles fuera de rango ({CARRILES_MINIMO}-{CARRILES_MAXIMO}): {lanes}")
+    return lanes
+
+
 class EventManager:
     def __init__(self):
         self.config_file = 'event_config.json'
@@ -67,8 +154,13 @@ class EventManager:
 
     def save_event_config(self, event_name, categories, event_order, category_events, min_age, max_age,
                          swimmer_fee=None, team_fee=None, welcome_message=None, farewell_message=None, event_logo=None,
-                         start_date=None, end_date=None, age_criteria=None):
+                         start_date=None, end_date=None, age_criteria=None, lanes=None):
         """Guardar la configuración del evento"""
+        try:
+            lanes = _validar_carriles(lanes if lanes is not None else CARRILES_POR_DEFECTO)
+        except (TypeError, ValueError) as e:
+            return False, f"Error al guardar configuración: {e}"
+
         config = {
             'event_name': event_name,
             'categories': categories,
@@ -84,64 +176,238 @@ class EventManager:
             'start_date': start_date.isoformat() if start_date else None,
             'end_date': end_date.isoformat() if end_date else None,
             'age_criteria': age_criteria or 'event_date',
+            'lanes': lanes,
+            'lane_order': generar_orden_carriles(lanes),
             'created_date': datetime.now().isoformat(),
             'modified_date': datetime.now().isoformat()
         }
+        # El formulario no edita la puntuación: conservar el sistema activo y los del evento
+        previous = self.load_event_config() or {}
+        for key in ('scoring_scheme', 'scoring_schemes'):
+            if key in previous:
+                config[key] = previous[key]
 
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self._write_event_config(config)
             return True, f"Evento '{event_name}' guardado exitosamente"
         except Exception as e:
             return False, f"Error al guardar configuración: {e}"
 
-    def load_event_config(self):
-        """Cargar la configuración del evento existente"""
-        if not os.path.exists(self.config_file):
+    def _write_event_config(self, config):
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        self._invalidate_config_cache()
+
+    def _invalidate_config_cache(self):
+        _CACHE_CONFIG.pop(os.path.abspath(self.config_file), None)
+
+    def _cached_config(self):
+        """
+        Entrada de caché con la configuración y sus tablas derivadas (rangos de edad y
+        pruebas por categoría × edad). Solo se relee el JSON si cambió el archivo.
+        """
+        key = os.path.abspath(self.config_file)
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            _CACHE_CONFIG.pop(key, None)
             return None
 
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = _CACHE_CONFIG.get(key)
+        if entry is not None and entry['signature'] == signature:
+            return entry
+
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
-            return config
         except Exception as e:
             print(f"Error al cargar configuración: {e}")
             return None
 
+        age_ranges = self._build_age_ranges(config)
+        entry = {
+            'signature': signature,
+            'config': config,
+            'lane_order': self._build_lane_order(config),
+            'age_ranges': age_ranges,
+            'category_by_age': self._build_category_by_age(age_ranges),
+            'scoring_schemes': self._build_scoring_schemes(config),
+            'events_by_category_age': self._build_events_by_category_age(config),
+        }
+        _CACHE_CONFIG[key] = entry
+        return entry
+
+    def _build_lane_order(self, config):
+        """Orden de carriles guardado; se regenera si falta o no corresponde al número de carriles."""
+        try:
+            lanes = _validar_carriles(config.get('lanes', CARRILES_POR_DEFECTO))
+        except (TypeError, ValueError):
+            lanes = CARRILES_POR_DEFECTO
+        lane_order = config.get('lane_order')
+        if not isinstance(lane_order, list) or sorted(lane_order) != list(range(1, lanes + 1)):
+            lane_order = generar_orden_carriles(lanes)
+        return tuple(lane_order)
+
+    def _build_scoring_schemes(self, config):
+        """
+        Sistemas predefinidos + los del evento, compilados. Los del evento inválidos se
+        omiten con aviso; si reemplazaban a uno predefinido, queda el predefinido.
+        """
+        compiled = {name: compilar_esquema_puntuacion(name, scheme)
+                    for name, scheme in ESQUEMAS_PUNTUACION_PREDEFINIDOS.items()}
+        custom = config.get('scoring_schemes')
+        if isinstance(custom, dict):
+            for name, scheme in custom.items():
+                try:
+                    compiled[name] = compilar_esquema_puntuacion(name, scheme)
+                except (AttributeError, TypeError, ValueError) as e:
+                    print(f"Sistema de puntuación ignorado: {e}")
+        return compiled
+
+    def _build_age_ranges(self, config):
+        """[(nombre, edad_min, edad_max), ...] en el orden de la configuración (None si no hay rango)."""
+        ranges = []
+        for category in config.get('categories', []):
+            min_age, max_age = self.parse_age_range(category.get('age_range', ''))
+            ranges.append((category.get('name', ''), min_age, max_age))
+        return ranges
+
+    def _build_category_by_age(self, age_ranges):
+        """
+        Array edad → categoría para las edades de la tabla (posición = edad - EDAD_MINIMA_TABLA).
+        Si los rangos se solapan gana la primera categoría configurada, como al recorrerlas.
+        """
+        table = np.full(EDAD_MAXIMA_TABLA - EDAD_MINIMA_TABLA + 1, None, dtype=object)
+        for name, min_age, max_age in age_ranges:
+            if min_age is None or max_age is None:
+                continue
+            low = max(min_age, EDAD_MINIMA_TABLA) - EDAD_MINIMA_TABLA
+            high = min(max_age, EDAD_MAXIMA_TABLA) - EDAD_MINIMA_TABLA
+            if low > high:
+                continue
+            block = table[low:high + 1]
+            block[[value is None for value in block]] = name
+        return table
+
+    def resolve_category(self, age):
+        """Categoría configurada para una edad, o None si ninguna la incluye"""
+        return self.resolve_categories([age])[0]
+
+    def resolve_categories(self, ages):
+        """
+        Categorías para una columna completa de edades (lista, Series o array) de una vez.
+        Devuelve un array de NumPy con el nombre de la categoría o None (sin rango o edad inválida).
+        """
+        values = pd.to_numeric(pd.Series(list(ages), dtype=object), errors='coerce').to_numpy(dtype=float)
+        result = np.full(len(values), None, dtype=object)
+        entry = self._cached_config()
+        if entry is None or len(values) == 0:
+            return result
+
+        valid = ~np.isnan(values)
+        whole_ages = np.trunc(np.where(valid, values, 0)).astype(int)
+        in_table = valid & (whole_ages >= EDAD_MINIMA_TABLA) & (whole_ages <= EDAD_MAXIMA_TABLA)
+        result[in_table] = entry['category_by_age'][whole_ages[in_table] - EDAD_MINIMA_TABLA]
+
+        # Edades fuera de la tabla (poco habituales): recorrer los rangos
+        for position in np.flatnonzero(valid & ~in_table):
+            age = whole_ages[position]
+            for name, min_age, max_age in entry['age_ranges']:
+                if min_age is not None and max_age is not None and min_age <= age <= max_age:
+                    result[position] = name
+                    break
+        return result
+
+    def _build_events_by_category_age(self, config):
+        """{categoría: {edad: (pruebas,)}} para las edades de la tabla; None = pruebas del evento."""
+        by_category = dict(config.get('category_events', {}))
+        by_category[None] = config.get('event_order', [])
+        table = {}
+        for category, events in by_category.items():
+            min_ages = [(event, self.event_age_restrictions.get(event, 6)) for event in events]
+            table[category] = {
+                age: tuple(event for event, min_age in min_ages if age >= min_age)
+                for age in range(EDAD_MINIMA_TABLA, EDAD_MAXIMA_TABLA + 1)
+            }
+        return table
+
+    def load_event_config(self):
+        """Cargar la configuración del evento existente (copia: se puede modificar y guardar)"""
+        entry = self._cached_config()
+        return copy.deepcopy(entry['config']) if entry else None
+
+    def get_category_age_ranges(self):
+        """Rangos de edad ya parseados de las categorías: [(nombre, edad_min, edad_max), ...]"""
+        entry = self._cached_config()
+        return list(entry['age_ranges']) if entry else []
+
+    def get_lane_count(self):
+        """Número de carriles de la piscina del evento (8 si no hay evento configurado)"""
+        return len(self.get_lane_order())
+
+    def get_lane_order(self):
+        """Orden de siembra de carriles precalculado para el evento, p. ej. [4, 5, 3, 6, 2, 7, 1, 8]"""
+        entry = self._cached_config()
+        if entry:
+            return list(entry['lane_order'])
+        return generar_orden_carriles(CARRILES_POR_DEFECTO)
+
+    def get_scoring_schemes(self):
+        """Sistemas de puntuación compilados {nombre: esquema} (predefinidos si no hay evento)"""
+        entry = self._cached_config()
+        if entry:
+            return dict(entry['scoring_schemes'])
+        return {name: compilar_esquema_puntuacion(name, scheme)
+                for name, scheme in ESQUEMAS_PUNTUACION_PREDEFINIDOS.items()}
+
+    def get_scoring_scheme_name(self):
+        """Nombre del sistema de puntuación activo del evento"""
+        entry = self._cached_config()
+        name = entry['config'].get('scoring_scheme') if entry else None
+        schemes = self.get_scoring_schemes()
+        return name if name in schemes else ESQUEMA_PUNTUACION_POR_DEFECTO
+
+    def get_scoring_scheme(self, name=None):
+        """Sistema de puntuación compilado (el activo del evento si no se indica ``name``)"""
+        schemes = self.get_scoring_schemes()
+        return schemes.get(name or self.get_scoring_scheme_name(), schemes[ESQUEMA_PUNTUACION_POR_DEFECTO])
+
     def get_available_events(self):
         """Obtener la lista de todas las pruebas disponibles"""
         return self.swimming_events
 
     def get_selected_events(self):
         """Obtener las pruebas seleccionadas para el evento actual"""
-        config = self.load_event_config()
-        if config:
-            return config.get('event_order', [])
+        entry = self._cached_config()
+        if entry:
+            return list(entry['config'].get('event_order', []))
         return []
 
     def get_categories(self):
         """Obtener las categorías configuradas para el evento"""
-        config = self.load_event_config()
-        if config:
-            return config.get('categories', [])
+        entry = self._cached_config()
+        if entry:
+            return [dict(category) for category in entry['config'].get('categories', [])]
         return []
 
     def get_category_events(self):
         """Obtener las pruebas asignadas por categoría"""
-        config = self.load_event_config()
-        if config:
-            return config.get('category_events', {})
+        entry = self._cached_config()
+        if entry:
+            return {name: list(events) for name, events in entry['config'].get('category_events', {}).items()}
         return {}
 
     def get_event_info(self):
         """Obtener información completa del evento"""
-        config = self.load_event_config()
+        entry = self._cached_config()
+        config = entry['config'] if entry else None
         if config:
             return {
                 'name': config.get('event_name', ''),
-                'categories': config.get('categories', []),
-                'events': config.get('event_order', []),
-                'category_events': config.get('category_events', {}),
+                'categories': copy.deepcopy(config.get('categories', [])),
+                'events': list(config.get('event_order', [])),
+                'category_events': copy.deepcopy(config.get('category_events', {})),
                 'min_age': config.get('min_age', 8),
                 'max_age': config.get('max_age', 18),
                 'swimmer_fee': config.get('swimmer_fee', 0),
@@ -152,6 +418,7 @@ class EventManager:
                 'start_date': config.get('start_date', ''),
                 'end_date': config.get('end_date', ''),
                 'age_criteria': config.get('age_criteria', 'event_date'),
+                'lanes': len(entry['lane_order']),
                 'created_date': config.get('created_date', ''),
                 'modified_date': config.get('modified_date', '')
             }
@@ -159,7 +426,8 @@ class EventManager:
 
     def validate_swimmer_age(self, age):
         """Validar si la edad del nadador está dentro del rango permitido"""
-        config = self.load_event_config()
+        entry = self._cached_config()
+        config = entry['config'] if entry else None
         if config:
             min_age = config.get('min_age', 8)
             max_age = config.get('max_age', 18)
@@ -173,7 +441,8 @@ class EventManager:
 
     def update_event_config(self, event_name=None, categories=None, event_order=None, category_events=None,
                           min_age=None, max_age=None, swimmer_fee=None, team_fee=None,
-                          welcome_message=None, farewell_message=None, event_logo=None, start_date=None, end_date=None, age_criteria=None):
+                          welcome_message=None, farewell_message=None, event_logo=None, start_date=None, end_date=None, age_criteria=None,
+                          lanes=None, scoring_scheme=None, scoring_schemes=None):
         """Actualizar configuración existente"""
         config = self.load_event_config()
         if not config:
@@ -207,12 +476,30 @@ class EventManager:
             config['end_date'] = end_date.isoformat() if end_date else None
         if age_criteria is not None:
             config['age_criteria'] = age_criteria
+        if lanes is not None:
+            try:
+                lanes = _validar_carriles(lanes)
+            except (TypeError, ValueError) as e:
+                return False, f"Error al actualizar configuración: {e}"
+            config['lanes'] = lanes
+            config['lane_order'] = generar_orden_carriles(lanes)
+        if scoring_schemes is not None:
+            try:
+                for name, scheme in scoring_schemes.items():
+                    compilar_esquema_puntuacion(name, scheme)
+            except (AttributeError, TypeError, ValueError) as e:
+                return False, f"Error al actualizar configuración: {e}"
+            config['scoring_schemes'] = scoring_schemes
+        if scoring_scheme is not None:
+            known = set(ESQUEMAS_PUNTUACION_PREDEFINIDOS) | set(config.get('scoring_schemes') or {})
+            if scoring_scheme not in known:
+                return False, f"Error al actualizar configuración: sistema de puntuación desconocido '{scoring_scheme}'"
+            config['scoring_scheme'] = scoring_scheme
 
         config['modified_date'] = datetime.now().isoformat()
 
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self._write_event_config(config)
             return True, "Configuración actualizada exitosamente"
         except Exception as e:
             return False, f"Error al actualizar configuración: {e}"
@@ -222,6 +509,7 @@ class EventManager:
         try:
             if os.path.exists(self.config_file):
                 os.remove(self.config_file)
+                self._invalidate_config_cache()
                 return True, "Configuración de evento eliminada"
             return False, "No existe configuración de evento"
         except Exception as e:
@@ -354,8 +642,10 @@ class EventManager:
 
     def get_events_for_category(self, category_name):
         """Obtener pruebas asignadas a una categoría específica"""
-        category_events = self.get_category_events()
-        return category_events.get(category_name, [])
+        entry = self._cached_config()
+        if entry:
+            return list(entry['config'].get('category_events', {}).get(category_name, []))
+        return []
 
     def assign_events_to_category(self, category_name, events):
         """Asignar pruebas a una categoría"""
@@ -370,8 +660,7 @@ class EventManager:
         config['modified_date'] = datetime.now().isoformat()
 
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            self._write_event_config(config)
             return True, f"Pruebas asignadas a {category_name}"
         except Exception as e:
             return False, f"Error al asignar pruebas: {e}"
@@ -422,6 +711,19 @@ class EventManager:
 
     def get_available_events_for_swimmer(self, category_name, swimmer_age=None):
         """Obtener las pruebas disponibles para un nadador según su categoría y edad"""
+        # Consulta directa en la tabla precalculada categoría × edad
+        entry = self._cached_config()
+        if entry and swimmer_age is not None:
+            by_age = entry['events_by_category_age'].get(category_name or None)
+            try:
+                age_key = int(swimmer_age)
+            except (TypeError, ValueError):
+                age_key = None
+            if by_age is not None and age_key == swimmer_age and age_key in by_age:
+                return list(by_age[age_key])
+            if by_age is None and category_name:
+                return []
+
         if not category_name:
             available_events = self.get_selected_events()
         else:
@@ -459,9 +761,7 @@ class EventManager:
             age_range = age_range_str.strip()
 
             # Patrón para rango: "12-13", "12 a 13", "12 - 13"
-            import re
-            range_pattern = r'(\d+)[\s]*[-aA]\s*(\d+)'
-            match = re.search(range_pattern, age_range)
+            match = _PATRON_RANGO_EDAD.search(age_range)
 
             if match:
                 min_age = int(match.group(1))
@@ -469,8 +769,7 @@ class EventManager:
                 return min_age, max_age
 
             # Patrón para edad específica: "12", "12 años"
-            single_pattern = r'(\d+)'
-            match = re.search(single_pattern, age_range)
+            match = _PATRON_EDAD_UNICA.search(age_range)
 
             if match:
                 age = int(match.group(1))
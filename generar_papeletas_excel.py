@@ -1,104 +1,164 @@
 # generar_papeletas_excel.py
 import pandas as pd
 import os
-from planilla_utils import inscrito_en_prueba, ordered_prueba_hoja_keys, titulo_prueba_numerada
-import math
+from motor_sembrado import POR_CATEGORIA, cargar_papeletas, distribucion_sembrado, texto_serie
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, NamedStyle, Side
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange, MultiCellRange
+from openpyxl.worksheet.worksheet import Worksheet
 
 # --- CONFIGURACIÓN ---
 ARCHIVO_PAPELETAS_EXCEL = 'papeletas_jueces.xlsx'
+PAPELETAS_POR_FILA = 3
+COLUMNAS_POR_PAPELETA = 3
+FILAS_ENTRE_GRUPOS = 8  # 6 filas de papeleta + 2 de separación
 
-def parse_time(time_val):
-    """Convierte tiempo a segundos para ordenamiento"""
-    if pd.isna(time_val): return float('inf')
-    if hasattr(time_val, 'minute'): return time_val.minute * 60 + time_val.second + time_val.microsecond / 1_000_000
-    time_str = str(time_val).replace(',', '.')
-    try:
-        parts = time_str.split(':')
-        if len(parts) == 2: return int(parts[0]) * 60 + float(parts[1])
-        return float(time_str)
-    except (ValueError, IndexError): return float('inf')
+# --- PLANTILLA DE PAPELETA ---
+_BORDE_FINO = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+_BORDE_GRUESO = Border(left=Side(style='thick'), right=Side(style='thick'), top=Side(style='thick'), bottom=Side(style='thick'))
+_CENTRADO = Alignment(horizontal='center')
+_CENTRADO_AJUSTADO = Alignment(horizontal='center', wrap_text=True)
+
+ESTILO_TITULO_DOCUMENTO = 'papeleta_titulo_documento'
+ESTILO_PRUEBA = 'papeleta_prueba'
+ESTILO_NADADOR = 'papeleta_nadador'
+ESTILO_SERIE = 'papeleta_serie'
+ESTILO_TITULO_TIEMPO = 'papeleta_titulo_tiempo'
+ESTILO_TIEMPO = 'papeleta_tiempo'
+ESTILO_JUEZ = 'papeleta_juez'
+ESTILO_BORDE_FINO = 'papeleta_borde_fino'
+ESTILO_BORDE_GRUESO = 'papeleta_borde_grueso'
+
+# nombre -> (fuente, alineación, borde); None deja el valor por defecto
+ESTILOS_PAPELETA = {
+    ESTILO_TITULO_DOCUMENTO: (Font(bold=True, size=14, color='1E88E5'), _CENTRADO, Border()),
+    ESTILO_PRUEBA: (Font(bold=True, size=12, color='1E88E5'), _CENTRADO_AJUSTADO, _BORDE_GRUESO),
+    ESTILO_NADADOR: (Font(size=9), _CENTRADO_AJUSTADO, _BORDE_FINO),
+    ESTILO_SERIE: (Font(bold=True, size=10), _CENTRADO, _BORDE_FINO),
+    ESTILO_TITULO_TIEMPO: (Font(bold=True, size=14, color='FF0000'), _CENTRADO, _BORDE_FINO),
+    ESTILO_TIEMPO: (Font(bold=True, size=14), Alignment(horizontal='center', vertical='center'), _BORDE_GRUESO),
+    ESTILO_JUEZ: (Font(size=8, color='666666'), _CENTRADO, _BORDE_FINO),
+    ESTILO_BORDE_FINO: (None, None, _BORDE_FINO),
+    ESTILO_BORDE_GRUESO: (None, None, _BORDE_GRUESO),
+}
+
+# Filas de la papeleta: (estilo, texto fijo o función de la papeleta, estilo de las celdas cubiertas, alto de fila)
+PLANTILLA_PAPELETA = [
+    (ESTILO_PRUEBA, lambda p: p['prueba'], ESTILO_BORDE_GRUESO, None),
+    (ESTILO_NADADOR, lambda p: f"{p['nombre']}\n{p['equipo']} - {p['categoria']}", ESTILO_BORDE_FINO, 30),
+    (ESTILO_SERIE, lambda p: f"SERIE: {texto_serie(p)}  |  CARRIL: {p['carril']}", ESTILO_BORDE_FINO, None),
+    (ESTILO_TITULO_TIEMPO, "TIEMPO DE COMPETENCIA:", ESTILO_BORDE_FINO, None),
+    (ESTILO_TIEMPO, "_____ : _____ . _____", ESTILO_BORDE_GRUESO, 25),
+    (ESTILO_JUEZ, "Juez: ___________________", ESTILO_BORDE_FINO, 15),
+]
 
 def leer_datos_sembrado():
     """Lee los datos del sembrado con series y carriles asignados"""
     try:
-        df = pd.read_excel('planilla_inscripcion.xlsx')
-        info_cols = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO']
-        event_cols = [col for col in df.columns if col not in info_cols and 'Nø' not in col and 'FECHA DE NA' not in col]
-        
-        eventos = {}
-        for index, row in df.iterrows():
-            if pd.isna(row['NOMBRE Y AP']): continue
-            sexo = row['SEXO'].upper()
-            
-            for prueba in event_cols:
-                if inscrito_en_prueba(row[prueba]):
-                    nombre_prueba = f"{prueba} - {'Mujeres' if sexo == 'F' else 'Hombres'}"
-                    if nombre_prueba not in eventos: eventos[nombre_prueba] = []
-                    
-                    nadador_info = {
-                        "nombre": row['NOMBRE Y AP'], 
-                        "equipo": row['EQUIPO'], 
-                        "edad": int(row['EDAD']),
-                        "categoria": row['CAT.'],
-                        "sexo": sexo,
-                        "tiempo_inscripcion": row[prueba], 
-                        "tiempo_en_segundos": parse_time(row[prueba])
-                    }
-                    eventos[nombre_prueba].append(nadador_info)
-        
-        # Agrupar por categoría y crear series con carriles asignados (orden planilla: Mujeres → Hombres)
-        papeletas_con_carriles = []
-        for idx, nombre_prueba in enumerate(ordered_prueba_hoja_keys(eventos, event_cols), start=1):
-            titulo = titulo_prueba_numerada(idx, nombre_prueba)
-            nadadores = eventos[nombre_prueba]
-            nadadores_por_categoria = {}
-            for nadador in nadadores:
-                cat = nadador['categoria']
-                if cat not in nadadores_por_categoria: 
-                    nadadores_por_categoria[cat] = []
-                nadadores_por_categoria[cat].append(nadador)
-            
-            for categoria, lista_nadadores in sorted(nadadores_por_categoria.items()):
-                # Ordenar por tiempo
-                lista_nadadores_ordenada = sorted(lista_nadadores, key=lambda x: x['tiempo_en_segundos'])
-                
-                # Crear series de 8 nadadores
-                num_nadadores = len(lista_nadadores_ordenada)
-                num_series = math.ceil(num_nadadores / 8)
-                
-                for serie_num in range(1, num_series + 1):
-                    inicio = (serie_num - 1) * 8
-                    fin = min(serie_num * 8, num_nadadores)
-                    nadadores_serie = lista_nadadores_ordenada[inicio:fin]
-                    
-                    # Asignar carriles usando el orden estándar
-                    lane_order = [4, 5, 3, 6, 2, 7, 1, 8]
-                    
-                    for i, nadador in enumerate(nadadores_serie):
-                        if i < len(lane_order):
-                            carril_asignado = lane_order[i]
-                            
-                            papeleta = {
-                                "nombre": nadador['nombre'],
-                                "equipo": nadador['equipo'],
-                                "categoria": nadador['categoria'],
-                                "sexo": nadador['sexo'],
-                                "prueba": titulo,
-                                "serie": serie_num,
-                                "carril": carril_asignado,
-                                "tiempo_inscripcion": nadador['tiempo_inscripcion']
-                            }
-                            papeletas_con_carriles.append(papeleta)
-        
-        return papeletas_con_carriles
+        # Mismo sembrado por categorías (y misma distribución en series) que sembrado_competencia.xlsx
+        # (orden planilla: Mujeres → Hombres; calculado una vez por versión de la planilla; la lista es compartida)
+        papeletas, _ = cargar_papeletas('planilla_inscripcion.xlsx', POR_CATEGORIA, *distribucion_sembrado())
+        return papeletas
     
     except Exception as e:
         print(f"Error al leer datos del sembrado: {e}")
         return []
 
+def _registrar_estilos(wb):
+    """Registra una sola vez por libro los estilos con nombre de la plantilla de papeleta"""
+    for nombre, (font, alignment, border) in ESTILOS_PAPELETA.items():
+        estilo = NamedStyle(name=nombre, border=border)
+        if font is not None:
+            estilo.font = font
+        if alignment is not None:
+            estilo.alignment = alignment
+        wb.add_named_style(estilo)
+
+def _celda(ws, valor, estilo):
+    cell = WriteOnlyCell(ws, value=valor)
+    cell.style = estilo
+    return cell
+
+def _filas_grupo(ws, grupo, fila_inicio, rangos_combinados):
+    """
+    Estampa la plantilla para hasta 3 papeletas lado a lado: devuelve las 6 filas del
+    grupo y agrega a rangos_combinados las celdas combinadas de cada papeleta.
+    """
+    for desplazamiento, (estilo, texto, borde, alto) in enumerate(PLANTILLA_PAPELETA):
+        fila_num = fila_inicio + desplazamiento
+        if alto:
+            ws.row_dimensions[fila_num].height = alto
+        fila = []
+        for pos_en_fila, papeleta in enumerate(grupo):
+            col_inicio = pos_en_fila * COLUMNAS_POR_PAPELETA + 1  # 1, 4, 7
+            valor = texto(papeleta) if callable(texto) else texto
+            # Las celdas cubiertas llevan sólo el borde para que el recuadro abarque toda la combinación
+            fila.append(_celda(ws, valor, estilo))
+            fila.extend(_celda(ws, None, borde) for _ in range(COLUMNAS_POR_PAPELETA - 1))
+            rangos_combinados.append(CellRange(min_col=col_inicio, min_row=fila_num,
+                                               max_col=col_inicio + COLUMNAS_POR_PAPELETA - 1, max_row=fila_num))
+        yield fila
+
+def escribir_papeletas_excel(archivo, papeletas):
+    """
+    Escribe las papeletas (3 por fila) en modo write-only: la plantilla de 6 filas se define
+    una vez y se estampa por nadador con estilos con nombre compartidos, así que la memoria
+    no crece con la cantidad de papeletas.
+    """
+    wb = Workbook(write_only=True)
+    _registrar_estilos(wb)
+    ws = wb.create_sheet("Papeletas Jueces")
+
+    # Anchos de columna (3 papeletas × 3 columnas cada una), antes de escribir filas
+    for col in range(1, PAPELETAS_POR_FILA * COLUMNAS_POR_PAPELETA + 1):  # A hasta I
+        ws.column_dimensions[get_column_letter(col)].width = 11
+
+    # Título del documento y fila en blanco
+    ultima_columna = get_column_letter(PAPELETAS_POR_FILA * COLUMNAS_POR_PAPELETA)
+    rangos_combinados = [CellRange(f"A1:{ultima_columna}1")]
+    ws.append([_celda(ws, "PAPELETAS DE JUECES - COMPETENCIA DE NATACIÓN TEN", ESTILO_TITULO_DOCUMENTO)])
+    ws.append([])
+
+    fila_actual = 3  # Empezar después del título
+    for i in range(0, len(papeletas), PAPELETAS_POR_FILA):
+        if i > 0:
+            # Espacio entre filas de papeletas
+            for _ in range(FILAS_ENTRE_GRUPOS - len(PLANTILLA_PAPELETA)):
+                ws.append([])
+            fila_actual += FILAS_ENTRE_GRUPOS
+        for fila in _filas_grupo(ws, papeletas[i:i + PAPELETAS_POR_FILA], fila_actual, rangos_combinados):
+            ws.append(fila)
+
+    # Los rangos no se solapan por construcción: se asignan juntos (add() revisa uno por uno)
+    ws.merged_cells = MultiCellRange(rangos_combinados)
+
+    # Configurar márgenes de página para impresión optimizada
+    ws.page_margins.left = 0.3
+    ws.page_margins.right = 0.3
+    ws.page_margins.top = 0.4
+    ws.page_margins.bottom = 0.3
+    ws.page_margins.header = 0.2
+    ws.page_margins.footer = 0.2
+
+    # Configurar orientación horizontal para mejor aprovechamiento
+    ws.page_setup.orientation = Worksheet.ORIENTATION_LANDSCAPE
+    ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
+
+    # Configurar escala de impresión para que quepa todo
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 0  # Sin límite de altura
+
+    # Configurar repetir filas en la parte superior (título)
+    ws.print_title_rows = '1:2'
+
+    # Configurar líneas de cuadrícula para impresión
+    ws.print_options.gridLines = True
+    ws.print_options.gridLinesSet = True
+
+    wb.save(archivo)
+
 def generar_papeletas_excel():
     """Genera papeletas con datos completos del sembrado, 3 por hoja"""
     papeletas_sembrado = leer_datos_sembrado()
@@ -107,146 +167,7 @@ def generar_papeletas_excel():
         return False, "No se pudieron leer los datos del sembrado"
     
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Papeletas Jueces"
-        
-        # Configurar anchos de columna para dar espacio
-        for col in range(1, 9):  # A hasta H
-            ws.column_dimensions[get_column_letter(col)].width = 15
-        
-        # 3 papeletas por hoja
-        fila_actual = 1
-        
-        # Estilos
-        titulo_font = Font(bold=True, size=12, color='1E88E5')
-        info_font = Font(size=9)
-        serie_font = Font(bold=True, size=10)
-        tiempo_font = Font(bold=True, size=14, color='FF0000')
-        
-        border_thin = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'), 
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        border_thick = Border(
-            left=Side(style='thick'),
-            right=Side(style='thick'),
-            top=Side(style='thick'), 
-            bottom=Side(style='thick')
-        )
-        
-        # Configurar anchos de columna para mejor distribución (3 papeletas por fila)
-        for col in range(1, 10):  # A hasta I (3 papeletas × 3 columnas cada una)
-            ws.column_dimensions[get_column_letter(col)].width = 11
-        
-        # Agregar título del documento
-        ws.merge_cells('A1:I1')
-        title_cell = ws.cell(row=1, column=1, value="PAPELETAS DE JUECES - COMPETENCIA DE NATACIÓN TEN")
-        title_cell.font = Font(bold=True, size=14, color='1E88E5')
-        title_cell.alignment = Alignment(horizontal='center')
-        
-        fila_actual = 3  # Empezar después del título
-        contador_papeletas = 0
-        
-        for papeleta in papeletas_sembrado:
-            # Calcular posición (3 papeletas por fila)
-            pos_en_fila = contador_papeletas % 3  # 0, 1, 2
-            if pos_en_fila == 0 and contador_papeletas > 0:
-                fila_actual += 8  # Espacio entre filas de papeletas (reducido)
-            
-            col_inicio = pos_en_fila * 3 + 1  # 1, 4, 7
-            
-            fila_base = fila_actual
-            
-            # PRIMERA FILA: Prueba
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio, 
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio, value=papeleta['prueba'])
-            cell.font = titulo_font
-            cell.alignment = Alignment(horizontal='center', wrap_text=True)
-            cell.border = border_thick
-            
-            # SEGUNDA FILA: Nadador, Equipo, Categoría  
-            fila_base += 1
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio,
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio,
-                         value=f"{papeleta['nombre']}\n{papeleta['equipo']} - {papeleta['categoria']}")
-            cell.font = info_font
-            cell.alignment = Alignment(horizontal='center', wrap_text=True)
-            cell.border = border_thin
-            ws.row_dimensions[fila_base].height = 30
-            
-            # TERCERA FILA: Serie y Carril YA ASIGNADOS
-            fila_base += 1
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio,
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio, 
-                         value=f"SERIE: {papeleta['serie']}  |  CARRIL: {papeleta['carril']}")
-            cell.font = serie_font
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = border_thin
-            
-            # CUARTA FILA: TIEMPO DE COMPETENCIA (título)
-            fila_base += 1
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio,
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio, value="TIEMPO DE COMPETENCIA:")
-            cell.font = tiempo_font
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = border_thin
-            
-            # QUINTA FILA: Línea para anotación (EN BLANCO) - más compacta
-            fila_base += 1
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio,
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio, value="_____ : _____ . _____")
-            cell.font = Font(bold=True, size=14)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border_thick
-            
-            # SEXTA FILA: Juez (más compacta)
-            fila_base += 1
-            ws.merge_cells(start_row=fila_base, start_column=col_inicio,
-                         end_row=fila_base, end_column=col_inicio + 2)
-            cell = ws.cell(row=fila_base, column=col_inicio, value="Juez: ___________________")
-            cell.font = Font(size=8, color='666666')
-            cell.alignment = Alignment(horizontal='center')
-            cell.border = border_thin
-            
-            # Ajustar altura de las filas
-            ws.row_dimensions[fila_base - 1].height = 25  # Fila de tiempo
-            ws.row_dimensions[fila_base].height = 15      # Fila de juez
-            
-            contador_papeletas += 1
-        
-        # Configurar márgenes de página para impresión optimizada
-        ws.page_margins.left = 0.3
-        ws.page_margins.right = 0.3
-        ws.page_margins.top = 0.4 
-        ws.page_margins.bottom = 0.3
-        ws.page_margins.header = 0.2
-        ws.page_margins.footer = 0.2
-        
-        # Configurar orientación horizontal para mejor aprovechamiento
-        ws.page_setup.orientation = ws.ORIENTATION_LANDSCAPE
-        ws.page_setup.paperSize = ws.PAPERSIZE_A4
-        
-        # Configurar escala de impresión para que quepa todo
-        ws.page_setup.fitToWidth = 1
-        ws.page_setup.fitToHeight = 0  # Sin límite de altura
-        
-        # Configurar repetir filas en la parte superior (título)
-        ws.print_title_rows = '1:2'
-        
-        # Configurar líneas de cuadrícula para impresión
-        ws.print_options.gridLines = True
-        ws.print_options.gridLinesSet = True
-        
-        wb.save(ARCHIVO_PAPELETAS_EXCEL)
+        escribir_papeletas_excel(ARCHIVO_PAPELETAS_EXCEL, papeletas_sembrado)
         return True, f"Papeletas Excel generadas exitosamente: {ARCHIVO_PAPELETAS_EXCEL}"
         
     except Exception as e:
@@ -47,8 +47,17 @@ def verificar_archivo(archivo, descripcion):
         print(f"❌ {descripcion}: {archivo} (NO ENCONTRADO)")
         return False
 
+def sincronizar_planilla():
+    """Exporta planilla_inscripcion.xlsx si hay inscripciones pendientes en el almacén"""
+    try:
+        from registro_store import exportar_planilla_si_cambio
+        exportar_planilla_si_cambio("planilla_inscripcion.xlsx")
+    except Exception as e:
+        print(f"⚠️  No se pudo exportar la planilla de inscripción: {e}")
+
 def mostrar_estado_archivos():
     """Muestra el estado de todos los archivos del sistema"""
+    sincronizar_planilla()
     print("\n📁 ESTADO DE ARCHIVOS")
     print("-" * 40)
     
@@ -95,6 +104,7 @@ def ejecutar_inscripcion():
 def ejecutar_sembrado_categoria():
     """Ejecuta el sembrado por categorías"""
     print("\n📊 GENERANDO SEMBRADO POR CATEGORÍAS...")
+    sincronizar_planilla()
     
     if not verificar_archivo("planilla_inscripcion.xlsx", "Archivo de inscripciones"):
         print("⚠️  Necesitas el archivo de inscripciones para generar el sembrado.")
@@ -118,6 +128,7 @@ def ejecutar_sembrado_categoria():
 def ejecutar_sembrado_tiempo():
     """Ejecuta el sembrado por tiempo"""
     print("\n⏱️ GENERANDO SEMBRADO POR TIEMPO...")
+    sincronizar_planilla()
     
     if not verificar_archivo("planilla_inscripcion.xlsx", "Archivo de inscripciones"):
         print("⚠️  Necesitas el archivo de inscripciones para generar el sembrado.")
@@ -0,0 +1,442 @@
+"""
+Motor de sembrado compartido (series y carriles) a partir de planilla_inscripcion.xlsx.
+
+La planilla se lee una sola vez por versión del archivo y se convierte en una tabla
+larga (nadador, prueba, segundos). El sembrado de todas las pruebas, géneros y
+categorías se calcula con ``groupby`` + ordenamiento sobre esa tabla, y los
+generadores de sembrado, papeletas PDF/Excel y la app reutilizan el mismo resultado
+en lugar de volver a recorrer el Excel fila por fila.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from event_manager import EventManager
+from planilla_utils import ordered_prueba_hoja_keys, titulo_prueba_numerada
+from registro_store import exportar_planilla_si_cambio
+from tiempos_utils import segundos_por_prueba
+
+ARCHIVO_INSCRIPCION = 'planilla_inscripcion.xlsx'
+ARCHIVO_SEMBRADO = 'sembrado_competencia.xlsx'
+COLUMNAS_INFO = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO']
+SIN_CATEGORIA = 'SIN CATEGORÍA'
+
+# Modos de agrupación del sembrado
+POR_CATEGORIA = 'categoria'
+POR_TIEMPO = 'tiempo'
+
+# Distribución de cada prueba en series
+SERIES_DIRECTAS = 'directa'          # mejores tiempos en la última serie, el resto hacia atrás
+SERIES_CIRCULARES = 'circular'       # las últimas 2-3 series se reparten en círculo
+FINAL_POR_TIEMPO = 'final_por_tiempo'  # series directas repartidas en varias sesiones
+
+# Caché por archivo: firma (mtime_ns, tamaño) → tabla larga y sembrados calculados
+_CACHE = {}
+_CACHE_DISTRIBUCION = {}
+
+
+def columnas_de_pruebas(df):
+    """Columnas de la planilla que corresponden a pruebas."""
+    return [col for col in df.columns
+            if col not in COLUMNAS_INFO and 'Nø' not in str(col) and 'FECHA DE NA' not in str(col)]
+
+
+def orden_carriles_evento():
+    """Orden de siembra de carriles del evento configurado (event_config.json)."""
+    return EventManager().get_lane_order()
+
+
+def _orden(orden_carriles):
+    return tuple(orden_carriles) if orden_carriles is not None else tuple(orden_carriles_evento())
+
+
+def _firma(archivo):
+    stat = os.stat(archivo)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _mascara_inscritos(valores):
+    """Versión vectorizada de ``inscrito_en_prueba`` para un bloque de columnas."""
+    inscritos = valores.notna()
+    for col in valores.columns:
+        columna = valores[col]
+        if columna.dtype == object:
+            vacia = columna.map(lambda v: isinstance(v, str) and v.strip() == '')
+            inscritos[col] = inscritos[col] & ~vacia
+    return inscritos.to_numpy()
+
+
+def tabla_inscripciones(df, event_cols=None):
+    """
+    Planilla (formato ancho) → tabla larga con una fila por nadador inscrito en cada prueba.
+
+    Columnas: fila, nombre, equipo, edad, categoria, sexo, genero, prueba, orden_prueba,
+    tiempo_inscripcion (valor original de la celda) y segundos (``inf`` sin tiempo).
+    """
+    if event_cols is None:
+        event_cols = columnas_de_pruebas(df)
+    df = df[df['NOMBRE Y AP'].notna()]
+
+    filas, columnas = np.nonzero(_mascara_inscritos(df[event_cols])) if len(df) and event_cols else ([], [])
+    filas = np.asarray(filas, dtype=np.int64)
+    columnas = np.asarray(columnas, dtype=np.int64)
+
+    segundos = segundos_por_prueba(df, event_cols).to_numpy(dtype='float64') if event_cols else np.empty((len(df), 0))
+    tiempos = df[event_cols].to_numpy(dtype=object) if event_cols else np.empty((len(df), 0), dtype=object)
+    sexo = df['SEXO'].astype(str).str.upper().to_numpy()
+    edad = pd.to_numeric(df['EDAD'], errors='coerce').to_numpy()
+    categoria = df['CAT.'].where(df['CAT.'].notna(), SIN_CATEGORIA).to_numpy(dtype=object)
+
+    return pd.DataFrame({
+        'fila': df.index.to_numpy()[filas],
+        'nombre': df['NOMBRE Y AP'].to_numpy(dtype=object)[filas],
+        'equipo': df['EQUIPO'].to_numpy(dtype=object)[filas],
+        'edad': np.array([None if np.isnan(e) else int(e) for e in edad[filas]], dtype=object),
+        'categoria': categoria[filas],
+        'sexo': sexo[filas],
+        'genero': np.where(sexo[filas] == 'F', 'Mujeres', 'Hombres'),
+        'prueba': np.asarray(event_cols, dtype=object)[columnas] if event_cols else np.empty(0, dtype=object),
+        'orden_prueba': columnas,
+        'tiempo_inscripcion': tiempos[filas, columnas],
+        'segundos': segundos[filas, columnas],
+    })
+
+
+def parametros_distribucion(distribucion=SERIES_DIRECTAS, series_circulares=3, sesiones=2):
+    """Modo de distribución → (series en círculo, sesiones) para ``sembrar_tabla``."""
+    if distribucion == SERIES_CIRCULARES:
+        return max(2, min(3, int(series_circulares))), 1
+    if distribucion == FINAL_POR_TIEMPO:
+        return 0, max(1, int(sesiones))
+    return 0, 1
+
+
+def asignar_series(tamanos, posiciones, orden_carriles=None, series_circulares=0):
+    """
+    Serie y carril para cada posición (0 = mejor tiempo) dentro de grupos de ``tamanos``.
+
+    Las series se llenan desde la última: la última serie lleva los mejores tiempos,
+    la primera queda con los nadadores restantes. Dentro de cada serie el mejor tiempo
+    va al primer carril de ``orden_carriles`` (por defecto, el orden del evento).
+
+    Con ``series_circulares`` (2 o 3) los mejores nadadores se reparten en círculo entre
+    las últimas series: 1.º a la última, 2.º a la penúltima, 3.º a la antepenúltima,
+    4.º de nuevo a la última, etc.; el resto se siembra en forma directa en las anteriores.
+    """
+    orden = np.asarray(_orden(orden_carriles), dtype=np.int64)
+    carriles = len(orden)
+    tamanos = np.asarray(tamanos, dtype=np.int64)
+    posiciones = np.asarray(posiciones, dtype=np.int64)
+    total_series = (tamanos + carriles - 1) // carriles
+
+    circulares = np.minimum(int(series_circulares), total_series)
+    en_circulo = posiciones < circulares * carriles
+    paso = np.maximum(circulares, 1)
+    serie_circulo = total_series - posiciones % paso
+    puesto_circulo = posiciones // paso
+
+    # Siembra directa de los nadadores que quedan fuera del círculo
+    restantes = tamanos - circulares * carriles
+    posicion_directa = posiciones - circulares * carriles
+    serie_directa = (restantes - 1 - posicion_directa) // carriles + 1
+    puesto_directo = posicion_directa - np.maximum(0, restantes - serie_directa * carriles)
+
+    serie = np.where(en_circulo, serie_circulo, serie_directa)
+    puesto = np.where(en_circulo, puesto_circulo, puesto_directo)
+    return serie, orden[puesto]
+
+
+def asignar_sesiones(series, total_series, sesiones=1):
+    """Reparte las series de cada prueba en ``sesiones`` bloques contiguos (la más rápida, en la última)."""
+    series = np.asarray(series, dtype=np.int64)
+    total_series = np.asarray(total_series, dtype=np.int64)
+    sesiones = np.minimum(int(sesiones), total_series)
+    return (series - 1) * sesiones // total_series + 1
+
+
+def sembrar_tabla(largo, modo=POR_CATEGORIA, orden_carriles=None, series_circulares=0, sesiones=1):
+    """
+    Siembra todas las pruebas de la tabla larga en una pasada.
+
+    Agrupa por prueba y género (y categoría con ``POR_CATEGORIA``), ordena por tiempo
+    conservando el orden de la planilla en los empates y agrega las columnas
+    ``clave`` ("{prueba} - {género}"), ``serie``, ``carril``, ``sesion`` y ``posicion``.
+    El orden de carriles usado queda en ``sembrado.attrs['orden_carriles']``.
+    """
+    orden = _orden(orden_carriles)
+    grupos = ['orden_prueba', 'genero'] + (['categoria'] if modo == POR_CATEGORIA else [])
+    sembrado = largo.sort_values(['segundos', 'fila'], kind='mergesort')
+    sembrado = sembrado.sort_values(grupos, kind='mergesort').reset_index(drop=True)
+    sembrado.attrs['orden_carriles'] = orden
+    sembrado.attrs['sesiones'] = int(sesiones)
+    if sembrado.empty:
+        return sembrado.assign(clave=pd.Series(dtype=object), serie=pd.Series(dtype='int64'),
+                               carril=pd.Series(dtype='int64'), sesion=pd.Series(dtype='int64'),
+                               posicion=pd.Series(dtype='int64'))
+    agrupado = sembrado.groupby(grupos, sort=False)
+    posicion = agrupado.cumcount().to_numpy()
+    tamano = agrupado['fila'].transform('size').to_numpy()
+    serie, carril = asignar_series(tamano, posicion, orden, series_circulares)
+    total_series = (tamano + len(orden) - 1) // len(orden)
+    sembrado['clave'] = sembrado['prueba'].astype(str) + ' - ' + sembrado['genero']
+    sembrado['serie'] = serie
+    sembrado['carril'] = carril
+    sembrado['sesion'] = asignar_sesiones(serie, total_series, sesiones)
+    sembrado['posicion'] = posicion
+    return sembrado
+
+
+def cargar_inscripciones(archivo=ARCHIVO_INSCRIPCION):
+    """
+    (tabla larga, columnas de pruebas) de la planilla; se relee solo si el archivo cambió.
+    """
+    exportar_planilla_si_cambio(archivo)
+    firma = _firma(archivo)
+    entrada = _CACHE.get(archivo)
+    if entrada is None or entrada['firma'] != firma:
+        df = pd.read_excel(archivo)
+        event_cols = columnas_de_pruebas(df)
+        entrada = {
+            'firma': firma,
+            'largo': tabla_inscripciones(df, event_cols),
+            'event_cols': event_cols,
+            'sembrados': {},
+        }
+        _CACHE[archivo] = entrada
+    return entrada['largo'], entrada['event_cols']
+
+
+def cargar_sembrado(archivo=ARCHIVO_INSCRIPCION, modo=POR_CATEGORIA, orden_carriles=None,
+                    series_circulares=0, sesiones=1):
+    """(sembrado, columnas de pruebas) con serie y carril asignados, reutilizado entre consumidores."""
+    largo, event_cols = cargar_inscripciones(archivo)
+    clave = (modo, _orden(orden_carriles), int(series_circulares), int(sesiones))
+    sembrados = _CACHE[archivo]['sembrados']
+    if clave not in sembrados:
+        sembrados[clave] = sembrar_tabla(largo, *clave)
+    return sembrados[clave], event_cols
+
+
+def _nadadores(sembrado, con_sexo=False):
+    """Filas del sembrado → dicts de nadador en el formato que usan los generadores."""
+    columnas = {'nombre': 'nombre', 'equipo': 'equipo', 'edad': 'edad', 'categoria': 'categoria',
+                'tiempo_inscripcion': 'tiempo_inscripcion', 'segundos': 'tiempo_en_segundos'}
+    if con_sexo:
+        columnas['sexo'] = 'sexo'
+    return sembrado[list(columnas)].rename(columns=columnas).to_dict('records')
+
+
+def series_de_grupo(grupo, carriles=None):
+    """Filas sembradas de un grupo → [{"serie": n, "sesion": s, "carriles": [nadador | None] * carriles}]."""
+    if carriles is None:
+        carriles = len(orden_carriles_evento())
+    series = {}
+    for serie, carril, sesion, nadador in zip(grupo['serie'], grupo['carril'], grupo['sesion'], _nadadores(grupo)):
+        if serie not in series:
+            series[serie] = {"serie": int(serie), "sesion": int(sesion), "carriles": [None] * carriles}
+        series[serie]["carriles"][carril - 1] = nadador
+    return [series[s] for s in sorted(series)]
+
+
+def titulo_serie(serie, mostrar_sesion=False):
+    """Encabezado de serie en las hojas de sembrado: "Serie 3" o "Serie 3 (Sesión 2)"."""
+    if mostrar_sesion and serie.get('sesion'):
+        return f"Serie {serie['serie']} (Sesión {serie['sesion']})"
+    return f"Serie {serie['serie']}"
+
+
+def sembrar_nadadores(nadadores, orden_carriles=None, series_circulares=0, sesiones=1):
+    """
+    Siembra una lista de dicts con ``tiempo_en_segundos`` (mismo criterio que el motor).
+
+    Devuelve [{"serie": n, "carriles": [...]}] con los dicts originales en sus carriles;
+    con ``sesiones`` > 1 (final por tiempo) cada serie lleva además su "sesion".
+    """
+    if not nadadores:
+        return []
+    ordenados = sorted(nadadores, key=lambda x: x['tiempo_en_segundos'])
+    total = len(ordenados)
+    orden = _orden(orden_carriles)
+    carriles = len(orden)
+    serie, carril = asignar_series(np.full(total, total), np.arange(total), orden, series_circulares)
+    total_series = int(serie.max())
+    series = [{"serie": i + 1, "carriles": [None] * carriles} for i in range(total_series)]
+    if sesiones > 1:
+        for s, sesion in zip(series, asignar_sesiones(np.arange(1, total_series + 1), total_series, sesiones)):
+            s["sesion"] = int(sesion)
+    for nadador, s, c in zip(ordenados, serie, carril):
+        series[s - 1]["carriles"][c - 1] = nadador
+    return series
+
+
+def _identidad(nadador):
+    return (str(nadador.get('nombre', '')).strip().lower(), str(nadador.get('equipo', '')).strip().lower())
+
+
+def actualizar_series(series, nadadores, orden_carriles=None):
+    """
+    Aplica altas y retiros a un sembrado existente sin rehacerlo (sembrado manual).
+
+    Los nadadores que siguen inscritos conservan su serie y carril (y lo que se haya
+    anotado en su dict). Los retirados dejan el carril libre. Cada alta va a la serie
+    que le tocaría en un sembrado nuevo o, si está llena, a la más cercana con carril
+    libre (en orden de carriles); si no hay lugar se agrega una serie.
+    Devuelve ``(series, altas, retiros)``.
+    """
+    orden = _orden(orden_carriles)
+    actuales = {_identidad(n): n for n in nadadores}
+    series = [{**serie, "carriles": list(serie["carriles"])} for serie in series]
+
+    presentes = set()
+    retiros = []
+    for serie in series:
+        for idx, nadador in enumerate(serie["carriles"]):
+            if nadador is None:
+                continue
+            identidad = _identidad(nadador)
+            if identidad in actuales:
+                presentes.add(identidad)
+            else:
+                serie["carriles"][idx] = None
+                retiros.append(nadador)
+
+    altas = [n for k, n in actuales.items() if k not in presentes]
+    if altas:
+        referencia = sembrar_nadadores(list(actuales.values()), orden)
+        serie_ideal = {_identidad(n): s["serie"] for s in referencia for n in s["carriles"] if n}
+        for nadador in sorted(altas, key=lambda x: x['tiempo_en_segundos']):
+            ideal = serie_ideal[_identidad(nadador)]
+            candidatas = sorted(series, key=lambda s: (abs(s["serie"] - ideal), -s["serie"]))
+            for serie in candidatas:
+                libre = next((c for c in orden if c <= len(serie["carriles"]) and serie["carriles"][c - 1] is None), None)
+                if libre is not None:
+                    serie["carriles"][libre - 1] = nadador
+                    break
+            else:
+                nueva = {"serie": len(series) + 1, "carriles": [None] * len(orden)}
+                nueva["carriles"][orden[0] - 1] = nadador
+                series.append(nueva)
+    return series, altas, retiros
+
+
+def _carriles_de(sembrado):
+    return len(sembrado.attrs.get('orden_carriles') or orden_carriles_evento())
+
+
+def sembrado_por_categoria(sembrado, event_cols):
+    """
+    {"{prueba} - {género}": [{"categoria", "series"}, ...]} en el orden de hojas de la
+    planilla, con las categorías de cada prueba en orden alfabético.
+    """
+    carriles = _carriles_de(sembrado)
+    resultado = {}
+    for (clave, categoria), grupo in sembrado.groupby(['clave', 'categoria'], sort=False):
+        resultado.setdefault(clave, []).append({"categoria": categoria, "series": series_de_grupo(grupo, carriles)})
+    for bloques in resultado.values():
+        bloques.sort(key=lambda b: b['categoria'])
+    return {clave: resultado[clave] for clave in ordered_prueba_hoja_keys(resultado, event_cols)}
+
+
+def sembrado_por_tiempo(sembrado, event_cols):
+    """{"{prueba} - {género}": {"series": [...]}} en el orden de hojas de la planilla."""
+    carriles = _carriles_de(sembrado)
+    resultado = {
+        clave: {"series": series_de_grupo(grupo, carriles)}
+        for clave, grupo in sembrado.groupby('clave', sort=False)
+    }
+    return {clave: resultado[clave] for clave in ordered_prueba_hoja_keys(resultado, event_cols)}
+
+
+def papeletas_de_sembrado(sembrado, event_cols):
+    """
+    Lista plana de papeletas (una por nadador y prueba) con el título numerado de la prueba.
+    En final por tiempo cada papeleta lleva su "sesion" (None si el sembrado no tiene sesiones).
+    """
+    if sembrado.empty:
+        return []
+    claves = ordered_prueba_hoja_keys(dict.fromkeys(sembrado['clave']), event_cols)
+    con_sesiones = sembrado.attrs.get('sesiones', 1) > 1
+    titulos = {clave: titulo_prueba_numerada(idx, clave) for idx, clave in enumerate(claves, start=1)}
+    orden_clave = {clave: idx for idx, clave in enumerate(claves)}
+    ordenado = sembrado.assign(_orden=sembrado['clave'].map(orden_clave)).sort_values(
+        ['_orden', 'categoria', 'serie', 'posicion'], kind='mergesort')
+    return [
+        {
+            "nombre": nadador['nombre'],
+            "equipo": nadador['equipo'],
+            "categoria": nadador['categoria'],
+            "sexo": nadador['sexo'],
+            "prueba": titulos[clave],
+            "serie": int(serie),
+            "sesion": int(sesion) if con_sesiones else None,
+            "carril": int(carril),
+            "tiempo_inscripcion": nadador['tiempo_inscripcion'],
+        }
+        for nadador, clave, serie, sesion, carril in zip(
+            _nadadores(ordenado, con_sexo=True), ordenado['clave'], ordenado['serie'], ordenado['sesion'],
+            ordenado['carril'])
+    ]
+
+
+def indice_papeletas(papeletas):
+    """
+    Índice de navegación {prueba: {(categoria, serie): [(carril, posición en papeletas)]}} en el
+    orden del programa. En el sembrado por categorías cada categoría numera sus series, así que
+    la serie se identifica junto con la categoría.
+    """
+    indice = {}
+    for posicion, papeleta in enumerate(papeletas):
+        series = indice.setdefault(papeleta['prueba'], {})
+        series.setdefault((papeleta['categoria'], papeleta['serie']), []).append((papeleta['carril'], posicion))
+    for series in indice.values():
+        for carriles in series.values():
+            carriles.sort()
+    return indice
+
+
+def texto_serie(papeleta, corto=False):
+    """Serie de una papeleta para imprimir: "3", o "3 (Sesión 2)" / "3 (S2)" en final por tiempo."""
+    sesion = papeleta.get('sesion')
+    if not sesion:
+        return str(papeleta['serie'])
+    return f"{papeleta['serie']} (S{sesion})" if corto else f"{papeleta['serie']} (Sesión {sesion})"
+
+
+def distribucion_sembrado(archivo_sembrado=ARCHIVO_SEMBRADO):
+    """
+    (series en círculo, sesiones) con que se generó el libro de sembrado por categorías,
+    leídos de su instantánea, para que papeletas y sembrado manual repartan las series igual
+    que la hoja de series. (0, 1) —siembra directa— si el libro no se generó.
+    """
+    # Import diferido: sembrado_incremental importa este módulo (vía escritor_sembrado)
+    from sembrado_incremental import cargar_snapshot, ruta_snapshot
+
+    try:
+        firma = _firma(ruta_snapshot(archivo_sembrado))
+    except OSError:
+        return 0, 1
+    entrada = _CACHE_DISTRIBUCION.get(archivo_sembrado)
+    if entrada is None or entrada[0] != firma:
+        snapshot = cargar_snapshot(archivo_sembrado) or {}
+        parametros = snapshot.get('parametros') or []
+        distribucion = (0, 1)
+        if len(parametros) == 4 and parametros[0] == POR_CATEGORIA:
+            distribucion = (int(parametros[2]), int(parametros[3]))
+        entrada = _CACHE_DISTRIBUCION[archivo_sembrado] = (firma, distribucion)
+    return entrada[1]
+
+
+def cargar_papeletas(archivo=ARCHIVO_INSCRIPCION, modo=POR_CATEGORIA, series_circulares=0, sesiones=1):
+    """
+    (papeletas, índice) del sembrado, calculados una sola vez por versión de la planilla,
+    orden de carriles y distribución en series. La lista es compartida entre consumidores:
+    no modificarla.
+    """
+    sembrado, event_cols = cargar_sembrado(archivo, modo, None, series_circulares, sesiones)
+    calculadas = _CACHE[archivo].setdefault('papeletas', {})
+    clave = (modo, _orden(None), int(series_circulares), int(sesiones))
+    if clave not in calculadas:
+        papeletas = papeletas_de_sembrado(sembrado, event_cols)
+        calculadas[clave] = (papeletas, indice_papeletas(papeletas))
+    return calculadas[clave]
@@ -0,0 +1,699 @@
+"""
+Construcción de papeletas PDF con ReportLab.
+
+Contiene los bloques de cada formato de papeleta, la historia (lista de flowables) de
+cada documento y la generación en paralelo: cada prueba se construye en un proceso del
+pool como un PDF independiente (útil para reimprimir una sola prueba) y luego se
+concatenan en el documento completo. Vive en un módulo importable por nombre para que
+los procesos hijos puedan recibir ``construir_pdf``.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch, mm
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+from motor_sembrado import texto_serie
+
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+    print("pypdf no disponible - el PDF completo se construirá en un solo proceso")
+
+TITULO_DOCUMENTO = "PAPELETAS DE JUECES - COMPETENCIA DE NATACIÓN"
+
+# --- PLANTILLAS COMPARTIDAS ---
+# Cada plantilla de papeleta se define una sola vez: estilos de párrafo, TableStyle y
+# anchos de columna. Por papeleta sólo se crean los flowables con el texto del nadador.
+# El parámetro styles de los constructores se conserva por compatibilidad pero ya no se usa.
+_ESTILOS_BASE = getSampleStyleSheet()
+
+class PlantillaTabla:
+    """
+    Tabla de columnas y estilo fijos cuyo TableStyle se resuelve una sola vez por número
+    de filas. Aplicar el estilo (Table.setStyle) recorre cada comando celda por celda y es
+    la mayor parte del costo de una papeleta; aquí se hace sobre una tabla modelo y cada
+    tabla nueva reutiliza sus CellStyle (argumento público ``cellStyles``) y sus listas de
+    comandos.
+
+    Las listas de comandos son atributos internos de Table (probado con ReportLab 4.4 y
+    5.0). Si la versión instalada no los tiene, ``RAPIDA`` queda en False y cada tabla se
+    construye por la vía pública ``Table(..., style=...)``, con el mismo resultado.
+    """
+    _COMANDOS = ('_bkgrndcmds', '_linecmds', '_spanCmds', '_nosplitCmds', '_srflcmds', '_sircmds')
+
+    def __init__(self, anchos, estilo):
+        self.anchos = anchos
+        self.estilo = estilo
+        self._modelos = {}
+
+    @classmethod
+    def _soportada(cls):
+        """True si Table expone los atributos que reutiliza la vía rápida"""
+        try:
+            tabla = Table([['']], style=TableStyle([('ALIGN', (0, 0), (-1, -1), 'CENTER')]))
+            Table([['']], cellStyles=tabla._cellStyles)
+        except (AttributeError, TypeError):
+            return False
+        return all(isinstance(getattr(tabla, nombre, None), list) for nombre in cls._COMANDOS)
+
+    def _modelo(self, filas):
+        modelo = self._modelos.get(filas)
+        if modelo is None:
+            tabla = Table([[''] * len(self.anchos) for _ in range(filas)], colWidths=self.anchos, style=self.estilo)
+            modelo = self._modelos[filas] = (tabla._cellStyles, {nombre: getattr(tabla, nombre) for nombre in self._COMANDOS})
+        return modelo
+
+    def tabla(self, datos):
+        """Table con los datos dados y el estilo de la plantilla"""
+        if not self.RAPIDA:
+            return Table(datos, colWidths=self.anchos, style=self.estilo)
+        estilos_celda, comandos = self._modelo(len(datos))
+        tabla = Table(datos, colWidths=self.anchos, cellStyles=estilos_celda)
+        for nombre, lista in comandos.items():
+            setattr(tabla, nombre, list(lista))
+        return tabla
+
+PlantillaTabla.RAPIDA = PlantillaTabla._soportada()
+
+ESTILO_TITULO_DOCUMENTO = ParagraphStyle(
+    'DocumentTitle',
+    parent=_ESTILOS_BASE['Heading1'],
+    fontSize=16,
+    textColor=colors.black,
+    alignment=TA_CENTER,
+    spaceAfter=20,
+    fontName='Helvetica-Bold'
+)
+ESTILO_TITULO_DOCUMENTO_TABLA = ParagraphStyle(
+    'DocumentTitle',
+    parent=ESTILO_TITULO_DOCUMENTO,
+    fontSize=14,
+    spaceAfter=15
+)
+ESTILO_TITULO_EVENTO = ParagraphStyle(
+    'EventTitle',
+    parent=_ESTILOS_BASE['Heading2'],
+    fontSize=12,
+    textColor=colors.HexColor('#4472C4'),
+    alignment=TA_LEFT,
+    spaceAfter=10,
+    fontName='Helvetica-Bold'
+)
+
+# Papeleta compacta (3 por página)
+ESTILO_PRUEBA = ParagraphStyle(
+    'PruebaTitle',
+    parent=_ESTILOS_BASE['Heading2'],
+    fontSize=10,
+    textColor=colors.black,
+    alignment=TA_CENTER,
+    spaceAfter=8,
+    fontName='Helvetica-Bold'
+)
+ESTILO_NADADOR = ParagraphStyle(
+    'NadadorInfo',
+    parent=_ESTILOS_BASE['Normal'],
+    fontSize=9,
+    alignment=TA_CENTER,
+    spaceAfter=8,
+    fontName='Helvetica-Bold'
+)
+ESTILO_TITULO_TIEMPO = ParagraphStyle(
+    'TiempoTitle',
+    parent=_ESTILOS_BASE['Heading1'],
+    fontSize=10,
+    textColor=colors.HexColor('#FF0000'),
+    alignment=TA_CENTER,
+    spaceAfter=6,
+    fontName='Helvetica-Bold'
+)
+ESTILO_INFO_JUEZ = ParagraphStyle(
+    'Info',
+    parent=_ESTILOS_BASE['Normal'],
+    fontSize=7,
+    textColor=colors.HexColor('#666666'),
+    alignment=TA_CENTER,
+    spaceAfter=2
+)
+
+ANCHOS_SERIE_CARRIL = [0.8*inch, 0.8*inch]
+ESTILO_TABLA_SERIE_CARRIL = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, 1), 12),
+    ('BOX', (0, 1), (0, 1), 1, colors.black),
+    ('BOX', (1, 1), (1, 1), 1, colors.black),
+    ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#e8f5e8')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 1), (-1, 1), 4),
+    ('BOTTOMPADDING', (0, 1), (-1, 1), 4)
+])
+
+DATOS_CAJA_TIEMPO = [['_____ : _____ . _____']]
+ANCHOS_CAJA_TIEMPO = [2*inch]
+ESTILO_TABLA_CAJA_TIEMPO = TableStyle([
+    ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+    ('VALIGN', (0, 0), (0, 0), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (0, 0), 'Courier-Bold'),
+    ('FONTSIZE', (0, 0), (0, 0), 16),
+    ('BOX', (0, 0), (0, 0), 2, colors.black),
+    ('BACKGROUND', (0, 0), (0, 0), colors.white),
+    ('TOPPADDING', (0, 0), (0, 0), 8),
+    ('BOTTOMPADDING', (0, 0), (0, 0), 8)
+])
+
+ANCHOS_CONTENEDOR_COMPACTA = [6*inch]
+ESTILO_CONTENEDOR_COMPACTA = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BOX', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.white),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('LEFTPADDING', (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 8)
+])
+
+# Tabla por prueba (estilo Excel)
+ENCABEZADOS_TABLA_EXCEL = ['Prueba', 'Serie', 'Carril', 'Nombre', 'Equipo', 'Categoría', 'Tiempo Inscripción', 'Tiempo Final']
+ANCHOS_TABLA_EXCEL = [
+    2.5*inch,  # Prueba
+    0.6*inch,  # Serie
+    0.6*inch,  # Carril
+    1.8*inch,  # Nombre
+    1.3*inch,  # Equipo
+    0.8*inch,  # Categoría
+    1.0*inch,  # Tiempo Inscripción
+    1.0*inch   # Tiempo Final
+]
+ESTILO_TABLA_EXCEL = TableStyle([
+    # Encabezados
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+
+    # Filas de datos
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ALIGN', (1, 1), (2, -1), 'CENTER'),  # Serie y Carril centrados
+    ('ALIGN', (6, 1), (7, -1), 'CENTER'),  # Tiempos centrados
+
+    # Bordes
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+
+    # Alternar colores de filas
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F2F2F2')]),
+
+    # Espacio en celdas
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Papeleta estilo Excel (3 por fila)
+ESTILO_PAPELETA_EXCEL = TableStyle([
+    # Estilo general
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('LEFTPADDING', (0, 0), (-1, -1), 3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+
+    # Encabezados de campo en negrita
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E6F3FF')),
+
+    # Campo de tiempo final resaltado
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#FFE6E6')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+])
+ESTILO_PAPELETA_VACIA = TableStyle([('FONTSIZE', (0, 0), (-1, -1), 1)])
+ESTILO_FILA_3_PAPELETAS = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 5),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 5),
+])
+PAPELETAS_POR_FILA = 3
+ANCHO_PAPELETA_3_POR_FILA = (landscape(A4)[0] - 20*mm) / PAPELETAS_POR_FILA  # Ancho útil menos márgenes
+
+PLANTILLA_SERIE_CARRIL = PlantillaTabla(ANCHOS_SERIE_CARRIL, ESTILO_TABLA_SERIE_CARRIL)
+PLANTILLA_CAJA_TIEMPO = PlantillaTabla(ANCHOS_CAJA_TIEMPO, ESTILO_TABLA_CAJA_TIEMPO)
+PLANTILLA_CONTENEDOR_COMPACTA = PlantillaTabla(ANCHOS_CONTENEDOR_COMPACTA, ESTILO_CONTENEDOR_COMPACTA)
+PLANTILLA_TABLA_EXCEL = PlantillaTabla(ANCHOS_TABLA_EXCEL, ESTILO_TABLA_EXCEL)
+PLANTILLA_FILA_3_PAPELETAS = PlantillaTabla([ANCHO_PAPELETA_3_POR_FILA] * PAPELETAS_POR_FILA, ESTILO_FILA_3_PAPELETAS)
+
+_plantillas_papeleta_excel = {}
+
+def plantillas_papeleta_excel(width_per_papeleta):
+    """Plantillas (papeleta, relleno vacío) de la papeleta Excel para un ancho, creadas una vez por ancho"""
+    plantillas = _plantillas_papeleta_excel.get(width_per_papeleta)
+    if plantillas is None:
+        anchos = [width_per_papeleta * 0.4, width_per_papeleta * 0.6]
+        plantillas = _plantillas_papeleta_excel[width_per_papeleta] = (
+            PlantillaTabla(anchos, ESTILO_PAPELETA_EXCEL),
+            PlantillaTabla(anchos, ESTILO_PAPELETA_VACIA),
+        )
+    return plantillas
+
+def crear_papeleta_compacta(papeleta_data, styles=None):
+    """Crea una papeleta compacta para múltiples por página"""
+    nadador_info = f"{papeleta_data['nombre']}<br/>{papeleta_data['equipo']} - {papeleta_data['categoria']}"
+    serie_carril_data = [
+        ['SERIE:', 'CARRIL:'],
+        [texto_serie(papeleta_data, corto=True), str(papeleta_data['carril'])]
+    ]
+    return [
+        Paragraph(papeleta_data['prueba'], ESTILO_PRUEBA),
+        Paragraph(nadador_info, ESTILO_NADADOR),
+        PLANTILLA_SERIE_CARRIL.tabla(serie_carril_data),
+        Spacer(1, 8),
+        Paragraph("TIEMPO DE COMPETENCIA:", ESTILO_TITULO_TIEMPO),
+        PLANTILLA_CAJA_TIEMPO.tabla(DATOS_CAJA_TIEMPO),
+        Spacer(1, 6),
+        Paragraph("Juez: _________________", ESTILO_INFO_JUEZ),
+    ]
+
+def crear_pagina_con_3_papeletas(papeletas_grupo, styles=None):
+    """Crea una página con 3 papeletas organizadas verticalmente"""
+    elements = []
+
+    for i, papeleta in enumerate(papeletas_grupo):
+        if i > 0:
+            elements.append(Spacer(1, 15))  # Separador entre papeletas
+
+        # Cada papeleta va en una tabla contenedora (los Spacers se omiten: el
+        # espaciado lo controla el padding de la tabla)
+        papeleta_content = [
+            [element] for element in crear_papeleta_compacta(papeleta)
+            if not isinstance(element, Spacer)
+        ]
+        elements.append(PLANTILLA_CONTENEDOR_COMPACTA.tabla(papeleta_content))
+
+    elements.append(PageBreak())
+    return elements
+
+def crear_tabla_excel_style(papeletas_grupo, styles=None):
+    """Crea una tabla estilo Excel con múltiples nadadores por página"""
+    # Datos de la tabla: encabezados + filas de nadadores
+    table_data = [ENCABEZADOS_TABLA_EXCEL]
+    for papeleta in papeletas_grupo:
+        table_data.append([
+            papeleta['prueba'],
+            texto_serie(papeleta, corto=True),
+            str(papeleta['carril']),
+            papeleta['nombre'],
+            papeleta['equipo'],
+            papeleta['categoria'],
+            str(papeleta.get('tiempo_inscripcion', '')),
+            ''  # Campo vacío para tiempo final
+        ])
+    return PLANTILLA_TABLA_EXCEL.tabla(table_data)
+
+def crear_papeleta_individual_excel(papeleta, width_per_papeleta):
+    """Crea una papeleta individual en formato Excel"""
+    papeleta_data = [
+        ['Evento:', papeleta['prueba']],
+        ['SERIE:', texto_serie(papeleta)],
+        ['CARRIL:', str(papeleta['carril'])],
+        ['NADADOR:', papeleta['nombre']],
+        ['EQUIPO:', papeleta['equipo']],
+        ['CATEGORÍA:', papeleta['categoria']],
+        ['T. INSCRIPCIÓN:', str(papeleta.get('tiempo_inscripcion', ''))],
+        ['T. FINAL:', '']
+    ]
+    return plantillas_papeleta_excel(width_per_papeleta)[0].tabla(papeleta_data)
+
+def agrupar_por_evento(papeletas):
+    """Papeletas agrupadas por prueba, en el orden del sembrado."""
+    eventos = {}
+    for papeleta in papeletas:
+        eventos.setdefault(papeleta['prueba'], []).append(papeleta)
+    return eventos
+
+class MarcadorEvento(Flowable):
+    """Flowable sin tamaño que agrega la página actual al índice (marcadores) del PDF"""
+    def __init__(self, evento, clave):
+        super().__init__()
+        self.evento = evento
+        self.clave = clave
+
+    def wrap(self, ancho_disponible, alto_disponible):
+        return 0, 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.clave)
+        self.canv.addOutlineEntry(self.evento, self.clave, level=0)
+
+def historia_por_evento(historia, papeletas, con_titulo=True):
+    """
+    Historia del documento completo armada prueba por prueba, como el PDF concatenado:
+    cada prueba empieza en página nueva y tiene su marcador (el título va sólo en la primera).
+    """
+    elements = []
+    for numero, (evento, grupo) in enumerate(agrupar_por_evento(papeletas).items(), 1):
+        if numero > 1 and not isinstance(elements[-1], PageBreak):
+            elements.append(PageBreak())
+        elements.append(MarcadorEvento(evento, f"evento_{numero}"))
+        elements.extend(historia(grupo, con_titulo and numero == 1))
+    return elements
+
+def historia_individual(papeletas, con_titulo=True):
+    """3 papeletas por página en orientación vertical"""
+    elements = []
+    if con_titulo:
+        elements.append(Paragraph(TITULO_DOCUMENTO, ESTILO_TITULO_DOCUMENTO))
+        elements.append(Spacer(1, 10))
+
+    # Agrupar papeletas de 3 en 3 para cada página
+    for i in range(0, len(papeletas), 3):
+        elements.extend(crear_pagina_con_3_papeletas(papeletas[i:i+3]))
+    return elements
+
+def historia_excel_style(papeletas, con_titulo=True):
+    """Una tabla por prueba (15 nadadores por página) en orientación horizontal"""
+    elements = []
+    if con_titulo:
+        elements.append(Paragraph(TITULO_DOCUMENTO, ESTILO_TITULO_DOCUMENTO_TABLA))
+        elements.append(Spacer(1, 10))
+
+    events_grouped = agrupar_por_evento(papeletas)
+    for numero, (event_name, event_papeletas) in enumerate(events_grouped.items(), 1):
+        elements.append(Paragraph(event_name, ESTILO_TITULO_EVENTO))
+
+        # Agrupar por series (máximo 15 nadadores por página para mantener legibilidad)
+        NADADORES_POR_PAGINA = 15
+        for i in range(0, len(event_papeletas), NADADORES_POR_PAGINA):
+            elements.append(crear_tabla_excel_style(event_papeletas[i:i+NADADORES_POR_PAGINA]))
+            elements.append(Spacer(1, 15))
+
+            # Agregar salto de página si no es el último grupo
+            if i + NADADORES_POR_PAGINA < len(event_papeletas):
+                elements.append(PageBreak())
+
+        # Salto de página entre eventos
+        if numero < len(events_grouped):
+            elements.append(PageBreak())
+    return elements
+
+def historia_excel_3_por_fila(papeletas, con_titulo=True):
+    """Papeletas estilo Excel, 3 por fila y 6 filas por página en orientación horizontal"""
+    elements = []
+    if con_titulo:
+        elements.append(Paragraph(TITULO_DOCUMENTO, ESTILO_TITULO_DOCUMENTO))
+        elements.append(Spacer(1, 15))
+
+    width_per_papeleta = ANCHO_PAPELETA_3_POR_FILA
+    plantilla_vacia = plantillas_papeleta_excel(width_per_papeleta)[1]
+    for i in range(0, len(papeletas), PAPELETAS_POR_FILA):
+        tablas_fila = [
+            crear_papeleta_individual_excel(papeleta, width_per_papeleta)
+            for papeleta in papeletas[i:i+PAPELETAS_POR_FILA]
+        ]
+
+        # Rellenar con espacios vacíos si quedan menos de 3 (sólo ocurre en la última fila)
+        while len(tablas_fila) < PAPELETAS_POR_FILA:
+            tablas_fila.append(plantilla_vacia.tabla([['', '']]))
+
+        # Tabla contenedora para las 3 papeletas en una fila
+        elements.append(PLANTILLA_FILA_3_PAPELETAS.tabla([tablas_fila]))
+        elements.append(Spacer(1, 10))
+
+        # Salto de página cada 6 filas (18 papeletas por página)
+        if (i // PAPELETAS_POR_FILA + 1) % 6 == 0 and i + PAPELETAS_POR_FILA < len(papeletas):
+            elements.append(PageBreak())
+    return elements
+
+# --- RENDERIZADOR RÁPIDO ---
+# Las papeletas tienen un diseño fijo, así que el formato rápido las dibuja directo sobre
+# el canvas en una grilla precalculada de 3x6 por hoja A4 horizontal, sin flowables ni
+# cálculo de layout. La parte fija (fondos, líneas y etiquetas) se dibuja una sola vez
+# como Form XObject y cada papeleta sólo agrega sus siete textos.
+CAMPOS_PAPELETA_RAPIDA = [
+    ('Evento:', 'prueba'),
+    ('SERIE:', 'serie'),
+    ('CARRIL:', 'carril'),
+    ('NADADOR:', 'nombre'),
+    ('EQUIPO:', 'equipo'),
+    ('CATEGORÍA:', 'categoria'),
+    ('T. INSCRIPCIÓN:', 'tiempo_inscripcion'),
+    ('T. FINAL:', None),
+]
+COLUMNAS_RAPIDA = 3
+FILAS_RAPIDA = 6
+_PAGINA_RAPIDA = landscape(A4)
+_MARGEN_X_RAPIDA = 10*mm
+_MARGEN_Y_RAPIDA = 15*mm
+_SEPARACION_X_RAPIDA = 10
+_SEPARACION_Y_RAPIDA = 6
+_FUENTE_RAPIDA = 7
+_RELLENO_RAPIDA = 3
+ANCHO_PAPELETA_RAPIDA = (_PAGINA_RAPIDA[0] - 2*_MARGEN_X_RAPIDA - (COLUMNAS_RAPIDA - 1)*_SEPARACION_X_RAPIDA) / COLUMNAS_RAPIDA
+ALTO_PAPELETA_RAPIDA = (_PAGINA_RAPIDA[1] - 2*_MARGEN_Y_RAPIDA - (FILAS_RAPIDA - 1)*_SEPARACION_Y_RAPIDA) / FILAS_RAPIDA
+_ALTO_RENGLON_RAPIDA = ALTO_PAPELETA_RAPIDA / len(CAMPOS_PAPELETA_RAPIDA)
+_ANCHO_ETIQUETA_RAPIDA = ANCHO_PAPELETA_RAPIDA * 0.4
+_ANCHO_VALOR_RAPIDA = ANCHO_PAPELETA_RAPIDA - _ANCHO_ETIQUETA_RAPIDA - 2*_RELLENO_RAPIDA
+
+# Esquina inferior izquierda de cada casilla (de izquierda a derecha y de arriba hacia abajo)
+POSICIONES_RAPIDA = [
+    (_MARGEN_X_RAPIDA + columna*(ANCHO_PAPELETA_RAPIDA + _SEPARACION_X_RAPIDA),
+     _PAGINA_RAPIDA[1] - _MARGEN_Y_RAPIDA - (fila + 1)*ALTO_PAPELETA_RAPIDA - fila*_SEPARACION_Y_RAPIDA)
+    for fila in range(FILAS_RAPIDA) for columna in range(COLUMNAS_RAPIDA)
+]
+# Línea base del texto de cada renglón, relativa a la esquina inferior de la papeleta (centrado vertical)
+_BASES_RAPIDA = [
+    ALTO_PAPELETA_RAPIDA - (i + 1)*_ALTO_RENGLON_RAPIDA + (_ALTO_RENGLON_RAPIDA - 0.7*_FUENTE_RAPIDA) / 2
+    for i in range(len(CAMPOS_PAPELETA_RAPIDA))
+]
+
+def _plantilla_papeleta_rapida(c):
+    """Registra en el canvas la parte fija de la papeleta como Form XObject"""
+    filas = len(CAMPOS_PAPELETA_RAPIDA)
+    c.beginForm('papeleta')
+    # Fondos: columna de etiquetas y renglón de tiempo final (como en la papeleta 3x3)
+    c.setFillColor(colors.HexColor('#E6F3FF'))
+    c.rect(0, _ALTO_RENGLON_RAPIDA, _ANCHO_ETIQUETA_RAPIDA, ALTO_PAPELETA_RAPIDA - _ALTO_RENGLON_RAPIDA, stroke=0, fill=1)
+    c.setFillColor(colors.HexColor('#FFE6E6'))
+    c.rect(0, 0, ANCHO_PAPELETA_RAPIDA, _ALTO_RENGLON_RAPIDA, stroke=0, fill=1)
+    # Grilla
+    c.setStrokeColor(colors.black)
+    c.setLineWidth(1)
+    c.grid([0, _ANCHO_ETIQUETA_RAPIDA, ANCHO_PAPELETA_RAPIDA], [i * _ALTO_RENGLON_RAPIDA for i in range(filas + 1)])
+    # Etiquetas
+    c.setFillColor(colors.black)
+    c.setFont('Helvetica-Bold', _FUENTE_RAPIDA)
+    for (etiqueta, _), base in zip(CAMPOS_PAPELETA_RAPIDA, _BASES_RAPIDA):
+        c.drawString(_RELLENO_RAPIDA, base, etiqueta)
+    c.endForm()
+
+def _recortar_texto(texto, ancho, fuente='Helvetica', tamano=_FUENTE_RAPIDA):
+    """Recorta el texto con '…' para que no invada la papeleta vecina"""
+    if stringWidth(texto, fuente, tamano) <= ancho:
+        return texto
+    while texto and stringWidth(texto + '…', fuente, tamano) > ancho:
+        texto = texto[:-1]
+    return texto + '…'
+
+def dibujar_papeletas_canvas(ruta, papeletas, con_titulo=True, por_evento=False):
+    """
+    Dibuja las papeletas directo sobre un canvas (3x6 por hoja A4 horizontal) y devuelve
+    el número de páginas. El título del documento va en el pie de cada página, así que
+    con_titulo sólo se acepta por compatibilidad con las historias de flowables. Con
+    por_evento cada prueba empieza en página nueva y tiene su marcador.
+    """
+    c = Canvas(ruta, pagesize=_PAGINA_RAPIDA)
+    c.setTitle(TITULO_DOCUMENTO)
+    _plantilla_papeleta_rapida(c)
+
+    campos = [campo for _, campo in CAMPOS_PAPELETA_RAPIDA if campo]
+    x_valor = _ANCHO_ETIQUETA_RAPIDA + _RELLENO_RAPIDA
+    por_pagina = len(POSICIONES_RAPIDA)
+    recortados = {}  # Prueba, equipo y categoría se repiten: se miden una sola vez
+    bloques = agrupar_por_evento(papeletas).items() if por_evento else [(None, papeletas)]
+    paginas = 0
+    for numero, (evento, grupo) in enumerate(bloques, 1):
+        for inicio in range(0, len(grupo), por_pagina):
+            if paginas:
+                c.showPage()
+            paginas += 1
+            if evento is not None and inicio == 0:
+                c.bookmarkPage(f"evento_{numero}")
+                c.addOutlineEntry(evento, f"evento_{numero}", level=0)
+
+            # Pie de página
+            c.setFont('Helvetica', _FUENTE_RAPIDA)
+            c.setFillColor(colors.HexColor('#666666'))
+            c.drawString(_MARGEN_X_RAPIDA, _MARGEN_Y_RAPIDA / 2, TITULO_DOCUMENTO)
+            c.drawRightString(_PAGINA_RAPIDA[0] - _MARGEN_X_RAPIDA, _MARGEN_Y_RAPIDA / 2, f"Página {paginas}")
+            c.setFillColor(colors.black)
+
+            # Todos los textos de la página van en un solo objeto de texto; dentro de una
+            # papeleta cada renglón baja con el interlineado (T*) sin recalcular coordenadas
+            texto = c.beginText()
+            texto.setFont('Helvetica', _FUENTE_RAPIDA, _ALTO_RENGLON_RAPIDA)
+            for papeleta, (x, y) in zip(grupo[inicio:inicio + por_pagina], POSICIONES_RAPIDA):
+                c.saveState()
+                c.translate(x, y)
+                c.doForm('papeleta')
+                c.restoreState()
+                texto.setTextOrigin(x + x_valor, y + _BASES_RAPIDA[0])
+                for campo in campos:
+                    valor = texto_serie(papeleta) if campo == 'serie' else papeleta.get(campo, '')
+                    valor = '' if valor is None else str(valor)
+                    recortado = recortados.get(valor)
+                    if recortado is None:
+                        recortado = recortados[valor] = _recortar_texto(valor, _ANCHO_VALOR_RAPIDA)
+                    texto.textLine(recortado)
+            c.drawText(texto)
+    c.save()
+    return paginas
+
+# Formatos de papeleta: sufijo del archivo, página, márgenes (izq, der, sup, inf) e historia
+# de flowables, o función de dibujo directo en canvas
+FORMATOS = {
+    'individual': {
+        'descripcion': '3 papeletas por página (vertical)',
+        'sufijo': '',
+        'pagesize': A4,
+        'margenes': (15*mm, 15*mm, 15*mm, 15*mm),
+        'historia': historia_individual,
+    },
+    'excel_style': {
+        'descripcion': 'Tabla por prueba (horizontal)',
+        'sufijo': '_excel_style',
+        'pagesize': landscape(A4),
+        'margenes': (15*mm, 15*mm, 15*mm, 15*mm),
+        'historia': historia_excel_style,
+    },
+    'excel_3_per_row': {
+        'descripcion': '3x3 estilo Excel (horizontal)',
+        'sufijo': '_excel_3_per_row',
+        'pagesize': landscape(A4),
+        'margenes': (10*mm, 10*mm, 15*mm, 15*mm),
+        'historia': historia_excel_3_por_fila,
+    },
+    'rapido': {
+        'descripcion': '3x6 rápido (horizontal, dibujo directo)',
+        'sufijo': '_rapido',
+        'pagesize': _PAGINA_RAPIDA,
+        'margenes': (_MARGEN_X_RAPIDA, _MARGEN_X_RAPIDA, _MARGEN_Y_RAPIDA, _MARGEN_Y_RAPIDA),
+        'dibujar': dibujar_papeletas_canvas,
+    },
+}
+
+def ruta_papeletas(archivo, formato):
+    """Ruta del PDF completo de un formato (papeletas_jueces.pdf, papeletas_jueces_excel_style.pdf, ...)"""
+    return archivo.replace('.pdf', FORMATOS[formato]['sufijo'] + '.pdf')
+
+def construir_pdf(ruta, formato, papeletas, con_titulo=True, por_evento=False):
+    """
+    Construye un PDF con las papeletas dadas y devuelve el número de páginas. Con
+    por_evento cada prueba empieza en página nueva y tiene su marcador, como el PDF
+    concatenado de generar_pdf_paralelo.
+    """
+    config = FORMATOS[formato]
+    if 'dibujar' in config:
+        return config['dibujar'](ruta, papeletas, con_titulo, por_evento)
+
+    izquierda, derecha, arriba, abajo = config['margenes']
+    doc = SimpleDocTemplate(
+        ruta,
+        pagesize=config['pagesize'],
+        rightMargin=derecha,
+        leftMargin=izquierda,
+        topMargin=arriba,
+        bottomMargin=abajo
+    )
+    if por_evento:
+        doc.build(historia_por_evento(config['historia'], papeletas, con_titulo))
+    else:
+        doc.build(config['historia'](papeletas, con_titulo))
+    return doc.page
+
+def nombre_archivo_evento(numero, evento):
+    """Nombre de archivo estable para el PDF de una prueba (conserva el orden del programa)."""
+    limpio = re.sub(r'[^\w]+', '_', evento).strip('_')[:60]
+    return f"{numero:03d}_{limpio}.pdf"
+
+def archivos_por_evento(directorio):
+    """PDFs por prueba generados en el directorio, en orden del programa."""
+    if not os.path.isdir(directorio):
+        return []
+    return [os.path.join(directorio, f) for f in sorted(os.listdir(directorio)) if f.lower().endswith('.pdf')]
+
+def generar_pdf_paralelo(papeletas, formato, archivo_completo, directorio_eventos, max_procesos=None):
+    """
+    Construye un PDF por prueba en un pool de procesos y los concatena en archivo_completo.
+
+    Un error en una prueba no descarta las demás: sus PDFs quedan en directorio_eventos y
+    el error se informa, pero el documento completo sólo se escribe si todas salieron bien.
+    Sin pypdf el documento completo se construye como una tarea más del mismo pool, con
+    la misma estructura (cada prueba en página nueva y con su marcador).
+    Devuelve {'archivo': ruta o None, 'paginas': int, 'eventos': [(evento, ruta, paginas)],
+    'errores': [(evento, mensaje)]}.
+    """
+    eventos = list(agrupar_por_evento(papeletas).items())
+    os.makedirs(directorio_eventos, exist_ok=True)
+    for ruta in archivos_por_evento(directorio_eventos):
+        os.remove(ruta)  # Quitar pruebas que ya no existen en el sembrado
+
+    generados, errores = {}, []
+    paginas_completo = None
+    with ProcessPoolExecutor(max_workers=max_procesos) as pool:
+        futuros = {}
+        for numero, (evento, grupo) in enumerate(eventos, 1):
+            ruta = os.path.join(directorio_eventos, nombre_archivo_evento(numero, evento))
+            futuros[pool.submit(construir_pdf, ruta, formato, grupo, numero == 1)] = (evento, ruta)
+        futuro_completo = None if PYPDF_AVAILABLE else pool.submit(construir_pdf, archivo_completo, formato, papeletas, True, True)
+
+        for futuro in as_completed(futuros):
+            evento, ruta = futuros[futuro]
+            try:
+                generados[evento] = (evento, ruta, futuro.result())
+            except Exception as e:
+                errores.append((evento, str(e)))
+
+        if futuro_completo is not None:
+            try:
+                paginas_completo = futuro_completo.result()
+            except Exception as e:
+                errores.append(('documento completo', str(e)))
+
+    resultado_eventos = [generados[evento] for evento, _ in eventos if evento in generados]
+    archivo = None
+    if not errores:
+        if PYPDF_AVAILABLE:
+            writer = PdfWriter()
+            for evento, ruta, _ in resultado_eventos:
+                writer.append(ruta, outline_item=evento)
+            with open(archivo_completo, 'wb') as salida:
+                writer.write(salida)
+            paginas_completo = sum(paginas for _, _, paginas in resultado_eventos)
+        archivo = archivo_completo
+
+    return {
+        'archivo': archivo,
+        'paginas': paginas_completo or 0,
+        'eventos': resultado_eventos,
+        'errores': errores,
+    }
@@ -0,0 +1,113 @@
+"""
+Puntuación de resultados: posiciones por prueba, género y categoría y puntos según el
+sistema de puntuación del evento (ver ``event_manager.compilar_esquema_puntuacion``).
+
+Las funciones trabajan sobre DataFrames completos (``groupby`` + consulta de la tabla de
+puntos), de modo que sirven tanto para el reporte final como para recalcular un solo
+grupo en la clasificación en vivo o comparar varios sistemas sobre los mismos resultados.
+"""
+import numpy as np
+import pandas as pd
+
+from event_manager import (
+    ESQUEMA_PUNTUACION_POR_DEFECTO,
+    ESQUEMAS_PUNTUACION_PREDEFINIDOS,
+    compilar_esquema_puntuacion,
+)
+from tiempos_utils import parse_times_series
+
+# Sistema de puntos por defecto: 1º=9, 2º=7, 3º=6, 4º=5, luego -1 por posición (mínimo 1).
+# Los sistemas de cada evento se definen en event_config.json (ver EventManager.get_scoring_scheme)
+ESQUEMA_ESTANDAR = compilar_esquema_puntuacion(
+    ESQUEMA_PUNTUACION_POR_DEFECTO, ESQUEMAS_PUNTUACION_PREDEFINIDOS[ESQUEMA_PUNTUACION_POR_DEFECTO]
+)
+TABLA_PUNTOS = ESQUEMA_ESTANDAR['tabla']
+
+GRUPOS_PUNTUACION = ['Evento', 'Genero', 'Categoria']
+COLUMNAS_RESULTADOS = ['Evento', 'Genero', 'Categoria', 'Posicion', 'Nombre', 'Equipo', 'Edad',
+                       'Tiempo_Competencia', 'Puntos']
+
+
+def como_enteros(puntos):
+    """Puntos enteros cuando el sistema no genera fracciones (p. ej. factor de relevos 1.5)."""
+    return puntos.astype(np.int64) if np.all(puntos == np.round(puntos)) else puntos
+
+
+def puntos_por_posicion(posiciones, tabla=TABLA_PUNTOS):
+    """Puntos para un arreglo de posiciones (1 = primer lugar) consultando la tabla del sistema."""
+    indices = np.clip(np.asarray(posiciones, dtype=np.int64), 0, len(tabla) - 1)
+    return tabla[indices]
+
+
+def calcular_puntos(posicion):
+    return int(puntos_por_posicion([posicion])[0])
+
+
+def puntos_resultados(clasificados, esquema=ESQUEMA_ESTANDAR):
+    """
+    Puntos de cada fila de ``clasificar_resultados`` bajo un sistema compilado: consulta de
+    la tabla por posición, factor para relevos y tope de puntuadores por equipo (los
+    nadadores de un equipo que exceden el tope dentro de su prueba/categoría no suman).
+    """
+    puntos = puntos_por_posicion(clasificados['Posicion'].to_numpy(), esquema['tabla'])
+    if esquema['factor_relevos'] != 1:
+        es_relevo = clasificados['Evento'].astype(str).str.upper().str.contains('RELEVO', regex=False).to_numpy()
+        puntos = np.where(es_relevo, puntos * esquema['factor_relevos'], puntos)
+    if esquema['max_puntuadores_equipo']:
+        # clasificados viene ordenado por grupo y posición: cumcount = orden dentro del equipo
+        orden_en_equipo = clasificados.groupby(GRUPOS_PUNTUACION + ['Equipo'], sort=False).cumcount().to_numpy()
+        puntos = np.where(orden_en_equipo < esquema['max_puntuadores_equipo'], puntos, 0.0)
+    return como_enteros(puntos)
+
+
+def clasificar_resultados(resultados):
+    """
+    Posición de cada nadador dentro de su evento, género y categoría (sin puntos).
+
+    Recibe la lista de ``leer_tiempos_competencia_desde_sembrado`` (o un DataFrame con las
+    mismas columnas) y devuelve un DataFrame con COLUMNAS_RESULTADOS sin 'Puntos', ordenado
+    por grupo y posición. Tiempos iguales comparten posición; los nadadores sin tiempo
+    válido (DQ, vacío, s/t) no reciben posición ni aparecen en el resultado.
+    """
+    columnas = [c for c in COLUMNAS_RESULTADOS if c != 'Puntos']
+    if resultados is None or len(resultados) == 0:
+        return pd.DataFrame(columns=columnas)
+
+    df = pd.DataFrame(resultados)
+    if 'Tiempo_Segundos' not in df:
+        df['Tiempo_Segundos'] = parse_times_series(df['Tiempo_Competencia'])
+
+    # Solo compiten por posición los tiempos válidos (no inf / NaN)
+    df = df[np.isfinite(df['Tiempo_Segundos'].astype('float64'))]
+    if df.empty:
+        return pd.DataFrame(columns=columnas)
+
+    # Posición dentro de cada evento/género/categoría; empates comparten el mejor lugar
+    df = df.assign(
+        Posicion=df.groupby(GRUPOS_PUNTUACION)['Tiempo_Segundos'].rank(method='min').astype(np.int64)
+    )
+    df = df.sort_values(GRUPOS_PUNTUACION + ['Posicion'], kind='mergesort')
+    return df[columnas].reset_index(drop=True)
+
+
+def comparar_esquemas(clasificados, esquemas):
+    """
+    Simulación de la clasificación por equipos bajo varios sistemas de puntuación.
+
+    ``clasificados`` es la salida de ``clasificar_resultados`` (o de
+    ``procesar_resultados_por_categoria_y_genero``): los resultados se clasifican una sola
+    vez y cada sistema solo consulta su tabla. Devuelve un DataFrame con 'Equipo' y, por
+    sistema, las columnas 'Puntos (nombre)' y 'Lugar (nombre)', ordenado por el primero.
+    Los resultados sin equipo no suman a ninguno (como en ``generar_resumen_equipos``).
+    """
+    esquemas = list(esquemas)
+    comparacion = pd.DataFrame({'Equipo': pd.unique(clasificados['Equipo'].dropna())})
+    for esquema in esquemas:
+        nombre = esquema['nombre']
+        puntos = pd.Series(puntos_resultados(clasificados, esquema), index=clasificados.index)
+        totales = puntos.groupby(clasificados['Equipo']).sum()
+        comparacion[f'Puntos ({nombre})'] = comparacion['Equipo'].map(totales).to_numpy()
+        comparacion[f'Lugar ({nombre})'] = comparacion[f'Puntos ({nombre})'].rank(method='min', ascending=False).astype(np.int64)
+    if esquemas and not comparacion.empty:
+        comparacion = comparacion.sort_values(f"Lugar ({esquemas[0]['nombre']})", kind='mergesort')
+    return comparacion.reset_index(drop=True)
@@ -0,0 +1,311 @@
+"""
+Almacén SQLite de inscripciones (fuente de verdad de planilla_inscripcion.xlsx).
+
+Cada nadador es una fila de la tabla ``planilla`` con sus columnas serializadas en
+JSON, de modo que agregar, editar o eliminar un nadador no reescribe el libro Excel.
+La planilla .xlsx se exporta bajo demanda (``exportar_excel`` /
+``exportar_planilla_si_cambio``) y, si alguien la edita o reemplaza por fuera de la
+app, se vuelve a importar automáticamente en la siguiente operación.
+"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+
+from planilla_utils import normalize_planilla_columns
+
+COLUMNAS_BASE = ['NOMBRE Y AP', 'EQUIPO', 'EDAD', 'CAT.', 'SEXO', 'FECHA DE NA']
+
+
+def ruta_store(archivo_inscripcion):
+    """planilla_inscripcion.xlsx → planilla_inscripcion.db"""
+    return os.path.splitext(archivo_inscripcion)[0] + '.db'
+
+
+def normalizar_nombre(nombre):
+    return ' '.join(str(nombre).lower().split())
+
+
+def _codificar_valor(valor):
+    """Valor de celda → tipo JSON (fechas y horas etiquetadas para recuperarlas)."""
+    if isinstance(valor, (pd.Timestamp, datetime)):
+        return {'__fecha__': pd.Timestamp(valor).isoformat()}
+    if isinstance(valor, date):
+        return {'__fecha__': valor.isoformat()}
+    if isinstance(valor, time):
+        return {'__hora__': valor.isoformat()}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if '__fecha__' in valor:
+            return pd.Timestamp(valor['__fecha__'])
+        if '__hora__' in valor:
+            return time.fromisoformat(valor['__hora__'])
+    return valor
+
+
+def fila_a_json(fila):
+    datos = {}
+    for col, valor in fila.items():
+        if valor is None:
+            continue
+        try:
+            if pd.isna(valor):
+                continue
+        except (TypeError, ValueError):
+            pass
+        datos[str(col)] = _codificar_valor(valor)
+    return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class RegistroStore:
+    """
+    Inscripciones en SQLite: cada alta, edición o baja toca una sola fila, sin reescribir
+    la planilla. Las altas son O(1); la edición y el borrado reciben la posición del
+    nadador en la planilla (el índice que usa la app) y la resuelven recorriendo el
+    índice de ids, O(n) pero sin leer los datos de las filas.
+    """
+
+    def __init__(self, archivo_inscripcion='planilla_inscripcion.xlsx'):
+        self.archivo_inscripcion = archivo_inscripcion
+        self.ruta = ruta_store(archivo_inscripcion)
+        self._crear_esquema()
+
+    # ===== Infraestructura =====
+
+    @contextmanager
+    def _conectar(self):
+        """Conexión con transacción: commit al salir del bloque, rollback si hay error."""
+        conn = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _crear_esquema(self):
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS planilla (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    nombre_norm TEXT NOT NULL DEFAULT '',
+                    datos TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_planilla_nombre ON planilla(nombre_norm);
+                CREATE TABLE IF NOT EXISTS meta (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT
+                );
+            """)
+
+    def _meta(self, conn, clave, default=None):
+        row = conn.execute('SELECT valor FROM meta WHERE clave = ?', (clave,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, clave, valor):
+        conn.execute(
+            'INSERT INTO meta (clave, valor) VALUES (?, ?) '
+            'ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor',
+            (clave, json.dumps(valor)),
+        )
+
+    def _excel_mtime(self):
+        try:
+            return os.stat(self.archivo_inscripcion).st_mtime_ns
+        except OSError:
+            return None
+
+    def _sincronizar(self, conn):
+        """
+        Importa la planilla Excel si cambió por fuera del almacén (subida desde la app,
+        edición manual) o vacía el almacén si el archivo exportado fue eliminado.
+        """
+        mtime = self._excel_mtime()
+        mtime_registrado = self._meta(conn, 'excel_mtime')
+        if mtime is not None and mtime != mtime_registrado:
+            df = normalize_planilla_columns(pd.read_excel(self.archivo_inscripcion))
+            self._reemplazar(conn, df)
+            self._set_meta(conn, 'excel_mtime', mtime)
+            self._set_meta(conn, 'pendiente_exportar', False)
+        elif mtime is None and mtime_registrado is not None:
+            conn.execute('DELETE FROM planilla')
+            self._set_meta(conn, 'columnas', None)
+            self._set_meta(conn, 'excel_mtime', None)
+            self._set_meta(conn, 'pendiente_exportar', False)
+
+    def _reemplazar(self, conn, df):
+        conn.execute('DELETE FROM planilla')
+        columnas = [str(c) for c in df.columns]
+        filas = df.to_dict('records')
+        conn.executemany(
+            'INSERT INTO planilla (nombre_norm, datos) VALUES (?, ?)',
+            [(normalizar_nombre(f.get('NOMBRE Y AP', '')), fila_a_json(f)) for f in filas],
+        )
+        self._set_meta(conn, 'columnas', columnas)
+
+    def _registrar_columnas(self, conn, nuevas):
+        columnas = self._meta(conn, 'columnas') or list(COLUMNAS_BASE)
+        faltantes = [str(c) for c in nuevas if str(c) not in columnas]
+        if faltantes:
+            self._set_meta(conn, 'columnas', columnas + faltantes)
+
+    def _id_por_posicion(self, conn, posicion):
+        """id de la fila en esa posición (orden de la planilla); recorre el índice de ids hasta ella."""
+        row = conn.execute(
+            'SELECT id FROM planilla ORDER BY id LIMIT 1 OFFSET ?', (int(posicion),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _marcar_cambio(self, conn):
+        self._set_meta(conn, 'pendiente_exportar', True)
+
+    # ===== Lectura =====
+
+    def existe(self):
+        """True si hay una planilla definida (importada, creada o con nadadores)."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            return self._meta(conn, 'columnas') is not None
+
+    def cargar_dataframe(self):
+        """Planilla completa como DataFrame (mismo formato que pd.read_excel), o None."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            columnas = self._meta(conn, 'columnas')
+            if columnas is None:
+                return None
+            filas = [
+                {k: decodificar_valor(v) for k, v in json.loads(datos).items()}
+                for (datos,) in conn.execute('SELECT datos FROM planilla ORDER BY id')
+            ]
+        df = pd.DataFrame(filas)
+        for col in columnas:
+            if col not in df.columns:
+                df[col] = np.nan
+        extra = [c for c in df.columns if c not in columnas]
+        return df[columnas + extra]
+
+    def buscar_por_nombre(self, nombre):
+        """(posición, fila) del primer nadador con ese nombre (sin distinguir mayúsculas), o None."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            row = conn.execute(
+                'SELECT id, datos FROM planilla WHERE nombre_norm = ? ORDER BY id LIMIT 1',
+                (normalizar_nombre(nombre),),
+            ).fetchone()
+            if not row:
+                return None
+            posicion = conn.execute('SELECT COUNT(*) FROM planilla WHERE id < ?', (row[0],)).fetchone()[0]
+        fila = {k: decodificar_valor(v) for k, v in json.loads(row[1]).items()}
+        return posicion, fila
+
+    def nombres_normalizados(self):
+        """Conjunto de nombres ya inscritos (para validar duplicados en bloque)."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            return {n for (n,) in conn.execute('SELECT nombre_norm FROM planilla')}
+
+    # ===== Escritura =====
+
+    def crear_vacia(self, columnas):
+        """Reinicia la planilla con las columnas indicadas y sin nadadores."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            self._reemplazar(conn, pd.DataFrame(columns=columnas))
+            self._marcar_cambio(conn)
+
+    def agregar(self, fila):
+        self.agregar_filas([fila])
+
+    def agregar_filas(self, filas, columnas=None):
+        """Inserta varios nadadores en una sola transacción."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            nuevas = list(columnas or [])
+            for fila in filas:
+                nuevas.extend(c for c in fila if c not in nuevas)
+            self._registrar_columnas(conn, nuevas)
+            conn.executemany(
+                'INSERT INTO planilla (nombre_norm, datos) VALUES (?, ?)',
+                [(normalizar_nombre(f.get('NOMBRE Y AP', '')), fila_a_json(f)) for f in filas],
+            )
+            self._marcar_cambio(conn)
+
+    def actualizar(self, posicion, cambios):
+        """Actualiza columnas de un nadador; valores None/'' vacían la celda. False si no existe."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            row_id = self._id_por_posicion(conn, posicion)
+            if row_id is None:
+                return False
+            (datos,) = conn.execute('SELECT datos FROM planilla WHERE id = ?', (row_id,)).fetchone()
+            fila = {k: decodificar_valor(v) for k, v in json.loads(datos).items()}
+            fila.update(cambios)
+            self._registrar_columnas(conn, cambios.keys())
+            conn.execute(
+                'UPDATE planilla SET nombre_norm = ?, datos = ? WHERE id = ?',
+                (normalizar_nombre(fila.get('NOMBRE Y AP', '')), fila_a_json(fila), row_id),
+            )
+            self._marcar_cambio(conn)
+            return True
+
+    def eliminar(self, posicion):
+        """Elimina el nadador en esa posición. False si no existe."""
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            row_id = self._id_por_posicion(conn, posicion)
+            if row_id is None:
+                return False
+            conn.execute('DELETE FROM planilla WHERE id = ?', (row_id,))
+            self._marcar_cambio(conn)
+            return True
+
+    def limpiar(self):
+        """Elimina todas las inscripciones y la planilla exportada."""
+        with self._conectar() as conn:
+            conn.execute('DELETE FROM planilla')
+            self._set_meta(conn, 'columnas', None)
+            self._set_meta(conn, 'excel_mtime', None)
+            self._set_meta(conn, 'pendiente_exportar', False)
+        if os.path.exists(self.archivo_inscripcion):
+            os.remove(self.archivo_inscripcion)
+
+    # ===== Exportación =====
+
+    def exportar_excel(self, forzar=False):
+        """
+        Escribe planilla_inscripcion.xlsx desde el almacén si hubo cambios desde la
+        última exportación (o siempre con ``forzar``). Devuelve True si escribió.
+        """
+        with self._conectar() as conn:
+            self._sincronizar(conn)
+            pendiente = self._meta(conn, 'pendiente_exportar', False)
+            if self._meta(conn, 'columnas') is None or not (pendiente or forzar):
+                return False
+        df = self.cargar_dataframe()
+        df.to_excel(self.archivo_inscripcion, index=False)
+        with self._conectar() as conn:
+            self._set_meta(conn, 'excel_mtime', self._excel_mtime())
+            self._set_meta(conn, 'pendiente_exportar', False)
+        return True
+
+
+def exportar_planilla_si_cambio(archivo_inscripcion='planilla_inscripcion.xlsx'):
+    """Actualiza la planilla .xlsx antes de que otro módulo la lea (sin costo si no hay cambios)."""
+    if not os.path.exists(ruta_store(archivo_inscripcion)):
+        return False
+    try:
+        return RegistroStore(archivo_inscripcion).exportar_excel()
+    except Exception as e:
+        print(f"Error al exportar planilla de inscripción: {e}")
+        return False
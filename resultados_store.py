@@ -0,0 +1,454 @@
+"""
+Almacén SQLite de tiempos de competencia.
+
+Cada tiempo ingresado en el sembrado manual se guarda al instante en la tabla
+``resultados`` con clave (prueba, sembrado, serie, carril), donde ``sembrado`` es el
+filtro de género con el que se armó el sembrado (Todos, Masculino o Femenino). Así los
+tiempos sobreviven a la caída de la sesión del navegador, varios operadores pueden
+cargar tiempos a la vez (WAL, una transacción por tiempo) y el procesamiento de
+resultados los lee con una sola consulta.
+
+El mismo almacén mantiene la clasificación en vivo: cada tiempo recalcula solo el
+ranking de su prueba/género/categoría (tablas ``puntuacion``) y aplica la diferencia de
+puntos a los totales por equipo y por nadador, dentro de la misma transacción.
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from event_manager import EventManager
+from puntuacion import clasificar_resultados, puntos_resultados
+from tiempos_utils import SIN_TIEMPO, parse_time
+
+ARCHIVO_RESULTADOS = 'resultados_competencia.db'
+
+# Columnas que espera 4-procesar_resultados (mismo formato que el antiguo lector de session_state)
+COLUMNAS_RESULTADOS = ['Prueba', 'Evento', 'Genero', 'Serie', 'Carril', 'Nombre', 'Equipo', 'Edad',
+                       'Categoria', 'Tiempo_Sembrado', 'Tiempo_Competencia', 'Tiempo_Segundos']
+
+
+def normalizar_nombre(nombre):
+    return ' '.join(str(nombre).lower().split())
+
+
+def identidad_nadador(nadador):
+    """Nombre y equipo normalizados: identifica al nadador aunque cambie de carril."""
+    return f"{normalizar_nombre(nadador['nombre'])}|{normalizar_nombre(nadador.get('equipo') or '')}"
+
+
+def _firma_esquema(esquema):
+    return json.dumps([esquema['nombre'], esquema['tabla'].tolist(), esquema['factor_relevos'],
+                       esquema['max_puntuadores_equipo']])
+
+
+def genero_de_nadador(nadador, sembrado):
+    """'Hombres'/'Mujeres' según el sexo del nadador (o el filtro del sembrado si falta)."""
+    sexo = nadador.get('sexo') or sembrado
+    return 'Hombres' if str(sexo).strip().upper() in ('M', 'MASCULINO', 'HOMBRES') else 'Mujeres'
+
+
+def _escalar(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    try:
+        if pd.isna(valor):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return valor
+
+
+class ResultadosStore:
+    """Tiempos de competencia en SQLite con escritura inmediata por carril y clasificación en vivo."""
+
+    def __init__(self, ruta=ARCHIVO_RESULTADOS, esquema=None):
+        self.ruta = ruta
+        # Sistema de puntuación compilado; por defecto, el activo del evento en cada operación
+        self.esquema = esquema
+        self._crear_esquema()
+
+    # ===== Infraestructura =====
+
+    @contextmanager
+    def _conectar(self):
+        """Conexión con transacción: commit al salir del bloque, rollback si hay error."""
+        conn = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _crear_esquema(self):
+        with self._conectar() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS resultados (
+                    evento TEXT NOT NULL,
+                    sembrado TEXT NOT NULL,
+                    serie INTEGER NOT NULL,
+                    carril INTEGER NOT NULL,
+                    genero TEXT NOT NULL,
+                    nombre TEXT NOT NULL,
+                    identidad TEXT NOT NULL,
+                    equipo TEXT,
+                    edad,
+                    categoria TEXT,
+                    tiempo_sembrado TEXT,
+                    tiempo_competencia TEXT NOT NULL,
+                    tiempo_segundos REAL,
+                    operador TEXT,
+                    actualizado TEXT NOT NULL,
+                    PRIMARY KEY (evento, sembrado, serie, carril)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_resultados_nadador ON resultados(evento, sembrado, identidad);
+                CREATE INDEX IF NOT EXISTS idx_resultados_grupo ON resultados(evento, genero, categoria);
+                CREATE TABLE IF NOT EXISTS puntuacion (
+                    evento TEXT NOT NULL,
+                    genero TEXT NOT NULL,
+                    categoria TEXT NOT NULL,
+                    identidad TEXT NOT NULL,
+                    nombre TEXT NOT NULL,
+                    equipo TEXT,
+                    posicion INTEGER NOT NULL,
+                    puntos REAL NOT NULL,
+                    PRIMARY KEY (evento, genero, categoria, identidad)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS totales_equipo (
+                    equipo TEXT PRIMARY KEY,
+                    puntos REAL NOT NULL,
+                    participaciones INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS totales_nadador (
+                    identidad TEXT PRIMARY KEY,
+                    nombre TEXT NOT NULL,
+                    equipo TEXT,
+                    puntos REAL NOT NULL,
+                    participaciones INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT
+                );
+            """)
+            # Los grupos de la clasificación usan '' para "sin categoría"
+            conn.execute("UPDATE resultados SET categoria = '' WHERE categoria IS NULL")
+            # Sin equipo es NULL y no suma a ningún equipo (filas basura de versiones anteriores)
+            conn.execute("UPDATE resultados SET equipo = NULL WHERE TRIM(equipo) = ''")
+            conn.execute("DELETE FROM totales_equipo WHERE equipo IS NULL OR TRIM(equipo) = ''")
+
+    def _meta(self, conn, clave, default=None):
+        row = conn.execute('SELECT valor FROM meta WHERE clave = ?', (clave,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, clave, valor):
+        conn.execute(
+            'INSERT INTO meta (clave, valor) VALUES (?, ?) '
+            'ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor',
+            (clave, json.dumps(valor)),
+        )
+
+    def _esquema_activo(self):
+        return self.esquema or EventManager().get_scoring_scheme()
+
+    def _leer(self, conn, where='', params=()):
+        """Tiempos en formato COLUMNAS_RESULTADOS (+ identidad); un tiempo por nadador y prueba."""
+        df = pd.read_sql_query(
+            'SELECT evento, genero, serie, carril, nombre, equipo, edad, categoria, tiempo_sembrado, '
+            'tiempo_competencia, tiempo_segundos, identidad '
+            f'FROM resultados {where} ORDER BY actualizado, evento, genero, serie, carril',
+            conn,
+            params=params,
+        )
+        df.columns = ['Evento', 'Genero', 'Serie', 'Carril', 'Nombre', 'Equipo', 'Edad', 'Categoria',
+                      'Tiempo_Sembrado', 'Tiempo_Competencia', 'Tiempo_Segundos', 'identidad']
+        # El mismo nadador puede figurar en dos sembrados de la prueba (Todos y por género): vale el último
+        df = df.drop_duplicates(['Evento', 'identidad'], keep='last')
+        df = df.sort_values(['Evento', 'Genero', 'Serie', 'Carril'], kind='mergesort').reset_index(drop=True)
+        df['Prueba'] = df['Evento'] + ' - ' + df['Genero']
+        df['Tiempo_Segundos'] = df['Tiempo_Segundos'].astype('float64').fillna(SIN_TIEMPO)
+        return df
+
+    # ===== Clasificación en vivo =====
+
+    def _puntuar(self, df, esquema):
+        """Filas de la tabla ``puntuacion`` para los tiempos dados (solo tiempos válidos)."""
+        clasificados = clasificar_resultados(df)
+        if clasificados.empty:
+            return []
+        puntos = puntos_resultados(clasificados, esquema)
+        return [
+            (evento, genero, categoria, identidad_nadador({'nombre': nombre, 'equipo': equipo}),
+             nombre, equipo, int(posicion), float(punto))
+            for evento, genero, categoria, nombre, equipo, posicion, punto in zip(
+                clasificados['Evento'], clasificados['Genero'], clasificados['Categoria'],
+                clasificados['Nombre'], clasificados['Equipo'], clasificados['Posicion'], puntos,
+            )
+        ]
+
+    def _aplicar_deltas(self, conn, filas, signo):
+        """
+        Suma (signo=1) o resta (signo=-1) las filas de puntuación a los totales. Los
+        nadadores sin equipo puntúan como nadadores pero no suman a ningún equipo, igual
+        que en ``generar_resumen_equipos``.
+        """
+        if not filas:
+            return
+        por_equipo, por_nadador = {}, {}
+        for _, _, _, identidad, nombre, equipo, _, puntos in filas:
+            equipo = _escalar(equipo)
+            if equipo is not None and str(equipo).strip():
+                total = por_equipo.setdefault(equipo, [0.0, 0])
+                total[0] += signo * puntos
+                total[1] += signo
+            total = por_nadador.setdefault(identidad, [nombre, equipo, 0.0, 0])
+            total[2] += signo * puntos
+            total[3] += signo
+        conn.executemany(
+            'INSERT INTO totales_equipo (equipo, puntos, participaciones) VALUES (?, ?, ?) '
+            'ON CONFLICT(equipo) DO UPDATE SET puntos = puntos + excluded.puntos, '
+            'participaciones = participaciones + excluded.participaciones',
+            [(equipo, puntos, cantidad) for equipo, (puntos, cantidad) in por_equipo.items()],
+        )
+        conn.executemany(
+            'INSERT INTO totales_nadador (identidad, nombre, equipo, puntos, participaciones) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(identidad) DO UPDATE SET puntos = puntos + excluded.puntos, '
+            'participaciones = participaciones + excluded.participaciones',
+            [(identidad, *valores) for identidad, valores in por_nadador.items()],
+        )
+        conn.execute('DELETE FROM totales_equipo WHERE participaciones <= 0')
+        conn.execute('DELETE FROM totales_nadador WHERE participaciones <= 0')
+
+    def _recalcular_grupo(self, conn, grupo, esquema):
+        """Re-clasifica una prueba/género/categoría y aplica la diferencia a los totales."""
+        anteriores = conn.execute(
+            'SELECT evento, genero, categoria, identidad, nombre, equipo, posicion, puntos FROM puntuacion '
+            'WHERE evento = ? AND genero = ? AND categoria = ?',
+            grupo,
+        ).fetchall()
+        nuevas = self._puntuar(self._leer(conn, 'WHERE evento = ? AND genero = ? AND categoria = ?', grupo), esquema)
+        conn.execute('DELETE FROM puntuacion WHERE evento = ? AND genero = ? AND categoria = ?', grupo)
+        conn.executemany('INSERT INTO puntuacion VALUES (?, ?, ?, ?, ?, ?, ?, ?)', nuevas)
+        self._aplicar_deltas(conn, anteriores, -1)
+        self._aplicar_deltas(conn, nuevas, 1)
+
+    def _reconstruir(self, conn, esquema):
+        """Clasificación completa desde cero (cambio de sistema de puntuación o limpieza)."""
+        for tabla in ('puntuacion', 'totales_equipo', 'totales_nadador'):
+            conn.execute(f'DELETE FROM {tabla}')
+        filas = self._puntuar(self._leer(conn), esquema)
+        conn.executemany('INSERT INTO puntuacion VALUES (?, ?, ?, ?, ?, ?, ?, ?)', filas)
+        self._aplicar_deltas(conn, filas, 1)
+        self._set_meta(conn, 'esquema', _firma_esquema(esquema))
+
+    def _sincronizar_esquema(self, conn):
+        """Reconstruye la clasificación si cambió el sistema de puntuación. True si lo hizo."""
+        esquema = self._esquema_activo()
+        if self._meta(conn, 'esquema') == _firma_esquema(esquema):
+            return False
+        self._reconstruir(conn, esquema)
+        return True
+
+    def _nueva_version(self, conn):
+        self._set_meta(conn, 'version', self._meta(conn, 'version', 0) + 1)
+
+    def _actualizar_clasificacion(self, conn, grupos):
+        """Recalcula los grupos afectados (o todo, si cambió el sistema de puntuación)."""
+        if not self._sincronizar_esquema(conn):
+            esquema = self._esquema_activo()
+            for grupo in grupos:
+                self._recalcular_grupo(conn, grupo, esquema)
+        self._nueva_version(conn)
+
+    # ===== Escritura =====
+
+    def registrar_tiempo(self, evento, sembrado, serie, carril, nadador, tiempo_competencia, operador=None):
+        """
+        Guarda (o borra, si viene vacío) el tiempo de competencia de un carril.
+
+        Un nadador tiene un solo tiempo por prueba: su fila anterior en el mismo sembrado
+        (mismo nombre y equipo) se reemplaza. Los cambios de carril del editor se aplican
+        antes con ``mover_nadador``, así que una fila de otro nadador en este carril ya no
+        tiene ubicación vigente y también se reemplaza.
+        """
+        tiempo = str(tiempo_competencia or '').strip()
+        identidad = identidad_nadador(nadador)
+        with self._conectar() as conn:
+            # Grupos (prueba/género/categoría) cuya clasificación cambia: los de las filas
+            # reemplazadas y el del tiempo nuevo
+            grupos = set(conn.execute(
+                'SELECT evento, genero, categoria FROM resultados WHERE evento = ? AND sembrado = ? '
+                'AND ((serie = ? AND carril = ?) OR identidad = ?)',
+                (evento, sembrado, int(serie), int(carril), identidad),
+            ).fetchall())
+            conn.execute(
+                'DELETE FROM resultados WHERE evento = ? AND sembrado = ? '
+                'AND ((serie = ? AND carril = ?) OR identidad = ?)',
+                (evento, sembrado, int(serie), int(carril), identidad),
+            )
+            if tiempo:
+                grupo = (evento, genero_de_nadador(nadador, sembrado), str(_escalar(nadador.get('categoria')) or ''))
+                self._insertar(conn, grupo, sembrado, serie, carril, identidad, nadador, tiempo, operador)
+                grupos.add(grupo)
+            self._actualizar_clasificacion(conn, grupos)
+
+    def mover_nadador(self, evento, sembrado, nadador, serie, carril):
+        """
+        Lleva el tiempo guardado de un nadador a su nuevo carril del sembrado (editor manual).
+
+        Sin esto la fila seguiría en el carril anterior y el próximo tiempo anotado ahí
+        la reemplazaría. Una fila de otro nadador que quedara en el carril de destino es
+        de un carril que el editor ya dejó libre y se descarta. Devuelve True si había tiempo.
+        """
+        identidad = identidad_nadador(nadador)
+        with self._conectar() as conn:
+            grupos = set(conn.execute(
+                'SELECT evento, genero, categoria FROM resultados WHERE evento = ? AND sembrado = ? '
+                'AND serie = ? AND carril = ? AND identidad <> ?',
+                (evento, sembrado, int(serie), int(carril), identidad),
+            ).fetchall())
+            if grupos:
+                conn.execute(
+                    'DELETE FROM resultados WHERE evento = ? AND sembrado = ? AND serie = ? AND carril = ? '
+                    'AND identidad <> ?',
+                    (evento, sembrado, int(serie), int(carril), identidad),
+                )
+                self._actualizar_clasificacion(conn, grupos)
+            movidas = conn.execute(
+                'UPDATE resultados SET serie = ?, carril = ? WHERE evento = ? AND sembrado = ? AND identidad = ?',
+                (int(serie), int(carril), evento, sembrado, identidad),
+            ).rowcount
+            return movidas > 0
+
+    def retirar_nadadores(self, evento, sembrado, nadadores):
+        """
+        Borra los tiempos de los nadadores quitados del sembrado (retiros o ❌ del editor)
+        para que dejen de puntuar. Devuelve cuántas filas se eliminaron.
+        """
+        identidades = [identidad_nadador(nadador) for nadador in nadadores]
+        if not identidades:
+            return 0
+        marcas = ', '.join('?' * len(identidades))
+        with self._conectar() as conn:
+            where = f'WHERE evento = ? AND sembrado = ? AND identidad IN ({marcas})'
+            params = (evento, sembrado, *identidades)
+            grupos = set(conn.execute(f'SELECT evento, genero, categoria FROM resultados {where}', params).fetchall())
+            if not grupos:
+                return 0
+            eliminados = conn.execute(f'DELETE FROM resultados {where}', params).rowcount
+            self._actualizar_clasificacion(conn, grupos)
+            return eliminados
+
+    def _insertar(self, conn, grupo, sembrado, serie, carril, identidad, nadador, tiempo, operador):
+        evento, genero, categoria = grupo
+        segundos = parse_time(tiempo)
+        conn.execute(
+            'INSERT INTO resultados (evento, sembrado, serie, carril, genero, nombre, identidad, equipo, '
+            'edad, categoria, tiempo_sembrado, tiempo_competencia, tiempo_segundos, operador, actualizado) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                evento, sembrado, int(serie), int(carril), genero,
+                str(nadador['nombre']), identidad, str(_escalar(nadador.get('equipo')) or '').strip() or None,
+                _escalar(nadador.get('edad')), categoria,
+                _escalar(nadador.get('tiempo')), tiempo,
+                segundos if np.isfinite(segundos) else None,
+                operador, datetime.now().isoformat(timespec='milliseconds'),
+            ),
+        )
+
+    def limpiar(self, evento=None, sembrado=None):
+        """Elimina los tiempos de una prueba/sembrado, de una prueba o todos."""
+        condiciones, params = [], []
+        if evento is not None:
+            condiciones.append('evento = ?')
+            params.append(evento)
+        if sembrado is not None:
+            condiciones.append('sembrado = ?')
+            params.append(sembrado)
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        with self._conectar() as conn:
+            eliminados = conn.execute(f'DELETE FROM resultados{where}', params).rowcount
+            self._reconstruir(conn, self._esquema_activo())
+            self._nueva_version(conn)
+            return eliminados
+
+    # ===== Lectura =====
+
+    def contar(self):
+        with self._conectar() as conn:
+            return conn.execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+
+    def tiempos_de_sembrado(self, evento, sembrado):
+        """{(serie, carril): (identidad, tiempo)} de un sembrado, para restaurarlo."""
+        with self._conectar() as conn:
+            filas = conn.execute(
+                'SELECT serie, carril, identidad, tiempo_competencia FROM resultados '
+                'WHERE evento = ? AND sembrado = ?',
+                (evento, sembrado),
+            ).fetchall()
+        return {(serie, carril): (identidad, tiempo) for serie, carril, identidad, tiempo in filas}
+
+    def restaurar_tiempos(self, evento, sembrado, series):
+        """
+        Copia a ``series`` (formato de ``sembrar_nadadores``) los tiempos guardados: primero
+        por serie y carril, y si el nadador cambió de carril, por nombre y equipo. Devuelve cuántos.
+        """
+        guardados = self.tiempos_de_sembrado(evento, sembrado)
+        if not guardados:
+            return 0
+        por_identidad = {identidad: tiempo for identidad, tiempo in guardados.values()}
+        restaurados = 0
+        for serie in series:
+            for carril, nadador in enumerate(serie['carriles'], 1):
+                if not nadador:
+                    continue
+                identidad = identidad_nadador(nadador)
+                guardado = guardados.get((serie['serie'], carril))
+                tiempo = guardado[1] if guardado and guardado[0] == identidad else por_identidad.get(identidad)
+                if tiempo:
+                    nadador['tiempo_competencia'] = tiempo
+                    restaurados += 1
+        return restaurados
+
+    def cargar_resultados(self):
+        """Todos los tiempos como DataFrame con COLUMNAS_RESULTADOS (sin tiempo válido = inf)."""
+        with self._conectar() as conn:
+            return self._leer(conn)[COLUMNAS_RESULTADOS]
+
+    def version_clasificacion(self):
+        """Contador que aumenta con cada cambio de tiempos (para refrescar pantallas)."""
+        with self._conectar() as conn:
+            return self._meta(conn, 'version', 0)
+
+    def _clasificacion(self, consulta, columnas, limite):
+        with self._conectar() as conn:
+            if self._sincronizar_esquema(conn):
+                self._nueva_version(conn)
+            if limite:
+                consulta += f' LIMIT {int(limite)}'
+            df = pd.read_sql_query(consulta, conn)
+        df.columns = columnas
+        # Los totales se acumulan con sumas y restas: quitar el ruido de coma flotante
+        df['Puntos_Total'] = df['Puntos_Total'].round(6)
+        if np.all(df['Puntos_Total'] == df['Puntos_Total'].round()):
+            df['Puntos_Total'] = df['Puntos_Total'].astype(np.int64)
+        return df
+
+    def clasificacion_equipos(self, limite=None):
+        """Totales por equipo (Equipo, Puntos_Total, Participaciones), de mayor a menor puntaje."""
+        return self._clasificacion(
+            'SELECT equipo, puntos, participaciones FROM totales_equipo ORDER BY puntos DESC, equipo',
+            ['Equipo', 'Puntos_Total', 'Participaciones'], limite,
+        )
+
+    def clasificacion_nadadores(self, limite=None):
+        """Totales por nadador (Nombre, Equipo, Puntos_Total, Participaciones), de mayor a menor."""
+        return self._clasificacion(
+            'SELECT nombre, equipo, puntos, participaciones FROM totales_nadador ORDER BY puntos DESC, nombre',
+            ['Nombre', 'Equipo', 'Puntos_Total', 'Participaciones'], limite,
+        )
@@ -0,0 +1,139 @@
+"""
+Re-sembrado incremental de los libros de sembrado (una hoja por prueba y género).
+
+Junto a cada libro generado se guarda una instantánea JSON con los parámetros del
+sembrado, los nombres de hoja y una firma del contenido de cada prueba y de cada grupo
+prueba/género/categoría. En la siguiente generación se compara la planilla actual con esa
+instantánea y solo se reescriben las hojas cuyas series cambiaron (altas tardías,
+retiros, cambios de tiempo); el resto del libro, incluidos los tiempos de competencia ya
+anotados, se conserva. Si cambia el conjunto de pruebas (y por lo tanto la numeración de
+las hojas) o los parámetros del sembrado, se reconstruye el libro completo.
+"""
+import hashlib
+import json
+import os
+
+from openpyxl import Workbook, load_workbook
+
+from escritor_sembrado import registrar_estilos
+from planilla_utils import ordered_prueba_hoja_keys, safe_excel_sheet_title, titulo_prueba_numerada
+
+# Columnas del sembrado que determinan el contenido de una hoja
+_COLUMNAS_FIRMA = ['categoria', 'serie', 'sesion', 'carril', 'nombre', 'equipo', 'edad', 'tiempo_inscripcion']
+
+
+def ruta_snapshot(archivo_salida):
+    """sembrado_competencia.xlsx → sembrado_competencia.snapshot.json"""
+    return os.path.splitext(archivo_salida)[0] + '.snapshot.json'
+
+
+def cargar_snapshot(archivo_salida):
+    try:
+        with open(ruta_snapshot(archivo_salida), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar_snapshot(archivo_salida, snapshot):
+    with open(ruta_snapshot(archivo_salida), 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+
+
+def _unir(sembrado, columnas, separador):
+    """Concatena columnas como texto (por columnas, sin recorrer fila por fila)."""
+    texto = sembrado[columnas].astype(str)
+    return texto[columnas[0]].str.cat([texto[c] for c in columnas[1:]], sep=separador)
+
+
+def _firmas(sembrado, por):
+    """sha1 del contenido sembrado de cada grupo (mismo contenido → misma firma)."""
+    if sembrado.empty:
+        return {}
+    filas = _unir(sembrado, _COLUMNAS_FIRMA, '\x1f')
+    claves = _unir(sembrado, por, ' | ')
+    return {
+        clave: hashlib.sha1('\x1e'.join(grupo).encode('utf-8')).hexdigest()
+        for clave, grupo in filas.groupby(claves, sort=False)
+    }
+
+
+def firmas_por_prueba(sembrado):
+    """{"{prueba} - {género}": firma} — una por hoja del libro."""
+    return _firmas(sembrado, ['clave'])
+
+
+def firmas_por_grupo(sembrado):
+    """{"{prueba} - {género} | {categoría}": firma} — grupos que se siembran por separado."""
+    return _firmas(sembrado, ['clave', 'categoria'])
+
+
+def _diferentes(previas, actuales):
+    return sorted(k for k in set(previas) | set(actuales) if previas.get(k) != actuales.get(k))
+
+
+def escribir_sembrado(archivo_salida, datos, event_cols, escribir_hoja, sembrado, parametros, incremental=True):
+    """
+    Escribe el libro de sembrado (una hoja por clave de ``datos``).
+
+    ``escribir_hoja(ws, titulo, datos[clave])`` llena una hoja. Con ``incremental`` y una
+    instantánea compatible solo se reemplazan las hojas cuyas firmas cambiaron.
+    Devuelve ``(hojas_reescritas, total_hojas, grupos_afectados, incremental_aplicado)``.
+    """
+    if not datos:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Sin datos"
+        ws.cell(row=1, column=1, value="No hay nadadores inscritos para generar sembrado.")
+        wb.save(archivo_salida)
+        if os.path.exists(ruta_snapshot(archivo_salida)):
+            os.remove(ruta_snapshot(archivo_salida))
+        return [], 0, [], False
+
+    claves = ordered_prueba_hoja_keys(datos, event_cols)
+    titulos = [titulo_prueba_numerada(idx, clave) for idx, clave in enumerate(claves, start=1)]
+    used_titles = set()
+    hojas = [safe_excel_sheet_title(titulo, used_titles) for titulo in titulos]
+    firmas = firmas_por_prueba(sembrado)
+    grupos = firmas_por_grupo(sembrado)
+
+    previo = cargar_snapshot(archivo_salida) if incremental else None
+    wb = None
+    if previo and previo.get('parametros') == parametros and previo.get('hojas') == hojas \
+            and os.path.exists(archivo_salida):
+        try:
+            wb = load_workbook(archivo_salida)
+        except Exception as e:
+            print(f"No se pudo abrir '{archivo_salida}' para actualizarlo, se regenera completo: {e}")
+            wb = None
+        if wb is not None and wb.sheetnames != hojas:
+            wb = None
+
+    aplicado = wb is not None
+    if aplicado:
+        registrar_estilos(wb)
+        reescritas = [clave for clave in claves if previo['firmas'].get(clave) != firmas.get(clave)]
+        for clave in reescritas:
+            idx = claves.index(clave)
+            wb.remove(wb.worksheets[idx])
+            escribir_hoja(wb.create_sheet(title=hojas[idx], index=idx), titulos[idx], datos[clave])
+        if reescritas:
+            wb.save(archivo_salida)
+        grupos_afectados = _diferentes(previo.get('grupos', {}), grupos)
+    else:
+        # Libro nuevo en modo write-only: las filas se vuelcan al disco a medida que se escriben
+        wb = Workbook(write_only=True)
+        registrar_estilos(wb)
+        for idx, clave in enumerate(claves):
+            escribir_hoja(wb.create_sheet(title=hojas[idx]), titulos[idx], datos[clave])
+        wb.save(archivo_salida)
+        reescritas = list(claves)
+        grupos_afectados = sorted(grupos)
+
+    _guardar_snapshot(archivo_salida, {
+        'parametros': parametros,
+        'hojas': hojas,
+        'firmas': firmas,
+        'grupos': grupos,
+    })
+    return reescritas, len(claves), grupos_afectados, aplicado
@@ -0,0 +1,162 @@
+"""Conversión compartida de tiempos de natación (inscripción y competencia) a segundos."""
+import math
+import re
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+SIN_TIEMPO = float('inf')
+
+# H:MM:SS.dd, MM:SS.dd o SS.dd (coma ya convertida a punto y sin espacios)
+_PATRON_TIEMPO = r'^(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?)$'
+
+
+def es_sin_tiempo(time_val):
+    """True para marcas s/t, S/T (con o sin espacios): inscrito sin tiempo."""
+    return isinstance(time_val, str) and ''.join(time_val.split()).lower() == 's/t'
+
+
+def _segundos_desde_numero(val):
+    """Número de Excel: fracción de día (0 < x < 1) o segundos totales."""
+    if math.isnan(val) or val <= 0:
+        return SIN_TIEMPO
+    if val < 1.0:
+        return val * 86400.0
+    return val
+
+
+def _segundos_desde_texto(time_str):
+    # Mismo patrón que parse_times_series: float() aceptaría además '1e3', 'inf' o '1_000'
+    partes = re.match(_PATRON_TIEMPO, ''.join(time_str.split()).replace(',', '.'))
+    if not partes:
+        return SIN_TIEMPO
+    horas, minutos, segundos = partes.groups()
+    if horas is None and minutos is None:
+        return _segundos_desde_numero(float(segundos))
+    return int(horas or 0) * 3600 + int(minutos) * 60 + float(segundos)
+
+
+def parse_time(time_val):
+    """
+    Convierte un tiempo a segundos (float) para ordenar y comparar.
+
+    Acepta texto MM:SS,dd / MM:SS.dd / H:MM:SS.dd / SS.dd, números (segundos o
+    fracción de día de Excel), ``time``, ``datetime``/``Timestamp`` y ``timedelta``.
+    Vacío, ``s/t`` o valores inválidos devuelven ``inf`` (se siembran como peor tiempo).
+    """
+    if time_val is None or isinstance(time_val, bool):
+        return SIN_TIEMPO
+    if isinstance(time_val, str):
+        return _segundos_desde_texto(time_val)
+    if isinstance(time_val, (timedelta, np.timedelta64)):
+        td = pd.Timedelta(time_val)
+        return SIN_TIEMPO if pd.isna(td) else td.total_seconds()
+    if isinstance(time_val, (datetime, np.datetime64)):
+        ts = pd.Timestamp(time_val)
+        if pd.isna(ts):
+            return SIN_TIEMPO
+        return ts.hour * 3600 + ts.minute * 60 + ts.second + ts.microsecond / 1_000_000
+    if isinstance(time_val, time):
+        return time_val.hour * 3600 + time_val.minute * 60 + time_val.second + time_val.microsecond / 1_000_000
+    try:
+        return _segundos_desde_numero(float(time_val))
+    except (TypeError, ValueError):
+        return _segundos_desde_texto(str(time_val))
+
+
+def parse_times_series(valores):
+    """
+    Versión vectorizada de ``parse_time`` para una columna completa.
+
+    Recibe una ``pd.Series`` (o cualquier iterable) y devuelve una ``pd.Series`` de
+    float con el mismo índice; las celdas sin tiempo quedan en ``inf``.
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype=object)
+    resultado = pd.Series(SIN_TIEMPO, index=serie.index, dtype='float64')
+    if serie.empty:
+        return resultado
+
+    # Columnas homogéneas (caso habitual al leer con pandas): sin inspección por celda
+    if pd.api.types.is_bool_dtype(serie.dtype):
+        return resultado
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        num = serie.astype('float64')
+        num = num.where(num > 0)
+        num = num.where(num >= 1.0, num * 86400.0)
+        return num.fillna(SIN_TIEMPO)
+    if pd.api.types.is_timedelta64_dtype(serie.dtype):
+        return serie.dt.total_seconds().where(lambda s: s.notna(), SIN_TIEMPO)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        seg = serie.dt.hour * 3600 + serie.dt.minute * 60 + serie.dt.second + serie.dt.microsecond / 1_000_000
+        return seg.astype('float64').fillna(SIN_TIEMPO)
+
+    # Columna mixta (object): clasificar una vez por tipo y convertir cada grupo en bloque
+    tipos = serie.map(type)
+    es_texto = tipos.map(lambda t: issubclass(t, str))
+    es_delta = tipos.map(lambda t: issubclass(t, (timedelta, np.timedelta64)))
+    es_fecha = tipos.map(lambda t: issubclass(t, (datetime, np.datetime64)))
+    es_hora = tipos.map(lambda t: issubclass(t, time))
+    es_numero = tipos.map(lambda t: issubclass(t, (int, float, np.number)) and not issubclass(t, (bool, np.bool_)))
+
+    if es_texto.any():
+        texto = (
+            serie[es_texto].astype(str)
+            .str.replace(r'\s+', '', regex=True)
+            .str.replace(',', '.', regex=False)
+        )
+        partes = texto.str.extract(_PATRON_TIEMPO).astype('float64')
+        horas = partes[0].fillna(0)
+        minutos = partes[1].fillna(0)
+        segundos = partes[2]
+        # Solo segundos sin ':' siguen la misma regla numérica (fracción de día)
+        solo_seg = partes[0].isna() & partes[1].isna()
+        segundos = segundos.where(~solo_seg | (segundos >= 1.0), segundos * 86400.0)
+        total = horas * 3600 + minutos * 60 + segundos
+        total = total.where(~solo_seg | (total > 0))
+        resultado[es_texto] = total.fillna(SIN_TIEMPO)
+
+    if es_numero.any():
+        resultado[es_numero] = parse_times_series(serie[es_numero].astype('float64'))
+
+    if es_delta.any():
+        resultado[es_delta] = parse_times_series(pd.to_timedelta(serie[es_delta]))
+
+    if es_fecha.any():
+        resultado[es_fecha] = parse_times_series(pd.to_datetime(serie[es_fecha]))
+
+    if es_hora.any():
+        horas_td = pd.to_timedelta(serie[es_hora].astype(str), errors='coerce')
+        resultado[es_hora] = parse_times_series(horas_td)
+
+    return resultado
+
+
+def formatear_segundos(total):
+    """Segundos → texto MM:SS.dd (formato de la planilla). ``inf``/NaN → None."""
+    if total is None or not math.isfinite(total):
+        return None
+    # Redondeo a centésimas hacia arriba en .5, estable ante errores de coma flotante
+    # (41.865 da .87 venga de texto, de ``time`` o de un cálculo vectorizado)
+    centesimas = math.floor(max(0.0, float(total)) * 100 + 0.5 + 1e-6)
+    minutes, resto = divmod(centesimas, 6000)
+    return f"{minutes:02d}:{resto // 100:02d}.{resto % 100:02d}"
+
+
+def comparar_tiempos(time1, time2):
+    """-1 si time1 es mejor (menor) que time2, 1 si es peor, 0 si son iguales."""
+    secs1 = parse_time(time1)
+    secs2 = parse_time(time2)
+    if secs1 < secs2:
+        return -1
+    if secs1 > secs2:
+        return 1
+    return 0
+
+
+def segundos_por_prueba(df, event_cols):
+    """DataFrame de segundos (mismo índice que ``df``) con una columna por prueba."""
+    return pd.DataFrame(
+        {prueba: parse_times_series(df[prueba]) for prueba in event_cols},
+        index=df.index,
+    )